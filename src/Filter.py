@@ -708,6 +708,14 @@ class AdvancedFilter:
             # === 3. TRAITER TOUS LES TOKENS (nouveaux + retry) ===
             all_tokens = list(new_tokens) + list(retry_tokens)
 
+            # DexScreener par lots de 30 adresses plutôt qu'un appel par token
+            token_index = col_names.index('token_address')
+            self.market_data.prefetch_dexscreener([row[token_index] for row in all_tokens])
+
+            # Barres on-chain gardées seulement pour les paires encore analysées
+            pair_index = col_names.index('pair_address')
+            self.market_data.retain_pairs([row[pair_index] for row in all_tokens])
+
             for row in all_tokens:
                 token_dict = dict(zip(col_names, row))
                 self.stats['total_analyzed'] += 1
@@ -727,7 +735,8 @@ class AdvancedFilter:
                     pair_address = token_dict.get('pair_address', None)
 
                     # Appel au nouvel agrégateur
-                    market_data = self.market_data.get_enriched_token_data(token_address, pair_address)
+                    market_data = self.market_data.get_enriched_token_data(
+                        token_address, pair_address, token_dict.get('block_created'))
 
                     if market_data:
                         # Log des sources utilisées
@@ -805,6 +814,9 @@ class AdvancedFilter:
                 self.run_filter_cycle()
                 last_success = datetime.now()  # Mise à jour si succès
                 self.logger.info(f"Cycle terminé. Stats: Analyzed={self.stats['total_analyzed']}, Approved={self.stats['total_approved']}, Rejected={self.stats['total_rejected']}")
+                for name, health in self.market_data.get_source_health().items():
+                    if health['state'] != 'closed':
+                        self.logger.warning(f"🔌 Source {name} {health['state']}: {health['last_error']}")
 
                 # Attendre avant le prochain cycle
                 filter_interval = int(os.getenv('FILTER_INTERVAL_SECONDS', '60'))
@@ -10,8 +10,8 @@ import time
 import os
 import sys
 import logging
-from datetime import datetime
-from typing import Dict, Optional, List
+from datetime import datetime, timezone
+from typing import Dict, Optional, List, Tuple
 from pathlib import Path
 
 # Setup paths
@@ -23,29 +23,39 @@ from web3.exceptions import BlockNotFound, ContractLogicError
 from eth_utils import to_checksum_address
 from dotenv import load_dotenv
 from web3_utils import DexScreenerAPI
+from log_fetcher import ParallelLogFetcher
+from factory_events import FactoryEventRouter, address_bytes, checksum
+from multicall import TokenMetadataResolver
+from metadata_cache import get_metadata_cache
+from block_time_index import get_block_time_index
+from head_tracker import get_head_tracker
+from ws_listener import WebSocketLogListener
+from rpc_batch import make_web3
+from preselection import OnChainPreselector
 
 load_dotenv(PROJECT_DIR / 'config' / '.env')
 
 # Configuration on-chain
-BLOCKS_PER_HOUR = 1800  # Base: ~2s par bloc
+BLOCKS_PER_HOUR = 1800  # Base: ~2s par bloc (marges uniquement, les âges passent par BlockTimeIndex)
 CHUNK_SIZE = 1000  # Limite RPC pour get_logs
+EVENT_RETENTION_MARGIN_BLOCKS = BLOCKS_PER_HOUR  # Marge conservée sous la fenêtre d'âge
+PUSH_CURSOR_FLUSH_BLOCKS = 15  # Mode push: curseurs persistés au plus tous les 15 blocs (~30s)
 
-# Factory Addresses (Base Mainnet)
-AERODROME_FACTORY = "0x420DD381b31aEf6683db6B902084cB0FFECe40Da"
-BASESWAP_FACTORY = "0x8909Dc15e40173Ff4699343b6eB8132c65e18eC6"
+# File de travail pair_events.queue_status
+QUEUE_PENDING = 0
+QUEUE_DONE = 1
+QUEUE_REJECTED = 2  # Rejeté en présélection, re-vérifié après PRESELECTION_RECHECK_MINUTES
+QUEUE_EXPIRED = 3  # Sorti de la fenêtre d'âge avant traitement
 
 # Base Tokens (pour filtrage des paires)
 WETH_BASE = "0x4200000000000000000000000000000000000006"
 USDC_BASE = "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913"
 USDBC_BASE = "0xd9aAEc86B65D86f6A7B5B1b0c42FFA531710b6CA"
 
-# Event signature
-PAIR_CREATED_EVENT_SIGNATURE = Web3.keccak(text="PairCreated(address,address,address,uint256)").hex()
-
 
 class UnifiedScanner:
     """
-    Scanner unifié qui détecte les tokens via événements PairCreated on-chain.
+    Scanner unifié qui détecte les tokens via événements PairCreated/PoolCreated on-chain.
     Indépendant des APIs externes (DexScreener/GeckoTerminal).
     """
 
@@ -61,13 +71,22 @@ class UnifiedScanner:
 
         # Initialiser la base de données
         self.init_database()
+        self._warm_known_tokens()
 
         # Configuration scanner
         self.batch_size = int(os.getenv('BATCH_SIZE', 50))
+        self.queue_drain_per_cycle = int(os.getenv('SCANNER_QUEUE_DRAIN_PER_CYCLE', self.batch_size))
         self.scan_delay = int(os.getenv('SCAN_INTERVAL_SECONDS', 30))
+        self.log_fetch_concurrency = int(os.getenv('LOG_FETCH_CONCURRENCY', 8))
         self.min_token_age_hours = float(os.getenv('MIN_TOKEN_AGE_HOURS', '2'))
         self.max_token_age_hours = float(os.getenv('MAX_TOKEN_AGE_HOURS', '12'))
 
+        # Mode de découverte: 'poll' (timer) ou 'ws' (eth_subscribe, repli automatique sur poll)
+        self.scanner_mode = os.getenv('SCANNER_MODE', 'poll').lower()
+        self.ws_url = os.getenv('RPC_WS_URL', '')
+        self.ws_listener = None
+        self._push_cursor_block = 0
+
         # Liste des RPC avec fallback automatique
         self.rpc_urls = [
             os.getenv('RPC_URL', 'https://mainnet.base.org'),
@@ -85,6 +104,24 @@ class UnifiedScanner:
 
         self.logger.info(f"✅ Connecté au RPC Base (bloc: {self.w3.eth.block_number})")
 
+        # Moteur get_logs parallèle réparti sur tous les RPC
+        self.log_fetcher = ParallelLogFetcher(
+            rpc_urls=self.rpc_urls,
+            concurrency=self.log_fetch_concurrency,
+            chunk_size=CHUNK_SIZE,
+            logger=self.logger
+        )
+
+        # Métadonnées ERC20 par batch (Multicall3), tokens/paires connus servis par le cache
+        self.metadata_cache = get_metadata_cache()
+
+        # Présélection on-chain par batch (bytecode, code hash, owner, réserves)
+        self.preselection_enabled = os.getenv('SCANNER_PRESELECTION', 'true').lower() == 'true'
+        self.preselection_recheck_seconds = int(os.getenv('PRESELECTION_RECHECK_MINUTES', 30)) * 60
+
+        # Index de timestamps, suivi de tête, métadonnées et présélection liés au RPC courant
+        self._bind_rpc(self.w3)
+
         # Initialiser DexScreener pour enrichissement
         self.dex_api = DexScreenerAPI()
 
@@ -94,14 +131,14 @@ class UnifiedScanner:
             to_checksum_address(USDC_BASE),
             to_checksum_address(USDBC_BASE)
         ]
+        self.base_token_bytes = frozenset(address_bytes(token) for token in self.base_tokens)
 
-        self.factories = [
-            to_checksum_address(AERODROME_FACTORY),
-            to_checksum_address(BASESWAP_FACTORY)
-        ]
+        # Registre des factories surveillées (Aerodrome, BaseSwap, Uniswap V3)
+        self.factory_router = FactoryEventRouter()
+        self.factories = self.factory_router.addresses
 
         self.logger.info(f"⏱️  Scanner on-chain: tokens {self.min_token_age_hours}h-{self.max_token_age_hours}h")
-        self.logger.info(f"🏭 Factories: Aerodrome + BaseSwap")
+        self.logger.info(f"🏭 Factories: {' + '.join(entry['name'] for entry in self.factory_router.registry)}")
         self.logger.info(f"📊 Enrichissement: DexScreener API")
 
     def setup_logging(self):
@@ -123,7 +160,7 @@ class UnifiedScanner:
         for i, rpc_url in enumerate(self.rpc_urls):
             try:
                 self.logger.info(f"🔌 Tentative connexion RPC {i+1}/{len(self.rpc_urls)}: {rpc_url}")
-                w3 = Web3(Web3.HTTPProvider(rpc_url))
+                w3 = make_web3(rpc_url)
 
                 if w3.is_connected():
                     block_number = w3.eth.block_number
@@ -138,6 +175,24 @@ class UnifiedScanner:
 
         return None
 
+    def _bind_rpc(self, w3: Web3):
+        """
+        Rattache au RPC courant les composants partagés par instance Web3
+        (au démarrage et après chaque basculement: l'ancien w3 n'est plus interrogé)
+        """
+        self.w3 = w3
+
+        # Index bloc ↔ timestamp (âges exacts au lieu de BLOCKS_PER_HOUR)
+        self.block_index = get_block_time_index(w3)
+
+        # Tête suivie par hash: synchronisation limitée aux blocs confirmés, rollback sur réorganisation
+        self.head_tracker = get_head_tracker(w3)
+        if self._rollback_from not in self.head_tracker.listeners:
+            self.head_tracker.add_reorg_listener(self._rollback_from)
+
+        self.metadata_resolver = TokenMetadataResolver(w3, cache=self.metadata_cache)
+        self.preselector = OnChainPreselector(w3)
+
     def _switch_to_next_rpc(self) -> bool:
         """Bascule vers le prochain RPC disponible"""
         start_index = self.current_rpc_index
@@ -148,10 +203,10 @@ class UnifiedScanner:
 
             try:
                 self.logger.warning(f"🔄 Basculement vers RPC {next_index+1}/{len(self.rpc_urls)}: {rpc_url}")
-                w3 = Web3(Web3.HTTPProvider(rpc_url))
+                w3 = make_web3(rpc_url)
 
                 if w3.is_connected():
-                    self.w3 = w3
+                    self._bind_rpc(w3)
                     self.current_rpc_index = next_index
                     self.logger.info(f"✅ Basculement réussi vers RPC {next_index+1}")
                     return True
@@ -167,6 +222,47 @@ class UnifiedScanner:
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
 
+        # Curseur de scan par factory (migration depuis l'ancien singleton id=1)
+        cursor.execute("PRAGMA table_info(scanner_state)")
+        state_columns = [col[1] for col in cursor.fetchall()]
+        if state_columns and 'factory' not in state_columns:
+            self.logger.info("🔄 Migration table scanner_state (curseur par factory)")
+            cursor.execute("DROP TABLE scanner_state")
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS scanner_state (
+                factory TEXT PRIMARY KEY,
+                last_block INTEGER DEFAULT 0,
+                last_update TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Événements PairCreated stockés localement (la fenêtre d'âge devient une requête locale)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS pair_events (
+                pair_address TEXT PRIMARY KEY,
+                token_address TEXT NOT NULL,
+                base_token TEXT NOT NULL,
+                factory TEXT NOT NULL,
+                factory_name TEXT,
+                block_number INTEGER NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                queue_status INTEGER DEFAULT 0,
+                processed_at TIMESTAMP
+            )
+        ''')
+
+        # Migration: file de travail (queue_status/processed_at) sur une table existante
+        cursor.execute("PRAGMA table_info(pair_events)")
+        event_columns = [col[1] for col in cursor.fetchall()]
+        if 'queue_status' not in event_columns:
+            self.logger.info("🔄 Migration table pair_events (ajout de la file de travail)")
+            cursor.execute("ALTER TABLE pair_events ADD COLUMN queue_status INTEGER DEFAULT 0")
+            cursor.execute("ALTER TABLE pair_events ADD COLUMN processed_at TIMESTAMP")
+
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_pair_events_block ON pair_events(block_number)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_pair_events_queue ON pair_events(queue_status, block_number)')
+
         # Vérifier si la table existe et a l'ancienne structure
         cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='discovered_tokens'")
         table_exists = cursor.fetchone() is not None
@@ -210,349 +306,466 @@ class UnifiedScanner:
                 owner_percentage REAL DEFAULT 100.0,
                 buy_tax REAL,
                 sell_tax REAL,
+                owner_renounced INTEGER,
                 discovered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         ''')
 
+        # Migration: renonciation owner() issue de la présélection (NULL: inconnue / pas de owner())
+        cursor.execute("PRAGMA table_info(discovered_tokens)")
+        if 'owner_renounced' not in [col[1] for col in cursor.fetchall()]:
+            cursor.execute("ALTER TABLE discovered_tokens ADD COLUMN owner_renounced INTEGER")
+
         conn.commit()
         conn.close()
         self.logger.info("✅ Base de données initialisée (structure hybride on-chain + marché)")
 
-    def scan_tokens_in_age_window(self) -> List[Dict]:
+    def _window_bounds(self, current_timestamp: float) -> Tuple[int, int]:
+        """Bornes (from_block, to_block) de la fenêtre d'âge via l'index de timestamps"""
+        from_block = self.block_index.block_at(current_timestamp - self.max_token_age_hours * 3600)
+        to_block = self.block_index.block_at(current_timestamp - self.min_token_age_hours * 3600) - 1
+        return from_block, to_block
+
+    def scan_tokens_in_age_window(self, sync: bool = True, head: Optional[Tuple[int, int]] = None) -> List[Dict]:
         """
         Scanne les événements PairCreated dans la fenêtre d'âge configurée.
 
+        Seuls les blocs apparus depuis le dernier passage sont demandés au RPC
+        (curseur persistant par factory dans scanner_state). La fenêtre d'âge
+        est ensuite une file de travail locale: au plus SCANNER_QUEUE_DRAIN_PER_CYCLE
+        tokens non traités par cycle, les plus anciens (proches de l'expiration) d'abord.
+
+        Args:
+            sync: Synchroniser les événements via HTTP (False en mode push: le flux WebSocket s'en charge)
+            head: (bloc, timestamp) courant déjà connu (newHeads), évite un appel RPC
+
         Returns:
             Liste de tokens détectés
         """
         try:
-            current_block = self.w3.eth.block_number
-            from_block = current_block - int(self.max_token_age_hours * BLOCKS_PER_HOUR)
-            to_block = current_block - int(self.min_token_age_hours * BLOCKS_PER_HOUR)
+            # Bornes de la fenêtre converties en blocs via l'index de timestamps
+            # (update() vérifie la filiation de la tête et déclenche le rollback si réorganisation)
+            current_block, current_timestamp = head or self.head_tracker.update()
+            from_block, to_block = self._window_bounds(current_timestamp)
 
             self.logger.info(
                 f"🔍 Scan blocs {from_block} → {to_block} "
                 f"({self.max_token_age_hours}h-{self.min_token_age_hours}h)"
             )
 
-            all_tokens = []
-            seen_tokens = set()  # Changé de seen_pairs à seen_tokens (évite doublons cross-factory)
-
-            # Scanner chaque factory
-            for factory in self.factories:
-                factory_name = "Aerodrome" if factory == to_checksum_address(AERODROME_FACTORY) else "BaseSwap"
-
+            # Synchroniser toutes les factories jusqu'au dernier bloc confirmé (incrémental, parallèle)
+            if sync:
                 try:
-                    tokens = self._scan_factory_events(
-                        factory=factory,
-                        factory_name=factory_name,
-                        from_block=from_block,
-                        to_block=to_block,
-                        current_block=current_block,
-                        seen_tokens=seen_tokens  # Changé: passer seen_tokens
-                    )
-
-                    all_tokens.extend(tokens)
-
-                    if len(all_tokens) >= self.batch_size:
-                        self.logger.info(f"⚠️  Limite {self.batch_size} résultats atteinte")
-                        break
-
+                    self._sync_factory_events(from_block, self.head_tracker.confirmed_block(current_block))
                 except Exception as e:
-                    self.logger.warning(f"⚠️  Erreur scan {factory_name}: {e}")
-                    continue
+                    self.logger.warning(f"⚠️  Erreur synchronisation PairCreated: {e}")
+
+            # Fenêtre d'âge = file de travail locale, drainée des plus proches de l'expiration
+            self._expire_pair_events(from_block)
+            all_tokens = self._load_window_events(from_block, to_block, current_timestamp)
+            self._prune_pair_events(from_block - EVENT_RETENTION_MARGIN_BLOCKS)
 
-            self.logger.info(f"✅ {len(all_tokens)} tokens détectés")
-            return all_tokens[:self.batch_size]
+            self.logger.info(f"✅ {len(all_tokens)} tokens à traiter ce cycle")
+            return all_tokens
 
         except Exception as e:
             self.logger.error(f"❌ Erreur scan_tokens_in_age_window: {e}")
             return []
 
-    def _scan_factory_events(
-        self,
-        factory: str,
-        factory_name: str,
-        from_block: int,
-        to_block: int,
-        current_block: int,
-        seen_tokens: set  # Changé: seen_tokens au lieu de seen_pairs
-    ) -> List[Dict]:
-        """Scanne les événements PairCreated d'une factory"""
-        tokens = []
+    def _get_cursor(self, factory: str) -> int:
+        """Retourne le dernier bloc scanné pour une factory (0 si jamais scannée)"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT last_block FROM scanner_state WHERE factory = ?", (factory,))
+        row = cursor.fetchone()
+        conn.close()
+        return row[0] if row and row[0] else 0
 
-        try:
-            # Découper en chunks pour éviter limites RPC
-            block_range = to_block - from_block
+    def _set_cursor(self, factory: str, last_block: int):
+        """Enregistre le dernier bloc scanné pour une factory"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO scanner_state (factory, last_block, last_update)
+            VALUES (?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(factory) DO UPDATE SET
+                last_block = excluded.last_block,
+                last_update = excluded.last_update
+        ''', (factory, last_block))
+        conn.commit()
+        conn.close()
 
-            if block_range > CHUNK_SIZE:
-                self.logger.info(
-                    f"📦 {factory_name}: {block_range} blocs → "
-                    f"{(block_range // CHUNK_SIZE) + 1} chunks"
-                )
+    def _rollback_from(self, fork_block: int):
+        """Réorganisation: annule les paires et recule les curseurs à partir du bloc invalidé"""
+        conn = sqlite3.connect(self.db_path)
+        with conn:
+            removed = conn.execute("DELETE FROM pair_events WHERE block_number >= ?", (fork_block,)).rowcount
+            conn.execute(
+                "UPDATE scanner_state SET last_block = ?, last_update = CURRENT_TIMESTAMP WHERE last_block >= ?",
+                (fork_block - 1, fork_block)
+            )
+        conn.close()
 
-            all_logs = []
-            current_from = from_block
+        self._push_cursor_block = min(self._push_cursor_block, fork_block - 1)
+        self.logger.warning(
+            f"🔀 Réorganisation au bloc {fork_block}: {removed} paires annulées, curseurs reculés"
+        )
 
-            while current_from < to_block:
-                current_to = min(current_from + CHUNK_SIZE, to_block)
+    def _get_sync_start(self, from_block: int) -> int:
+        """
+        Premier bloc à récupérer pour la requête commune à toutes les factories.
+        Part du curseur le plus en retard; au démarrage à froid (ou curseur plus
+        vieux que la fenêtre), backfill depuis from_block.
+        """
+        start_block = None
 
-                try:
-                    chunk_logs = self.w3.eth.get_logs({
-                        'fromBlock': current_from,
-                        'toBlock': current_to,
-                        'address': factory,
-                        'topics': [PAIR_CREATED_EVENT_SIGNATURE]
-                    })
+        for entry in self.factory_router.registry:
+            last_block = self._get_cursor(entry['address'])
 
-                    all_logs.extend(chunk_logs)
+            if last_block < from_block:
+                if last_block == 0:
+                    self.logger.info(f"🧊 {entry['name']}: démarrage à froid, backfill depuis le bloc {from_block}")
+                factory_start = from_block
+            else:
+                factory_start = last_block + 1
 
-                except Exception as e:
-                    error_str = str(e)
-                    self.logger.warning(f"⚠️  Chunk {current_from}-{current_to}: {e}")
-
-                    # Si erreur 503 ou timeout, essayer de basculer vers RPC backup
-                    if '503' in error_str or 'timeout' in error_str.lower() or 'unavailable' in error_str.lower():
-                        self.logger.warning(f"🔄 Erreur RPC détectée, tentative de basculement...")
-                        if self._switch_to_next_rpc():
-                            # Retry avec le nouveau RPC
-                            try:
-                                chunk_logs = self.w3.eth.get_logs({
-                                    'fromBlock': current_from,
-                                    'toBlock': current_to,
-                                    'address': factory,
-                                    'topics': [PAIR_CREATED_EVENT_SIGNATURE]
-                                })
-                                all_logs.extend(chunk_logs)
-                                self.logger.info(f"✅ Retry réussi avec nouveau RPC")
-                            except Exception as retry_error:
-                                self.logger.error(f"❌ Retry échoué: {retry_error}")
-                        else:
-                            self.logger.error(f"❌ Impossible de basculer vers un RPC de backup")
-
-                current_from = current_to + 1
-
-            self.logger.info(f"🏭 {factory_name}: {len(all_logs)} événements PairCreated")
-
-            # Décoder les événements
-            for log in all_logs:
-                try:
-                    token_data = self._decode_pair_created_event(
-                        log=log,
-                        factory=factory,
-                        factory_name=factory_name,
-                        current_block=current_block,
-                        seen_tokens=seen_tokens  # Changé: seen_tokens
-                    )
+            start_block = factory_start if start_block is None else min(start_block, factory_start)
 
-                    if token_data:
-                        tokens.append(token_data)
+        return start_block if start_block is not None else from_block
 
-                except Exception as e:
-                    self.logger.debug(f"Erreur décodage: {e}")
-                    continue
+    def _sync_factory_events(self, from_block: int, current_block: int):
+        """
+        Récupère les nouveaux événements de création de toutes les factories
+        en une seule requête get_logs (adresses multiples + OR des topics)
+        """
+        start_block = self._get_sync_start(from_block)
 
-            return tokens
+        if start_block > current_block:
+            return
 
-        except Exception as e:
-            self.logger.warning(f"❌ Erreur get_logs {factory_name}: {e}")
-            return []
+        logs, synced_to = self.log_fetcher.fetch_logs(
+            address=self.factory_router.addresses,
+            topics=self.factory_router.topics,
+            from_block=start_block,
+            to_block=current_block
+        )
 
-    def _decode_pair_created_event(
-        self,
-        log,
-        factory: str,
-        factory_name: str,
-        current_block: int,
-        seen_tokens: set  # Changé: seen_tokens au lieu de seen_pairs
-    ) -> Optional[Dict]:
-        """Décode un événement PairCreated avec présélection on-chain"""
-        try:
-            # Décoder topics
-            token0 = to_checksum_address('0x' + log['topics'][1].hex()[-40:])
-            token1 = to_checksum_address('0x' + log['topics'][2].hex()[-40:])
-            pair_address = to_checksum_address('0x' + log['data'].hex()[26:66])
-
-            # Identifier token et base token
-            token_address = None
-            base_token = None
-
-            if token0 in self.base_tokens:
-                base_token = token0
-                token_address = token1
-            elif token1 in self.base_tokens:
-                base_token = token1
-                token_address = token0
-            else:
-                return None  # Ignorer paires non appariées
+        decoded = self._decode_pair_created_events(logs)
+        counts = {entry['name']: 0 for entry in self.factory_router.registry}
+        for event in decoded:
+            counts[event[5]['name']] += 1
+
+        events = self._to_pair_events(decoded)
+        self._store_pair_events(events)
+        self.metadata_cache.put_pairs(events)
 
-            # Vérifier si token déjà vu (éviter doublons cross-factory)
-            if token_address in seen_tokens:
-                return None
+        # N'avancer les curseurs que jusqu'au dernier bloc récupéré sans trou
+        if synced_to >= start_block:
+            for factory in self.factories:
+                self._set_cursor(factory, synced_to)
+
+        self.logger.info(
+            f"🏭 {len(logs)} événements de création (blocs {start_block} → {synced_to}, "
+            f"{len(events)} paires stockées: "
+            f"{', '.join(f'{name} {count}' for name, count in counts.items())})"
+        )
+
+    def _decode_pair_created_events(self, logs: List) -> List[Tuple]:
+        """Décodage en masse (octets bruts) des créations appariées à un base token"""
+        return self.factory_router.decode_many(logs, self.base_token_bytes)
+
+    def _to_pair_events(self, decoded: List[Tuple]) -> List[Dict]:
+        """Événements bruts → dicts aux adresses checksummées, juste avant persistance"""
+        events = []
+        for token, base_token, pair, token0, token1, entry, block_number in decoded:
+            events.append({
+                'token_address': checksum(token),
+                'pair_address': checksum(pair),
+                'token0': checksum(token0),
+                'token1': checksum(token1),
+                'base_token': checksum(base_token),
+                'factory': entry['address'],
+                'factory_name': entry['name'],
+                'block_created': block_number
+            })
+        return events
+
+    def _store_pair_events(self, events: List[Dict]):
+        """Enregistre les événements décodés (idempotent sur pair_address)"""
+        if not events:
+            return
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.executemany('''
+            INSERT OR IGNORE INTO pair_events
+            (pair_address, token_address, base_token, factory, factory_name, block_number)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', [
+            (e['pair_address'], e['token_address'], e['base_token'],
+             e['factory'], e['factory_name'], e['block_created'])
+            for e in events
+        ])
+        conn.commit()
+        conn.close()
+
+    def _forget_pair_events(self, events: List[Dict]):
+        """Retire des paires annulées par une réorganisation (mode push)"""
+        if not events:
+            return
+
+        conn = sqlite3.connect(self.db_path)
+        with conn:
+            conn.executemany(
+                "DELETE FROM pair_events WHERE pair_address = ? AND block_number = ?",
+                [(e['pair_address'], e['block_created']) for e in events]
+            )
+        conn.close()
+        self.logger.warning(f"🔀 {len(events)} paires annulées par réorganisation (flux WebSocket)")
+
+    def _queue_condition(self) -> Tuple[str, Tuple]:
+        """Clause SQL des événements à traiter: en attente, ou rejetés dont le délai de re-vérification est passé"""
+        return (
+            "(queue_status = ? OR (queue_status = ? AND processed_at < datetime('now', ?)))",
+            (QUEUE_PENDING, QUEUE_REJECTED, f'-{self.preselection_recheck_seconds} seconds')
+        )
+
+    def _load_window_events(self, from_block: int, to_block: int, current_timestamp: int) -> List[Dict]:
+        """
+        Draine la file: paires non traitées dont la création tombe dans la fenêtre d'âge,
+        une par token (la plus ancienne), les plus proches de la sortie de fenêtre d'abord.
+        """
+        condition, condition_params = self._queue_condition()
 
-            # Calculer l'âge
-            block_created = log['blockNumber']
-            age_hours = (current_block - block_created) / BLOCKS_PER_HOUR
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            SELECT COUNT(DISTINCT token_address) FROM pair_events
+            WHERE block_number BETWEEN ? AND ? AND {condition}
+        ''', (from_block, to_block) + condition_params)
+        backlog = cursor.fetchone()[0]
+
+        # MIN(block_number) + GROUP BY: SQLite renvoie les autres colonnes de la ligne minimale
+        cursor.execute(f'''
+            SELECT token_address, pair_address, base_token, factory, factory_name, MIN(block_number)
+            FROM pair_events
+            WHERE block_number BETWEEN ? AND ? AND {condition}
+            GROUP BY token_address
+            ORDER BY MIN(block_number) ASC
+            LIMIT ?
+        ''', (from_block, to_block) + condition_params + (self.queue_drain_per_cycle,))
+        rows = cursor.fetchall()
+        conn.close()
 
-            seen_tokens.add(token_address)  # Marquer comme vu (par token_address, pas pair)
+        if backlog > len(rows):
+            self.logger.info(f"📥 File: {backlog} tokens en attente, {len(rows)} drainés ce cycle")
 
-            # Note: Présélection on-chain déplacée dans process_token_batch()
-            # pour éviter de ralentir le décodage des événements
+        tokens = []
+        for token_address, pair_address, base_token, factory, factory_name, block_created in rows:
+            created_timestamp = self.block_index.timestamp_of(block_created)
 
-            return {
+            tokens.append({
                 'token_address': token_address,
                 'pair_address': pair_address,
                 'base_token': base_token,
                 'factory': factory,
                 'factory_name': factory_name,
                 'block_created': block_created,
-                'age_hours': age_hours
-            }
+                'age_hours': (current_timestamp - created_timestamp) / 3600,
+                'pair_created_at': datetime.fromtimestamp(created_timestamp, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+            })
 
-        except Exception as e:
-            return None
+        return tokens
 
-    def get_token_metadata(self, token_address: str) -> Dict:
-        """Récupère les métadonnées ERC20 d'un token"""
-        try:
-            token_address = to_checksum_address(token_address)
+    def _mark_tokens(self, token_addresses: List[str], status: int):
+        """Met à jour l'état de file de toutes les paires des tokens donnés"""
+        if not token_addresses:
+            return
 
-            erc20_abi = [
-                {'constant': True, 'inputs': [], 'name': 'name', 'outputs': [{'name': '', 'type': 'string'}], 'type': 'function'},
-                {'constant': True, 'inputs': [], 'name': 'symbol', 'outputs': [{'name': '', 'type': 'string'}], 'type': 'function'},
-                {'constant': True, 'inputs': [], 'name': 'decimals', 'outputs': [{'name': '', 'type': 'uint8'}], 'type': 'function'},
-            ]
+        conn = sqlite3.connect(self.db_path)
+        with conn:
+            conn.executemany(
+                "UPDATE pair_events SET queue_status = ?, processed_at = CURRENT_TIMESTAMP WHERE token_address = ?",
+                [(status, address) for address in token_addresses]
+            )
+        conn.close()
 
-            contract = self.w3.eth.contract(address=token_address, abi=erc20_abi)
+    def _expire_pair_events(self, from_block: int):
+        """Marque (et signale) les paires sorties de la fenêtre sans avoir été traitées"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE pair_events SET queue_status = ?, processed_at = CURRENT_TIMESTAMP
+            WHERE block_number < ? AND queue_status = ?
+        ''', (QUEUE_EXPIRED, from_block, QUEUE_PENDING))
+        expired = cursor.rowcount
+        conn.commit()
+        conn.close()
 
-            try:
-                name = contract.functions.name().call()
-            except:
-                name = "Unknown"
+        if expired > 0:
+            self.logger.warning(
+                f"⌛ {expired} paires sorties de la fenêtre d'âge sans traitement "
+                f"(augmenter SCANNER_QUEUE_DRAIN_PER_CYCLE ?)"
+            )
 
-            try:
-                symbol = contract.functions.symbol().call()
-            except:
-                symbol = "???"
+    def _prune_pair_events(self, before_block: int):
+        """Supprime les événements sortis définitivement de la fenêtre d'âge"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM pair_events WHERE block_number < ?", (before_block,))
+        conn.commit()
+        conn.close()
 
-            try:
-                decimals = contract.functions.decimals().call()
-            except:
-                decimals = 18
+    def get_token_metadata(self, token_address: str) -> Dict:
+        """Récupère les métadonnées ERC20 d'un token"""
+        return self.get_tokens_metadata([token_address]).get(
+            to_checksum_address(token_address),
+            {'name': 'Unknown', 'symbol': '???', 'decimals': 18, 'total_supply': 0}
+        )
 
-            return {
-                'name': name,
-                'symbol': symbol,
-                'decimals': decimals
-            }
+    def get_tokens_metadata(self, token_addresses: List[str]) -> Dict[str, Dict]:
+        """
+        Récupère les métadonnées ERC20 (name/symbol/decimals/totalSupply) d'un lot
+        de tokens en Multicall3 (un aller-retour pour tout le batch).
 
+        Returns:
+            Dict {adresse checksum: métadonnées} (valeurs par défaut si échec)
+        """
+        try:
+            return self.metadata_resolver.resolve_many(token_addresses)
         except Exception as e:
-            self.logger.warning(f"⚠️  Métadonnées {token_address[:8]}...: {e}")
-            return {'name': 'Unknown', 'symbol': '???', 'decimals': 18}
+            self.logger.warning(f"⚠️  Métadonnées multicall ({len(token_addresses)} tokens): {e}")
+            return {}
+
+    def _warm_known_tokens(self):
+        """Charge en mémoire les adresses déjà présentes dans discovered_tokens"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT token_address FROM discovered_tokens")
+        self.known_tokens = {row[0] for row in cursor.fetchall()}
+        conn.close()
+        self.logger.info(f"🧠 {len(self.known_tokens)} tokens déjà connus chargés en mémoire")
+
+    def _build_token_row(self, token_data: Dict, metadata: Dict) -> Tuple:
+        """Ligne discovered_tokens (schéma complet) pour un token découvert on-chain"""
+        # === ENRICHISSEMENT DÉSACTIVÉ (DexScreener trop lent) ===
+        # Problème: 262 requêtes DexScreener → timeout >5min
+        # Solution: Scanner enregistre seulement données on-chain
+        # Filter appellera DexScreener pour tokens qui passent critères on-chain
+        return (
+            token_data['token_address'],
+            metadata['symbol'],
+            metadata['name'],
+            metadata['decimals'],
+            str(metadata['total_supply']),
+            token_data['pair_address'],
+            token_data['base_token'],
+            token_data['factory_name'],
+            token_data['block_created'],
+            token_data['age_hours'],
+            0,  # liquidity
+            0,  # market_cap
+            0,  # volume_24h
+            0,  # volume_1h
+            0,  # volume_5min
+            0,  # price_change_5m
+            0,  # price_change_1h
+            0,  # price_usd
+            0,  # price_eth
+            token_data.get('pair_created_at'),  # Timestamp exact du bloc de création
+            0,  # holder_count
+            100.0,  # owner_percentage
+            None,  # buy_tax
+            None,  # sell_tax
+            token_data.get('owner_renounced')  # Présélection: owner() nul/dead (None si inconnu)
+        )
 
     async def process_token_batch(self, tokens: List[Dict]):
-        """Traite un batch de tokens et les enregistre en DB avec enrichissement DexScreener"""
+        """
+        Ingestion en masse d'un batch de tokens:
+        1. Tokens déjà connus écartés via le set mémoire (aucun RPC dépensé)
+        2. Métadonnées de tous les nouveaux tokens en Multicall3
+        3. Une seule transaction courte: executemany INSERT ... ON CONFLICT DO NOTHING
+        4. État de file mis à jour dans pair_events (traité / rejeté)
+        """
         if not tokens:
             return
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        new_count = 0
-        existing_count = 0
         rejected_preselection = 0  # Tokens rejetés par présélection on-chain
 
+        # Écarter les tokens connus (et doublons internes au batch) avant tout RPC
+        new_tokens = []
+        known_addresses = []
+        batch_addresses = set()
         for token_data in tokens:
+            address = token_data['token_address']
+            if address in batch_addresses:
+                continue
+            if address in self.known_tokens:
+                known_addresses.append(address)
+                continue
+            batch_addresses.add(address)
+            new_tokens.append(token_data)
+        existing_count = len(known_addresses)
+        self._mark_tokens(known_addresses, QUEUE_DONE)
+
+        # === PRÉSÉLECTION ON-CHAIN PAR BATCH ===
+        # Un lot eth_getCode + un Multicall3 (owner + réserves) pour tout le batch
+        if self.preselection_enabled and new_tokens:
             try:
-                # Vérifier si déjà en DB
-                cursor.execute(
-                    "SELECT id FROM discovered_tokens WHERE token_address = ?",
-                    (token_data['token_address'],)
-                )
-
-                if cursor.fetchone():
-                    existing_count += 1
-                    continue
-
-                # === PRÉSÉLECTION ON-CHAIN DÉSACTIVÉE TEMPORAIREMENT ===
-                # Raison: 265 appels get_code() trop lent (>1min)
-                # Stratégie: Laisser Filter.py faire la présélection
-                # TODO: Réactiver avec batching RPC multicall si nécessaire
-
-                # Enrichir métadonnées ERC20 (tentative, fallback si échec)
-                try:
-                    metadata = self.get_token_metadata(token_data['token_address'])
-                except Exception as e:
-                    self.logger.warning(f"Métadonnées échouées pour {token_data['token_address'][:8]}...: {e}")
-                    metadata = {'symbol': '???', 'name': 'Unknown', 'decimals': 18}
-
-                # === ENRICHISSEMENT DÉSACTIVÉ (DexScreener trop lent) ===
-                # Problème: 262 requêtes DexScreener → timeout >5min
-                # Solution: Scanner enregistre seulement données on-chain
-                # Filter appellera DexScreener pour tokens qui passent critères on-chain
-
-                liquidity = 0
-                market_cap = 0
-                volume_24h = 0
-                volume_1h = 0
-                volume_5min = 0
-                price_change_5m = 0
-                price_change_1h = 0
-                price_usd = 0
-                price_eth = 0
-                total_supply = "0"
-                pair_created_at = None
-                holder_count = 0
-                owner_percentage = 100.0
-                buy_tax = None
-                sell_tax = None
-
-                # Note: Filter.py enrichira avec DexScreener uniquement pour tokens
-                # qui passent les vérifications on-chain (contract verified, etc.)
-
-                # Insérer en DB avec toutes les données (schéma complet)
-                cursor.execute('''
+                new_tokens, rejected = self.preselector.preselect(new_tokens)
+                rejected_preselection = len(rejected)
+                for address, reason in rejected.items():
+                    self.logger.debug(f"🚫 Présélection {address[:10]}...: {reason}")
+                # Re-vérifiés après PRESELECTION_RECHECK_MINUTES tant qu'ils sont dans la fenêtre
+                self._mark_tokens(list(rejected), QUEUE_REJECTED)
+            except Exception as e:
+                self.logger.warning(f"⚠️  Présélection on-chain indisponible, batch conservé: {e}")
+
+        if not new_tokens:
+            self.logger.info(
+                f"📊 Batch traité: 0 nouveaux | {existing_count} déjà connus | "
+                f"{rejected_preselection} rejetés (présélection)"
+            )
+            return
+
+        # Métadonnées ERC20 de tout le batch en Multicall3, avant d'ouvrir la base
+        batch_metadata = self.get_tokens_metadata([t['token_address'] for t in new_tokens])
+        default_metadata = {'symbol': '???', 'name': 'Unknown', 'decimals': 18, 'total_supply': 0}
+
+        rows = [
+            self._build_token_row(
+                token_data,
+                batch_metadata.get(to_checksum_address(token_data['token_address']), default_metadata)
+            )
+            for token_data in new_tokens
+        ]
+
+        # Écriture en une transaction courte
+        conn = sqlite3.connect(self.db_path)
+        try:
+            changes_before = conn.total_changes
+            with conn:
+                conn.executemany('''
                     INSERT INTO discovered_tokens
                     (token_address, symbol, name, decimals, total_supply, pair_address, base_token,
                      factory, block_created, age_hours, liquidity, market_cap, volume_24h, volume_1h,
                      volume_5min, price_change_5m, price_change_1h, price_usd, price_eth, pair_created_at,
-                     holder_count, owner_percentage, buy_tax, sell_tax)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    token_data['token_address'],
-                    metadata['symbol'],
-                    metadata['name'],
-                    metadata['decimals'],
-                    total_supply,
-                    token_data['pair_address'],
-                    token_data['base_token'],
-                    token_data['factory_name'],
-                    token_data['block_created'],
-                    token_data['age_hours'],
-                    liquidity,
-                    market_cap,
-                    volume_24h,
-                    volume_1h,
-                    volume_5min,
-                    price_change_5m,
-                    price_change_1h,
-                    price_usd,
-                    price_eth,
-                    pair_created_at,
-                    holder_count,
-                    owner_percentage,
-                    buy_tax,
-                    sell_tax
-                ))
-
-                new_count += 1
+                     holder_count, owner_percentage, buy_tax, sell_tax, owner_renounced)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(token_address) DO NOTHING
+                ''', rows)
+            new_count = conn.total_changes - changes_before
+        except Exception as e:
+            self.logger.warning(f"⚠️  Erreur insertion batch ({len(rows)} tokens): {e}")
+            return
+        finally:
+            conn.close()
 
-            except Exception as e:
-                self.logger.warning(f"⚠️  Erreur traitement token: {e}")
-                continue
-
-        conn.commit()
-        conn.close()
+        # Lignes ignorées par ON CONFLICT = insérées entre-temps par un autre process
+        existing_count += len(rows) - new_count
+        self.known_tokens.update(t['token_address'] for t in new_tokens)
+        self._mark_tokens([t['token_address'] for t in new_tokens], QUEUE_DONE)
 
         self.logger.info(
             f"📊 Batch traité: {new_count} nouveaux | {existing_count} déjà connus | "
@@ -563,6 +776,12 @@ class UnifiedScanner:
         """Boucle principale du scanner"""
         self.logger.info("Scanner démarré...")
 
+        if self.scanner_mode == 'ws':
+            if self.ws_url:
+                await self._run_push()
+                return
+            self.logger.warning("⚠️  SCANNER_MODE=ws sans RPC_WS_URL, passage en mode polling")
+
         while True:
             try:
                 # Scanner les tokens
@@ -584,6 +803,104 @@ class UnifiedScanner:
                 self.logger.error(f"❌ Erreur dans run(): {e}")
                 await asyncio.sleep(self.scan_delay)
 
+    # ==================== MODE PUSH (WebSocket) ====================
+
+    async def _on_pushed_logs(self, logs: List[Dict]):
+        """Logs de création reçus en push: décodage + stockage immédiat"""
+        # Logs annulés par une réorganisation (removed): paires déjà stockées retirées
+        removed = [dict(log, removed=False) for log in logs if log.get('removed')]
+        if removed:
+            self._forget_pair_events(self._to_pair_events(self._decode_pair_created_events(removed)))
+
+        events = self._to_pair_events(self._decode_pair_created_events(logs))
+        if not events:
+            return
+
+        self._store_pair_events(events)
+        self.metadata_cache.put_pairs(events)
+        for event in events:
+            self.logger.info(
+                f"⚡ Nouvelle paire {event['factory_name']}: {event['token_address'][:10]}... "
+                f"(bloc {event['block_created']})"
+            )
+
+        # Fenêtre ouverte dès la création: envoyer directement au traitement du batch
+        if self.min_token_age_hours <= 0 and self.ws_listener and self.ws_listener.last_head:
+            _, head_timestamp = self.ws_listener.last_head
+            for event in events:
+                created_timestamp = self.block_index.timestamp_of(event['block_created'])
+                event['age_hours'] = max(0.0, (head_timestamp - created_timestamp) / 3600)
+                event['pair_created_at'] = datetime.fromtimestamp(
+                    created_timestamp, tz=timezone.utc
+                ).strftime('%Y-%m-%d %H:%M:%S')
+            await self.process_token_batch(events)
+
+    async def _on_pushed_head(self, number: int, timestamp: int, block_hash: str = None, parent_hash: str = None):
+        """newHeads: tête vérifiée par le head tracker (réorganisation → rollback) + avancée périodique des curseurs"""
+        if block_hash and parent_hash:
+            # Filiation contrôlée comme en polling; le tracker alimente aussi l'index de timestamps
+            await asyncio.to_thread(self.head_tracker.record, number, block_hash, parent_hash, timestamp)
+        else:
+            self.block_index.record(number, timestamp)
+
+        # Curseurs limités aux blocs confirmés: après reconnexion, le backfill relit la zone non sûre
+        synced_to = self.head_tracker.confirmed_block(number - 1)
+        if synced_to - self._push_cursor_block >= PUSH_CURSOR_FLUSH_BLOCKS:
+            for factory in self.factories:
+                self._set_cursor(factory, synced_to)
+            self._push_cursor_block = synced_to
+
+    async def _on_push_connect(self):
+        """(Re)connexion WebSocket: combler le trou depuis les curseurs via le chemin HTTP"""
+        # Tête vérifiée (réorganisation pendant la coupure → rollback), backfill jusqu'au dernier
+        # bloc confirmé comme le polling: les curseurs ne dépassent jamais la zone sûre
+        current_block, current_timestamp = await asyncio.to_thread(self.head_tracker.update)
+        from_block, _ = self._window_bounds(current_timestamp)
+        confirmed_block = self.head_tracker.confirmed_block(current_block)
+        await asyncio.to_thread(self._sync_factory_events, from_block, confirmed_block)
+        self._push_cursor_block = confirmed_block
+
+    async def _run_push(self):
+        """
+        Mode push: le flux WebSocket alimente pair_events en continu; la fenêtre
+        d'âge (tokens de 2h à 12h) reste évaluée à chaque tick sur le stockage local.
+        Si le flux tombe, chaque tick repasse par la synchronisation HTTP (polling).
+        """
+        self.ws_listener = WebSocketLogListener(
+            ws_url=self.ws_url,
+            addresses=self.factory_router.addresses,
+            topics=self.factory_router.topics,
+            on_logs=self._on_pushed_logs,
+            on_head=self._on_pushed_head,
+            on_connect=self._on_push_connect,
+            logger=self.logger
+        )
+        listener_task = asyncio.create_task(self.ws_listener.run())
+        self.logger.info(f"📡 Mode push WebSocket ({self.ws_url.split('?')[0]})")
+
+        try:
+            while True:
+                try:
+                    if self.ws_listener.healthy and self.ws_listener.last_head:
+                        tokens = self.scan_tokens_in_age_window(sync=False, head=self.ws_listener.last_head)
+                    else:
+                        self.logger.info("📴 Flux WebSocket indisponible, scan en polling")
+                        tokens = self.scan_tokens_in_age_window()
+
+                    if tokens:
+                        await self.process_token_batch(tokens)
+                    else:
+                        self.logger.info("Aucun token trouvé dans cette fenêtre")
+
+                    await asyncio.sleep(self.scan_delay)
+
+                except Exception as e:
+                    self.logger.error(f"❌ Erreur dans _run_push(): {e}")
+                    await asyncio.sleep(self.scan_delay)
+        finally:
+            self.ws_listener.stop()
+            listener_task.cancel()
+
 
 def main():
     """Point d'entrée"""
@@ -23,9 +23,11 @@ from eth_account import Account
 from dotenv import load_dotenv
 from web3_utils import (
     BaseWeb3Manager, UniswapV3Manager,
-    DexScreenerAPI, CoinGeckoAPI
+    DexScreenerAPI
 )
 from honeypot_checker import HoneypotChecker
+from eth_price_oracle import get_eth_price_oracle
+from rate_limiter import PRIORITY_HIGH
 
 load_dotenv(PROJECT_DIR / 'config' / '.env', override=True)
 
@@ -117,7 +119,8 @@ class RealTrader:
 
             self.uniswap = UniswapV3Manager(self.web3_manager)
             self.dexscreener = DexScreenerAPI()
-            self.coingecko = CoinGeckoAPI(os.getenv('COINGECKO_API_KEY'))
+            self.dexscreener.priority = PRIORITY_HIGH  # Prix des positions avant l'enrichissement du Filter
+            self.eth_oracle = get_eth_price_oracle(self.web3_manager.w3)
             self.honeypot_checker = HoneypotChecker()
         except Exception as e:
             self.logger.error(f"Erreur initialisation Web3: {e}")
@@ -709,6 +712,13 @@ class RealTrader:
                     )
                 return None
 
+            # Données DexScreener des 5 candidats en une seule requête (cache partagé avec le Filter)
+            market = {}
+            try:
+                market = self.dexscreener.get_tokens_info([row[0] for row in rows], fields=('volume', 'liquidity'))
+            except Exception as e:
+                self.logger.warning(f"DexScreener échec pour les candidats: {e}")
+
             # Calculer le momentum score pour chaque candidat
             candidates = []
             for row in rows:
@@ -732,11 +742,7 @@ class RealTrader:
                     continue
 
                 # Obtenir données fraîches pour momentum (avec fallback on-chain)
-                dex_data = None
-                try:
-                    dex_data = self.dexscreener.get_token_info(token_data['address'])
-                except Exception as e:
-                    self.logger.warning(f"DexScreener échec pour {token_data['symbol']}: {e}")
+                dex_data = market.get(token_data['address'].lower())
 
                 if not dex_data or dex_data.get('price_usd', 0) <= 0:
                     # Fallback on-chain pour momentum scoring
@@ -814,7 +820,7 @@ class RealTrader:
             dex_data = None
             for attempt in range(max_retries):
                 try:
-                    dex_data = self.dexscreener.get_token_info(token['address'])
+                    dex_data = self.dexscreener.get_token_info(token['address'], fields=('price',))
                     if dex_data and dex_data.get('price_usd', 0) > 0:
                         break
                     self.logger.warning(f"DexScreener tentative {attempt+1}/{max_retries}: données invalides")
@@ -981,101 +987,60 @@ class RealTrader:
             self.logger.warning(f"Erreur calcul momentum score: {e}")
             return 50.0  # Score neutre par défaut
 
+    def _eth_price_usd(self, allow_stale: bool = False) -> Optional[float]:
+        """
+        Prix ETH/USD de l'oracle on-chain (aucun appel réseau)
+
+        Returns:
+            Prix, ou None si inconnu (ou périmé sans allow_stale)
+        """
+        quote = self.eth_oracle.get_quote()
+        if quote['stale'] and quote['price']:
+            age = quote['age_seconds'] or 0
+            self.logger.warning(f"⚠️ Prix ETH périmé: ${quote['price']:,.2f} (bloc {quote['block']}, {age:.0f}s)")
+            if not allow_stale:
+                return None
+        return quote['price']
+
     def _get_onchain_token_data(self, token_address: str) -> Optional[Dict]:
         """
-        Fallback on-chain: obtient prix + liquidité via Uniswap V3 quote
+        Fallback on-chain: prix + liquidité depuis l'état des pools Uniswap V3
+        (slot0/liquidity/balances de tous les fee tiers en un seul aller-retour)
         Utilisé si DexScreener est down ou retourne données invalides
 
         Returns:
-            Dict avec price_usd, liquidity_usd estimés, ou None si échec
+            Dict avec price_usd, liquidity_usd, price_eth, depth_usd, fee, ou None si échec
         """
         try:
-            weth_address = "0x4200000000000000000000000000000000000006"
-
-            # 1. Obtenir prix via quote Uniswap (1 WETH → combien de tokens)
-            # Si le token vaut 0.0001 ETH, on recevra ~10,000 tokens pour 1 WETH
-            try:
-                amount_in_wei = 10**18  # 1 WETH
-                quote_result = self.uniswap.get_quote(
-                    token_in=weth_address,
-                    token_out=token_address,
-                    amount_in=amount_in_wei,
-                    fee=3000  # 0.3% pool
-                )
-
-                if not quote_result or quote_result <= 0:
-                    self.logger.warning(f"Quote invalide pour {token_address[:8]}...")
-                    return None
-
-                # Calculer prix token en ETH
-                token_decimals = 18  # Assumption par défaut
-                try:
-                    token_contract = self.web3_manager.w3.eth.contract(
-                        address=Web3.to_checksum_address(token_address),
-                        abi=self.web3_manager.erc20_abi
-                    )
-                    token_decimals = token_contract.functions.decimals().call()
-                except:
-                    pass  # Garder 18 si échec
-
-                tokens_per_eth = quote_result / (10 ** token_decimals)
-                price_eth = 1 / tokens_per_eth if tokens_per_eth > 0 else 0
-
-                # Convertir en USD (utiliser prix ETH cached ou estimation)
-                eth_price_usd = self.coingecko.get_eth_price()
-                if eth_price_usd == 0:
-                    eth_price_usd = 3000  # Fallback estimation
-
-                price_usd = price_eth * eth_price_usd
-
-            except Exception as e:
-                self.logger.warning(f"Échec quote Uniswap pour {token_address[:8]}...: {e}")
+            pool = self.uniswap.pool_reader.best_pool(token_address)
+            if not pool or pool['price'] <= 0:
+                self.logger.warning(f"Aucun pool V3 WETH actif pour {token_address[:8]}...")
                 return None
 
-            # 2. Estimer liquidité via réserves de la pool (si accessible)
-            # Note: Calcul simplifié, approximation grossière
-            liquidity_usd = 0
-            try:
-                # Obtenir l'adresse de la pool via factory
-                factory_abi = json.loads('[{"inputs":[{"internalType":"address","name":"","type":"address"},{"internalType":"address","name":"","type":"address"},{"internalType":"uint24","name":"","type":"uint24"}],"name":"getPool","outputs":[{"internalType":"address","name":"","type":"address"}],"stateMutability":"view","type":"function"}]')
-                factory_address = "0x33128a8fC17869897dcE68Ed026d694621f6FDfD"  # Uniswap V3 Factory Base
-
-                factory_contract = self.web3_manager.w3.eth.contract(
-                    address=Web3.to_checksum_address(factory_address),
-                    abi=factory_abi
-                )
-
-                pool_address = factory_contract.functions.getPool(
-                    Web3.to_checksum_address(weth_address),
-                    Web3.to_checksum_address(token_address),
-                    3000
-                ).call()
-
-                if pool_address != '0x0000000000000000000000000000000000000000':
-                    # Obtenir balance WETH de la pool comme proxy de liquidité
-                    weth_contract = self.web3_manager.w3.eth.contract(
-                        address=Web3.to_checksum_address(weth_address),
-                        abi=self.web3_manager.erc20_abi
-                    )
-                    weth_balance_wei = weth_contract.functions.balanceOf(pool_address).call()
-                    weth_balance = weth_balance_wei / 10**18
+            # Convertir en USD (prix ETH de l'oracle on-chain)
+            eth_price_usd = self._eth_price_usd()
+            if eth_price_usd is None:
+                return None
 
-                    # Liquidité estimée = 2x balance WETH (WETH + Token en USD)
-                    liquidity_usd = weth_balance * eth_price_usd * 2
+            price_eth = pool['price']
+            price_usd = price_eth * eth_price_usd
 
-            except Exception as e:
-                self.logger.debug(f"Estimation liquidité échouée (non critique): {e}")
-                # Garder liquidity_usd = 0, non bloquant
+            # Liquidité = 2x WETH détenu par le pool, profondeur = WETH pour ±2% de prix
+            liquidity_usd = pool['quote_balance'] * eth_price_usd * 2
+            depth_usd = pool['quote_depth'] * eth_price_usd
 
             self.logger.info(
                 f"🔗 Fallback on-chain OK: {token_address[:8]}... | "
-                f"Prix=${price_usd:.8f} | Liq~${liquidity_usd:,.0f}"
+                f"Prix=${price_usd:.8f} | Liq~${liquidity_usd:,.0f} | "
+                f"Profondeur ±2%=${depth_usd:,.0f} (fee {pool['fee'] / 10000:.2f}%)"
             )
 
             return {
                 'price_usd': price_usd,
                 'liquidity_usd': liquidity_usd,
                 'price_eth': price_eth,
+                'depth_usd': depth_usd,
+                'fee': pool['fee'],
                 'source': 'onchain_fallback'
             }
 
@@ -1309,9 +1274,10 @@ class RealTrader:
                 # On doit calculer combien de tokens on recevra pour position_size_wei ETH
 
                 # Methode correcte: utiliser le prix USD du token
-                eth_price_usd = self.coingecko.get_eth_price()
-                if eth_price_usd == 0:
-                    eth_price_usd = 3000  # Fallback
+                eth_price_usd = self._eth_price_usd()
+                if eth_price_usd is None:
+                    self.logger.error("Prix ETH indisponible ou périmé, achat annulé")
+                    return False
 
                 # Valeur de notre achat en USD
                 buy_value_usd = position_size_eth * eth_price_usd
@@ -1548,9 +1514,11 @@ class RealTrader:
                 slippage = slippage_percent / 100
 
                 # Calculer le minimum acceptable
-                eth_price = self.coingecko.get_eth_price()
-                if eth_price == 0:
-                    eth_price = 3000  # Valeur par defaut si erreur API
+                # Prix périmé accepté pour ne pas bloquer une sortie
+                eth_price = self._eth_price_usd(allow_stale=True)
+                if eth_price is None:
+                    self.logger.error("Prix ETH indisponible, vente reportée")
+                    return False
 
                 expected_weth = (position.current_price * position.amount) / eth_price
                 min_weth_out = int(expected_weth * (1 - slippage) * 10**18)
@@ -1637,25 +1605,23 @@ class RealTrader:
             return False
                        
     def update_positions(self):
-        """Met a jour toutes les positions avec checks complets et retry"""
+        """Met a jour toutes les positions avec checks complets"""
+        # Prix actuels de toutes les positions par lots, un seul passage par cycle: les
+        # reessais HTTP sont ceux de la session, un fournisseur en panne est coupe par
+        # son disjoncteur, et les tokens sans reponse sont redemandes au cycle suivant
+        market = {}
+        if self.positions:
+            try:
+                market = {k: v for k, v in self.dexscreener.get_tokens_info(list(self.positions), fields=('price',)).items() if v}
+            except Exception as e:
+                self.logger.error(f"Impossible de recuperer les prix: {e}")
+            if self.dexscreener.breaker.is_open():
+                self.logger.warning("⚠️ Circuit DexScreener ouvert: derniers prix connus conserves jusqu'a sa reprise")
+
         for address, position in list(self.positions.items()):
             try:
-                # Recuperer le prix actuel avec retry
-                dex_data = None
-                max_retries = 3
-                
-                for attempt in range(max_retries):
-                    try:
-                        dex_data = self.dexscreener.get_token_info(address)
-                        if dex_data:
-                            break
-                    except Exception as e:
-                        if attempt == max_retries - 1:
-                            self.logger.error(f"Impossible de recuperer le prix apres {max_retries} tentatives: {e}")
-                        else:
-                            self.logger.warning(f"Tentative {attempt + 1}/{max_retries} echouee, retry dans 2s")
-                            time.sleep(2)
-                
+                dex_data = market.get(address.lower())
+
                 if dex_data:
                     new_price = dex_data.get('price_usd', position.current_price)
 
@@ -1844,8 +1810,8 @@ class RealTrader:
         """Nettoie les ressources"""
         if hasattr(self, 'dexscreener'):
             self.dexscreener.close()
-        if hasattr(self, 'coingecko'):
-            self.coingecko.close()
+        if hasattr(self, 'eth_oracle'):
+            self.eth_oracle.stop()
         if hasattr(self, 'honeypot_checker'):
             self.honeypot_checker.close()
        
@@ -6,9 +6,71 @@ Utilisé en complément de l'on-chain fetcher quand les données sont incomplèt
 
 import time
 import requests
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 import threading
 
+from market_cache import get_market_cache
+from rate_limiter import get_rate_limiter, PRIORITY_NORMAL
+from circuit_breaker import get_circuit_breaker, CircuitOpenError
+
+WETH = "0x4200000000000000000000000000000000000006"
+
+DEXSCREENER_MAX_TOKENS_PER_REQUEST = 30  # Limite d'adresses par appel /tokens
+
+
+def fetch_dexscreener_pairs(session, base_url: str, addresses: List[str], limiter, breaker,
+                            priority: int = PRIORITY_NORMAL, rate_limit_timeout: float = None,
+                            max_tokens: int = DEXSCREENER_MAX_TOKENS_PER_REQUEST) -> Dict[str, List[Dict]]:
+    """
+    Paires DexScreener brutes par token, une requête /tokens/{a1,a2,...} par lot
+    de max_tokens adresses (200 tokens = 7 requêtes). Partagé par les clients
+    DexScreener du Filter (DexScreenerFreeAPI) et du Trader (web3_utils.DexScreenerAPI).
+
+    Args:
+        session: Session HTTP du client
+        base_url: URL de base de l'API (.../latest/dex)
+        addresses: Adresses en minuscules
+        limiter: Rate limiter partagé (bucket 'dexscreener')
+        breaker: Disjoncteur 'dexscreener'
+        priority / rate_limit_timeout: Priorité et attente max d'un jeton
+
+    Returns:
+        Dict {adresse minuscule: paires où le token est base ou quote}, lots en échec omis
+    """
+    results = {}
+    for start in range(0, len(addresses), max_tokens):
+        chunk = addresses[start:start + max_tokens]
+        # Circuit ouvert: lots restants omis sans attendre de timeout
+        if breaker.is_open():
+            break
+        # Quota épuisé: lot omis (non mis en cache, redemandé au prochain appel)
+        if not limiter.acquire('dexscreener', priority, rate_limit_timeout):
+            continue
+        try:
+            url = f"{base_url}/tokens/{','.join(chunk)}"
+
+            response = breaker.call(session.get, url, timeout=10)
+
+            if response.status_code != 200:
+                continue
+
+            # Redistribuer les paires à chaque token demandé (base ou quote de la paire)
+            pairs_by_token = {address: [] for address in chunk}
+            for pair in response.json().get('pairs') or []:
+                for side in ('baseToken', 'quoteToken'):
+                    address = (pair.get(side) or {}).get('address', '').lower()
+                    if address in pairs_by_token:
+                        pairs_by_token[address].append(pair)
+                        break
+            results.update(pairs_by_token)
+
+        except CircuitOpenError:
+            break
+        except Exception as e:
+            print(f"❌ DexScreener API error: {e}")
+
+    return results
+
 
 class BlockchairAPI:
     """
@@ -21,16 +83,18 @@ class BlockchairAPI:
     def __init__(self):
         self.session = requests.Session()
         self.session.headers.update({'User-Agent': 'BaseBot/1.0'})
-        self.last_call = 0
-        self.min_delay = 1.0  # 1 req/sec
+        self.limiter = get_rate_limiter()  # 1 req/sec partagé entre process
+        self.priority = PRIORITY_NORMAL
+        self.rate_limit_timeout = None  # Attente max d'un jeton (défaut: RATE_LIMIT_MAX_WAIT_SECONDS)
+        self.breaker = get_circuit_breaker('blockchair', probe=self._probe)
+
+    def _probe(self):
+        """Requête légère de la sonde du disjoncteur"""
+        return self.session.get(f"{self.BASE_URL}/stats", timeout=10)
 
-    def _rate_limit(self):
-        """Respecte le rate limit de 1 req/sec"""
-        now = time.time()
-        elapsed = now - self.last_call
-        if elapsed < self.min_delay:
-            time.sleep(self.min_delay - elapsed)
-        self.last_call = time.time()
+    def _rate_limit(self) -> bool:
+        """Respecte le rate limit de 1 req/sec (False si aucun jeton dans le délai)"""
+        return self.limiter.acquire('blockchair', self.priority, self.rate_limit_timeout)
 
     def get_holder_count(self, token_address: str) -> int:
         """
@@ -40,12 +104,13 @@ class BlockchairAPI:
             Nombre de holders (0 si erreur)
         """
         try:
-            self._rate_limit()
+            if self.breaker.is_open() or not self._rate_limit():
+                return 0
 
             url = f"{self.BASE_URL}/erc-20/{token_address}/dashboards/addresses"
             params = {'limit': 1}  # On veut juste le count
 
-            response = self.session.get(url, params=params, timeout=10)
+            response = self.breaker.call(self.session.get, url, params=params, timeout=10)
 
             if response.status_code == 200:
                 data = response.json()
@@ -55,6 +120,8 @@ class BlockchairAPI:
 
             return 0
 
+        except CircuitOpenError:
+            return 0
         except Exception as e:
             print(f"❌ Blockchair API error: {e}")
             return 0
@@ -88,6 +155,15 @@ class CoinGeckoFreeAPI:
         self.eth_price_cache = {'price': 3000.0, 'timestamp': 0}
         self.cache_ttl = 300
 
+        self.limiter = get_rate_limiter()  # Quota partagé entre process
+        self.priority = PRIORITY_NORMAL
+        self.rate_limit_timeout = None  # Attente max d'un jeton (défaut: RATE_LIMIT_MAX_WAIT_SECONDS)
+        self.breaker = get_circuit_breaker('coingecko', probe=self._probe)
+
+    def _probe(self):
+        """Requête légère de la sonde du disjoncteur"""
+        return self.session.get(f"{self.base_url}/ping", timeout=10)
+
     def get_eth_price(self) -> float:
         """
         Récupère le prix ETH en USD avec cache de 5min
@@ -101,11 +177,14 @@ class CoinGeckoFreeAPI:
             if now - self.eth_price_cache['timestamp'] < self.cache_ttl:
                 return self.eth_price_cache['price']
 
-            # Appel API
+            # Appel API (cache, même expiré, si le circuit est ouvert ou le quota épuisé)
+            if self.breaker.is_open() or not self.limiter.acquire('coingecko', self.priority, self.rate_limit_timeout):
+                return self.eth_price_cache['price']
+
             url = f"{self.base_url}/simple/price"
             params = {'ids': 'ethereum', 'vs_currencies': 'usd'}
 
-            response = self.session.get(url, params=params, timeout=10)
+            response = self.breaker.call(self.session.get, url, params=params, timeout=10)
 
             if response.status_code == 200:
                 data = response.json()
@@ -119,6 +198,8 @@ class CoinGeckoFreeAPI:
 
             return 3000.0  # Fallback
 
+        except CircuitOpenError:
+            return self.eth_price_cache['price']
         except Exception as e:
             print(f"❌ CoinGecko API error: {e}")
             return 3000.0
@@ -138,9 +219,12 @@ class CoinGeckoFreeAPI:
         try:
             # CoinGecko nécessite l'ID du token (pas l'adresse directement)
             # Endpoint /coins/{platform}/contract/{address}
+            if self.breaker.is_open() or not self.limiter.acquire('coingecko', self.priority, self.rate_limit_timeout):
+                return None
+
             url = f"{self.base_url}/coins/{platform}/contract/{token_address}"
 
-            response = self.session.get(url, timeout=10)
+            response = self.breaker.call(self.session.get, url, timeout=10)
 
             if response.status_code == 200:
                 data = response.json()
@@ -160,6 +244,8 @@ class CoinGeckoFreeAPI:
 
             return None
 
+        except CircuitOpenError:
+            return None
         except Exception as e:
             print(f"❌ CoinGecko token data error: {e}")
             return None
@@ -182,24 +268,16 @@ class BaseScanAPI:
         self.session = requests.Session()
         self.session.headers.update({'User-Agent': 'BaseBot/1.0'})
 
-        # Rate limiting (5 req/sec)
-        self.last_calls = []
-        self.max_calls_per_second = 4  # Conservateur (5 officiellement)
-
-    def _rate_limit(self):
-        """Respecte le rate limit de 5 req/sec"""
-        now = time.time()
-
-        # Supprimer appels > 1 sec
-        self.last_calls = [t for t in self.last_calls if now - t < 1.0]
-
-        # Si limite atteinte, attendre
-        if len(self.last_calls) >= self.max_calls_per_second:
-            sleep_time = 1.0 - (now - self.last_calls[0])
-            if sleep_time > 0:
-                time.sleep(sleep_time)
+        # Rate limiting (5 req/sec, 4 par défaut par prudence), partagé entre process
+        self.limiter = get_rate_limiter()
+        self.priority = PRIORITY_NORMAL
+        self.rate_limit_timeout = None  # Attente max d'un jeton (défaut: RATE_LIMIT_MAX_WAIT_SECONDS)
+        # Sans sonde (clé requise): reprise testée par un appel réel en semi-ouvert
+        self.breaker = get_circuit_breaker('basescan')
 
-        self.last_calls.append(time.time())
+    def _rate_limit(self) -> bool:
+        """Respecte le rate limit de 5 req/sec (False si aucun jeton dans le délai)"""
+        return self.limiter.acquire('basescan', self.priority, self.rate_limit_timeout)
 
     def get_token_holder_list(self, token_address: str, limit: int = 100) -> Optional[Dict]:
         """
@@ -212,7 +290,8 @@ class BaseScanAPI:
             return None
 
         try:
-            self._rate_limit()
+            if self.breaker.is_open() or not self._rate_limit():
+                return None
 
             params = {
                 'module': 'token',
@@ -223,7 +302,7 @@ class BaseScanAPI:
                 'apikey': self.api_key
             }
 
-            response = self.session.get(self.BASE_URL, params=params, timeout=10)
+            response = self.breaker.call(self.session.get, self.BASE_URL, params=params, timeout=10)
 
             if response.status_code == 200:
                 data = response.json()
@@ -246,6 +325,8 @@ class BaseScanAPI:
 
             return None
 
+        except CircuitOpenError:
+            return None
         except Exception as e:
             print(f"❌ BaseScan API error: {e}")
             return None
@@ -258,67 +339,90 @@ class DexScreenerFreeAPI:
     """
 
     BASE_URL = "https://api.dexscreener.com/latest/dex"
+    MAX_TOKENS_PER_REQUEST = DEXSCREENER_MAX_TOKENS_PER_REQUEST
 
     def __init__(self):
         self.session = requests.Session()
         self.session.headers.update({'User-Agent': 'BaseBot/1.0'})
+        self.cache = get_market_cache()  # Partagé avec le Trader (SQLite WAL commun)
+        self.limiter = get_rate_limiter()  # 300 req/min partagées entre Scanner, Filter et Trader
+        self.priority = PRIORITY_NORMAL
+        self.rate_limit_timeout = None  # Attente max d'un jeton (défaut: RATE_LIMIT_MAX_WAIT_SECONDS)
+        self.breaker = get_circuit_breaker('dexscreener', probe=self._probe)
+
+    def _probe(self):
+        """Requête légère de la sonde du disjoncteur"""
+        return self.session.get(f"{self.BASE_URL}/tokens/{WETH}", timeout=10)
 
-    def get_token_info(self, token_address: str, chain: str = "base") -> Optional[Dict]:
+    def get_token_info(self, token_address: str, chain: str = "base", fields=None) -> Optional[Dict]:
         """
         Récupère les infos d'un token via DexScreener
 
         Returns:
             Dict avec liquidity, volume_24h, price_usd, price_change_5m/1h/24h, etc.
         """
-        try:
-            url = f"{self.BASE_URL}/tokens/{token_address}"
+        return self.get_tokens_info([token_address], chain, fields).get(token_address.lower())
 
-            response = self.session.get(url, timeout=10)
-
-            if response.status_code == 200:
-                data = response.json()
+    def _fetch_pairs(self, addresses: List[str]) -> Dict[str, List[Dict]]:
+        """Paires brutes par token, par lots de MAX_TOKENS_PER_REQUEST adresses (fetch_dexscreener_pairs)"""
+        return fetch_dexscreener_pairs(self.session, self.BASE_URL, addresses, self.limiter, self.breaker,
+                                       self.priority, self.rate_limit_timeout, self.MAX_TOKENS_PER_REQUEST)
 
-                if 'pairs' in data and data['pairs'] and len(data['pairs']) > 0:
-                    # Prendre le pool avec le plus de liquidité sur Base
-                    base_pairs = [p for p in data['pairs'] if p.get('chainId') == chain]
-
-                    if not base_pairs:
-                        return None
-
-                    # Trier par liquidité
-                    pair = sorted(base_pairs, key=lambda x: x.get('liquidity', {}).get('usd', 0), reverse=True)[0]
-
-                    liquidity = pair.get('liquidity', {})
-                    volume = pair.get('volume', {})
-                    price_change = pair.get('priceChange', {})
-
-                    return {
-                        'pair_address': pair.get('pairAddress', ''),
-                        'dex_id': pair.get('dexId', ''),
-                        'liquidity_usd': float(liquidity.get('usd', 0)),
-                        'liquidity_base': float(liquidity.get('base', 0)),
-                        'liquidity_quote': float(liquidity.get('quote', 0)),
-                        'volume_24h': float(volume.get('h24', 0)),
-                        'volume_6h': float(volume.get('h6', 0)),
-                        'volume_1h': float(volume.get('h1', 0)),
-                        'price_usd': float(pair.get('priceUsd', 0)),
-                        'price_native': float(pair.get('priceNative', 0)),
-                        'price_change_5m': float(price_change.get('m5', 0)),
-                        'price_change_1h': float(price_change.get('h1', 0)),
-                        'price_change_6h': float(price_change.get('h6', 0)),
-                        'price_change_24h': float(price_change.get('h24', 0)),
-                        'fdv': float(pair.get('fdv', 0)),
-                        'market_cap': float(pair.get('marketCap', 0)),
-                        'pair_created_at': pair.get('pairCreatedAt', 0),
-                        'info': pair.get('info', {}),
-                        'boosts': pair.get('boosts', {})
-                    }
+    def get_tokens_info(self, token_addresses: List[str], chain: str = "base", fields=None) -> Dict[str, Optional[Dict]]:
+        """
+        Récupère les infos de plusieurs tokens via le cache de marché partagé
+        (HTTP groupé seulement pour les tokens sans valeur assez récente)
 
-            return None
+        Args:
+            fields: Champs utilisés ('price', 'volume', 'liquidity', 'market_cap', 'pair'),
+                    fixent la fraîcheur exigée (tous par défaut)
 
-        except Exception as e:
-            print(f"❌ DexScreener API error: {e}")
-            return None
+        Returns:
+            Dict {adresse minuscule: infos du pool le plus liquide sur la chaîne, ou None}
+        """
+        addresses = list(dict.fromkeys(address.lower() for address in token_addresses))
+        if self.cache is not None:
+            pairs_by_token = self.cache.get_many('dexscreener', addresses, self._fetch_pairs, fields)
+        else:
+            pairs_by_token = self._fetch_pairs(addresses)
+
+        results = {}
+        for address in addresses:
+            base_pairs = [p for p in pairs_by_token.get(address) or [] if p.get('chainId') == chain]
+            # Prendre le pool avec le plus de liquidité sur Base
+            results[address] = self._parse_pair(
+                max(base_pairs, key=lambda x: x.get('liquidity', {}).get('usd', 0))
+            ) if base_pairs else None
+
+        return results
+
+    @staticmethod
+    def _parse_pair(pair: Dict) -> Dict:
+        liquidity = pair.get('liquidity', {})
+        volume = pair.get('volume', {})
+        price_change = pair.get('priceChange', {})
+
+        return {
+            'pair_address': pair.get('pairAddress', ''),
+            'dex_id': pair.get('dexId', ''),
+            'liquidity_usd': float(liquidity.get('usd', 0)),
+            'liquidity_base': float(liquidity.get('base', 0)),
+            'liquidity_quote': float(liquidity.get('quote', 0)),
+            'volume_24h': float(volume.get('h24', 0)),
+            'volume_6h': float(volume.get('h6', 0)),
+            'volume_1h': float(volume.get('h1', 0)),
+            'price_usd': float(pair.get('priceUsd', 0)),
+            'price_native': float(pair.get('priceNative', 0)),
+            'price_change_5m': float(price_change.get('m5', 0)),
+            'price_change_1h': float(price_change.get('h1', 0)),
+            'price_change_6h': float(price_change.get('h6', 0)),
+            'price_change_24h': float(price_change.get('h24', 0)),
+            'fdv': float(pair.get('fdv', 0)),
+            'market_cap': float(pair.get('marketCap', 0)),
+            'pair_created_at': pair.get('pairCreatedAt', 0),
+            'info': pair.get('info', {}),
+            'boosts': pair.get('boosts', {})
+        }
 
 
 if __name__ == "__main__":
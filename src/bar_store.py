@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Bar Store - Barres OHLCV 1 minute par paire, alimentées incrémentalement par les Swap
+Chaque paire suivie garde un anneau de N minutes en tableaux numpy (prix base/token,
+volumes base, montants échangés pour le VWAP, nombre d'achats/ventes).
+Seuls les Swap postérieurs au dernier bloc ingéré sont à lire; les métriques
+de fenêtre (volume, VWAP, Δ prix) se calculent ensuite sur les barres en mémoire.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+DEFAULT_BAR_MINUTES = 120  # Profondeur de l'anneau (couvre la fenêtre 1h + référence)
+DEFAULT_MAX_PAIRS = 500  # Paires suivies simultanément (LRU au-delà)
+
+
+class PairBars:
+    """
+    Anneau de barres 1 minute d'une paire.
+
+    Emplacement = minute % capacité; une barre est valide si minutes[slot] == minute.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.minutes = np.full(capacity, -1, dtype=np.int64)
+        self.open = np.zeros(capacity)
+        self.high = np.zeros(capacity)
+        self.low = np.zeros(capacity)
+        self.close = np.zeros(capacity)
+        self.volume = np.zeros(capacity)  # Volume base (in + out)
+        self.base_traded = np.zeros(capacity)  # Σ base échangé (numérateur VWAP)
+        self.token_traded = np.zeros(capacity)  # Σ token échangé (dénominateur VWAP)
+        self.buys = np.zeros(capacity, dtype=np.int32)
+        self.sells = np.zeros(capacity, dtype=np.int32)
+
+        self.synced_block = None  # Dernier bloc dont les Swap sont intégrés
+        self.last_minute = -1
+
+    def _reset(self, slot: int, minute: int):
+        self.minutes[slot] = minute
+        self.open[slot] = self.high[slot] = self.low[slot] = self.close[slot] = 0.0
+        self.volume[slot] = self.base_traded[slot] = self.token_traded[slot] = 0.0
+        self.buys[slot] = self.sells[slot] = 0
+
+    def append(self, timestamps, volumes, base_amounts, token_amounts, is_buy, synced_block: int):
+        """
+        Intègre des swaps triés dans l'ordre de la chaîne.
+
+        Args:
+            timestamps: Timestamps des swaps (secondes)
+            volumes: Volume base de chaque swap
+            base_amounts / token_amounts: Montants échangés (prix = base / token)
+            is_buy: True si le token a été acheté (base entrant)
+            synced_block: Dernier bloc couvert par ce lot (même sans swap)
+        """
+        self.synced_block = synced_block
+
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        if timestamps.size == 0:
+            return
+
+        volumes = np.asarray(volumes, dtype=np.float64)
+        base_amounts = np.asarray(base_amounts, dtype=np.float64)
+        token_amounts = np.asarray(token_amounts, dtype=np.float64)
+        is_buy = np.asarray(is_buy, dtype=bool)
+
+        # Swaps plus vieux que l'anneau: ignorés
+        minutes = timestamps // 60
+        keep = minutes > max(self.last_minute, minutes[-1]) - self.capacity
+        if not keep.all():
+            minutes, volumes, base_amounts, token_amounts, is_buy = (
+                minutes[keep], volumes[keep], base_amounts[keep], token_amounts[keep], is_buy[keep]
+            )
+            if minutes.size == 0:
+                return
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            prices = np.where(token_amounts > 0, base_amounts / token_amounts, np.nan)
+
+        # Regroupement par minute (entrée triée): une réduction par groupe
+        starts = np.flatnonzero(np.r_[True, minutes[1:] != minutes[:-1]])
+        ends = np.r_[starts[1:], minutes.size] - 1
+
+        group_volume = np.add.reduceat(volumes, starts)
+        group_base = np.add.reduceat(base_amounts, starts)
+        group_token = np.add.reduceat(token_amounts, starts)
+        group_buys = np.add.reduceat(is_buy.astype(np.int32), starts)
+        group_count = ends - starts + 1
+
+        for index, start in enumerate(starts):
+            minute = int(minutes[start])
+            group_prices = prices[start:ends[index] + 1]
+            group_prices = group_prices[~np.isnan(group_prices)]
+
+            slot = minute % self.capacity
+            fresh = self.minutes[slot] != minute
+            if fresh:
+                self._reset(slot, minute)
+
+            if group_prices.size:
+                if fresh or self.open[slot] == 0:
+                    self.open[slot] = group_prices[0]
+                    self.high[slot] = group_prices.max()
+                    self.low[slot] = group_prices.min()
+                else:
+                    self.high[slot] = max(self.high[slot], group_prices.max())
+                    self.low[slot] = min(self.low[slot], group_prices.min())
+                self.close[slot] = group_prices[-1]
+
+            self.volume[slot] += group_volume[index]
+            self.base_traded[slot] += group_base[index]
+            self.token_traded[slot] += group_token[index]
+            self.buys[slot] += group_buys[index]
+            self.sells[slot] += group_count[index] - group_buys[index]
+
+            self.last_minute = max(self.last_minute, minute)
+
+    def _mask(self, from_minute: int, to_minute: int) -> np.ndarray:
+        """Barres valides de la plage de minutes ]from_minute, to_minute]"""
+        return (self.minutes > from_minute) & (self.minutes <= to_minute)
+
+    def window(self, from_minute: int, to_minute: int) -> Dict:
+        """Agrégats de la plage ]from_minute, to_minute]"""
+        mask = self._mask(from_minute, to_minute)
+        token_traded = float(self.token_traded[mask].sum())
+
+        return {
+            'volume': float(self.volume[mask].sum()),
+            'vwap': float(self.base_traded[mask].sum()) / token_traded if token_traded else 0.0,
+            'buys': int(self.buys[mask].sum()),
+            'sells': int(self.sells[mask].sum()),
+            'bars': int(mask.sum())
+        }
+
+
+class BarStore:
+    """
+    Barres de toutes les paires suivies.
+
+    - append(): intégration incrémentale des nouveaux Swap d'une paire
+    - window(): agrégats (volume, VWAP, achats/ventes) calculés sur les barres en mémoire
+    - retain(): évince les paires sorties de l'ensemble suivi
+    - forget_from(): réorganisation, les paires touchées sont relues au prochain passage
+    """
+
+    def __init__(self, minutes: int = None, max_pairs: int = None):
+        self.minutes = int(minutes or os.getenv('BAR_STORE_MINUTES', DEFAULT_BAR_MINUTES))
+        self.max_pairs = int(max_pairs or os.getenv('BAR_STORE_MAX_PAIRS', DEFAULT_MAX_PAIRS))
+
+        self.pairs = OrderedDict()  # adresse minuscule → PairBars, ordre LRU
+        self._lock = threading.Lock()
+
+    def get(self, pair_address: str) -> Optional[PairBars]:
+        with self._lock:
+            bars = self.pairs.get(pair_address.lower())
+            if bars is not None:
+                self.pairs.move_to_end(pair_address.lower())
+            return bars
+
+    def synced_block(self, pair_address: str) -> Optional[int]:
+        """Dernier bloc intégré pour la paire (None si non suivie)"""
+        bars = self.get(pair_address)
+        return bars.synced_block if bars is not None else None
+
+    def append(self, pair_address: str, timestamps, volumes, base_amounts, token_amounts, is_buy,
+               synced_block: int, reset: bool = False):
+        """
+        Intègre de nouveaux swaps (voir PairBars.append).
+
+        Args:
+            reset: Repartir d'un anneau vide (première lecture ou historique trop ancien)
+        """
+        key = pair_address.lower()
+        with self._lock:
+            bars = None if reset else self.pairs.get(key)
+            if bars is None:
+                bars = PairBars(self.minutes)
+                self.pairs[key] = bars
+            self.pairs.move_to_end(key)
+
+            while len(self.pairs) > self.max_pairs:
+                self.pairs.popitem(last=False)
+
+            bars.append(timestamps, volumes, base_amounts, token_amounts, is_buy, synced_block)
+
+    def window(self, pair_address: str, now_timestamp: float, minutes: int, offset_minutes: int = 0) -> Dict:
+        """
+        Agrégats sur `minutes` minutes se terminant `offset_minutes` avant maintenant.
+
+        Returns:
+            dict volume (base), vwap, buys, sells, bars (vide si paire non suivie)
+        """
+        bars = self.get(pair_address)
+        if bars is None:
+            return {'volume': 0.0, 'vwap': 0.0, 'buys': 0, 'sells': 0, 'bars': 0}
+
+        to_minute = int(now_timestamp // 60) - offset_minutes
+        return bars.window(to_minute - minutes, to_minute)
+
+    def retain(self, pair_addresses: Iterable[str]):
+        """Ne garde que les paires encore suivies (appelé par le Filter à chaque cycle)"""
+        keep = {address.lower() for address in pair_addresses}
+        with self._lock:
+            for key in [key for key in self.pairs if key not in keep]:
+                del self.pairs[key]
+
+    def forget_from(self, block: int):
+        """Réorganisation: paires ayant intégré des blocs >= block oubliées (relues entièrement)"""
+        with self._lock:
+            for key in [key for key, bars in self.pairs.items()
+                        if bars.synced_block is not None and bars.synced_block >= block]:
+                del self.pairs[key]
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {'pairs': len(self.pairs), 'minutes': self.minutes, 'max_pairs': self.max_pairs}
+
+
+_shared_store = None
+_shared_store_lock = threading.Lock()
+
+
+def get_bar_store() -> BarStore:
+    """Store partagé par le process (Filter, Trader et OnChainFetcher lisent les mêmes barres)"""
+    global _shared_store
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = BarStore()
+        return _shared_store
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Block Time Index - Conversion bloc ↔ timestamp sans approximation BLOCKS_PER_HOUR
+Index échantillonné (un bloc tous les sample_interval) avec interpolation linéaire,
+rempli paresseusement par lots de eth_getBlockByNumber (rpc_batch).
+Conversions en O(log n) dans les deux sens (bisect).
+"""
+
+import bisect
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from rpc_batch import batch_call
+
+DEFAULT_SAMPLE_INTERVAL = 900  # Blocs entre deux échantillons (~30 min sur Base)
+DEFAULT_BLOCK_TIME = 2.0  # Estimation initiale (secondes/bloc) avant le premier échantillon
+MAX_SAMPLES = 5000  # Borne mémoire de l'index
+MAX_EXTEND_ATTEMPTS = 5
+
+
+class BlockTimeIndex:
+    """
+    Index bloc → timestamp.
+
+    - timestamp_of(bloc): timestamp exact si échantillonné, interpolé sinon
+    - block_at(timestamp): premier bloc dont le timestamp est >= timestamp
+    - observe_head(): (bloc courant, timestamp) en un seul appel RPC
+    """
+
+    def __init__(self, w3, sample_interval: int = DEFAULT_SAMPLE_INTERVAL, max_samples: int = MAX_SAMPLES):
+        """
+        Args:
+            w3: Instance Web3 (avec BatchingHTTPProvider, les lectures partent en un lot JSON-RPC)
+            sample_interval: Espacement des échantillons en blocs
+            max_samples: Nombre maximum d'échantillons conservés (hors grille évincés d'abord,
+                puis les plus anciens)
+        """
+        self.w3 = w3
+        self.sample_interval = max(1, sample_interval)
+        self.max_samples = max_samples
+
+        self.blocks = []  # Numéros de bloc triés
+        self.timestamps = []  # Timestamps correspondants
+        self._lock = threading.Lock()
+
+        self.stats = {'rpc_blocks': 0, 'batches': 0}
+
+    # ==================== LECTURES RPC ====================
+
+    def _fetch_timestamps(self, block_numbers: List[int]) -> Dict[int, int]:
+        """Timestamps d'une liste de blocs (un lot JSON-RPC si le provider le permet)"""
+        if not block_numbers:
+            return {}
+
+        self.stats['rpc_blocks'] += len(block_numbers)
+        self.stats['batches'] += 1
+
+        responses = batch_call(self.w3, [('eth_getBlockByNumber', [hex(block), False]) for block in block_numbers])
+
+        results = {}
+        for response in responses:
+            block = response.get('result')
+            if block:
+                number = block['number']
+                timestamp = block['timestamp']
+                results[int(number, 16) if isinstance(number, str) else number] = \
+                    int(timestamp, 16) if isinstance(timestamp, str) else timestamp
+        return results
+
+    def _insert(self, samples: Dict[int, int]):
+        """Insère des échantillons (bloc, timestamp) en gardant l'ordre"""
+        with self._lock:
+            for block, timestamp in samples.items():
+                index = bisect.bisect_left(self.blocks, block)
+                if index < len(self.blocks) and self.blocks[index] == block:
+                    continue
+                self.blocks.insert(index, block)
+                self.timestamps.insert(index, timestamp)
+
+            self._evict()
+
+    def _evict(self):
+        """Ramène l'index sous max_samples (verrou tenu)"""
+        overflow = len(self.blocks) - self.max_samples
+        if overflow <= 0:
+            return
+
+        # D'abord les échantillons hors grille (têtes, lectures ponctuelles), le plus récent gardé
+        off_grid = [index for index, block in enumerate(self.blocks[:-1]) if block % self.sample_interval]
+        dropped = set(off_grid[:overflow])
+        if dropped:
+            self.blocks = [block for index, block in enumerate(self.blocks) if index not in dropped]
+            self.timestamps = [ts for index, ts in enumerate(self.timestamps) if index not in dropped]
+
+        # Puis les plus anciens si la grille seule dépasse la borne
+        overflow = len(self.blocks) - self.max_samples
+        if overflow > 0:
+            del self.blocks[:overflow]
+            del self.timestamps[:overflow]
+
+    def observe_head(self) -> Tuple[int, int]:
+        """
+        Lit le dernier bloc et l'ajoute à l'index.
+
+        Returns:
+            (numéro du bloc courant, timestamp)
+        """
+        block = self.w3.eth.get_block('latest')
+        self._insert({block['number']: block['timestamp']})
+        return block['number'], block['timestamp']
+
+    def record(self, block: int, timestamp: int):
+        """
+        Ajoute un échantillon déjà connu (ex: newHeads WebSocket, sans appel RPC).
+        Une tête hors grille à moins de sample_interval blocs de l'échantillon
+        précédent remplace la tête enregistrée avant elle: une tête par bloc ne
+        densifie pas l'index (ni n'évince les échantillons de la fenêtre de scan).
+        """
+        with self._lock:
+            if (len(self.blocks) >= 2 and block > self.blocks[-1]
+                    and self.blocks[-1] % self.sample_interval
+                    and block - self.blocks[-2] < self.sample_interval):
+                self.blocks[-1] = block
+                self.timestamps[-1] = timestamp
+                return
+        self._insert({block: timestamp})
+
+    def forget_from(self, block: int):
+        """Retire les échantillons >= block (réorganisation: timestamps à relire)"""
+        with self._lock:
+            index = bisect.bisect_left(self.blocks, block)
+            del self.blocks[index:]
+            del self.timestamps[index:]
+
+    def ensure_range(self, from_block: int, to_block: int):
+        """Garantit un échantillon tous les sample_interval blocs sur [from_block, to_block]"""
+        from_block = max(0, from_block)
+        first = (from_block // self.sample_interval) * self.sample_interval
+        wanted = list(range(first, to_block + 1, self.sample_interval))
+
+        with self._lock:
+            known = set(self.blocks)
+        missing = [block for block in wanted if block not in known]
+
+        if missing:
+            self._insert(self._fetch_timestamps(missing))
+
+    # ==================== CONVERSIONS ====================
+
+    def _average_block_time(self) -> float:
+        if len(self.blocks) < 2 or self.blocks[-1] == self.blocks[0]:
+            return DEFAULT_BLOCK_TIME
+        return (self.timestamps[-1] - self.timestamps[0]) / (self.blocks[-1] - self.blocks[0])
+
+    def timestamp_of(self, block: int) -> int:
+        """Timestamp d'un bloc (interpolé entre les deux échantillons voisins)"""
+        with self._lock:
+            covered = self.blocks and self.blocks[0] <= block <= self.blocks[-1]
+
+        if not covered:
+            if self.blocks and block > self.blocks[-1]:
+                # Au-delà de la tête connue: extrapolation au rythme moyen
+                with self._lock:
+                    return int(self.timestamps[-1] + (block - self.blocks[-1]) * self._average_block_time())
+            self.ensure_range(block, self.blocks[0] if self.blocks else block)
+
+        with self._lock:
+            index = bisect.bisect_left(self.blocks, block)
+            if index < len(self.blocks) and self.blocks[index] == block:
+                return self.timestamps[index]
+            if index == 0:
+                return int(self.timestamps[0] - (self.blocks[0] - block) * self._average_block_time())
+            if index >= len(self.blocks):
+                return int(self.timestamps[-1] + (block - self.blocks[-1]) * self._average_block_time())
+
+            b0, b1 = self.blocks[index - 1], self.blocks[index]
+            t0, t1 = self.timestamps[index - 1], self.timestamps[index]
+            return int(t0 + (t1 - t0) * (block - b0) / (b1 - b0))
+
+    def block_at(self, timestamp: float) -> int:
+        """Premier bloc produit à partir de timestamp (interpolé)"""
+        # Étendre l'index vers le passé si nécessaire
+        for _ in range(MAX_EXTEND_ATTEMPTS):
+            with self._lock:
+                if not self.blocks or timestamp >= self.timestamps[0]:
+                    break
+                estimate = self.blocks[0] - int((self.timestamps[0] - timestamp) / self._average_block_time())
+                first_block = self.blocks[0]
+            self.ensure_range(estimate - self.sample_interval, first_block)
+
+        with self._lock:
+            if not self.blocks:
+                raise ValueError("BlockTimeIndex vide: appeler observe_head() d'abord")
+
+            index = bisect.bisect_left(self.timestamps, timestamp)
+            if index < len(self.timestamps) and self.timestamps[index] == timestamp:
+                return self.blocks[index]
+            if index == 0:
+                return max(0, self.blocks[0] - int((self.timestamps[0] - timestamp) / self._average_block_time()))
+            if index >= len(self.timestamps):
+                return self.blocks[-1] + int((timestamp - self.timestamps[-1]) / self._average_block_time())
+
+            b0, b1 = self.blocks[index - 1], self.blocks[index]
+            t0, t1 = self.timestamps[index - 1], self.timestamps[index]
+            if t1 == t0:
+                return b1
+            return b0 + int(-(-(timestamp - t0) * (b1 - b0) // (t1 - t0)))
+
+    def block_range_for_last(self, seconds: float, head: Optional[Tuple[int, int]] = None) -> Tuple[int, int]:
+        """
+        Plage de blocs couvrant les `seconds` dernières secondes.
+
+        Args:
+            seconds: Durée de la fenêtre
+            head: (bloc, timestamp) courant déjà connu (évite un appel RPC)
+        """
+        head_block, head_timestamp = head or self.observe_head()
+        return self.block_at(head_timestamp - seconds), head_block
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return dict(self.stats, samples=len(self.blocks), average_block_time=self._average_block_time())
+
+
+_shared_indexes = {}
+_shared_indexes_lock = threading.Lock()
+
+
+def get_block_time_index(w3) -> BlockTimeIndex:
+    """Index partagé par instance Web3 (même RPC → mêmes échantillons)"""
+    with _shared_indexes_lock:
+        key = id(w3)
+        if key not in _shared_indexes:
+            _shared_indexes[key] = BlockTimeIndex(w3)
+        return _shared_indexes[key]
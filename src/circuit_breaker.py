@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Circuit Breaker - Coupe-circuit par fournisseur externe avec statistiques de santé
+Chaque appel HTTP passe par le disjoncteur de son fournisseur: taux d'erreur et
+latences sur une fenêtre glissante. Au-delà du seuil le circuit s'ouvre et les
+appels échouent immédiatement (CircuitOpenError) au lieu d'attendre le timeout;
+une sonde de fond (ou un unique appel réel en semi-ouvert) teste le retour du
+fournisseur avant de refermer le circuit.
+
+États: closed (appels normaux) → open (échec immédiat) → half_open (un essai) → closed
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Appel refusé sans réseau: circuit du fournisseur ouvert"""
+
+
+def is_failed_response(result) -> bool:
+    """Réponse HTTP comptée comme panne du fournisseur (5xx, 429), pas les 4xx métier"""
+    status = getattr(result, 'status_code', None)
+    return status is not None and (status >= 500 or status == 429)
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur d'un fournisseur.
+
+    - call(fn, *args, **kwargs): appel protégé (CircuitOpenError si ouvert)
+    - is_open(): test sans effet, pour éviter d'attendre un quota inutilement
+    - get_stats(): état, taux d'erreur et latences p50/p95/p99 de la fenêtre
+    """
+
+    def __init__(self, name: str, probe: Callable = None, error_rate: float = None,
+                 min_calls: int = None, consecutive_failures: int = None,
+                 window_seconds: float = None, open_seconds: float = None):
+        """
+        Args:
+            name: Fournisseur (clé du registre)
+            probe: Requête légère rejouée en fond circuit ouvert (sinon: semi-ouvert sur trafic réel)
+            error_rate: Taux d'erreur d'ouverture (défaut: CIRCUIT_BREAKER_ERROR_RATE ou 0.5)
+            min_calls: Appels minimum dans la fenêtre avant d'évaluer le taux
+            consecutive_failures: Échecs consécutifs ouvrant le circuit sans attendre min_calls
+            window_seconds: Fenêtre glissante des statistiques
+            open_seconds: Durée d'ouverture initiale (doublée à chaque sonde ratée, max 10x)
+        """
+        self.name = name
+        self.probe = probe
+        self.error_rate = error_rate if error_rate is not None else float(os.getenv('CIRCUIT_BREAKER_ERROR_RATE', 0.5))
+        self.min_calls = min_calls if min_calls is not None else int(os.getenv('CIRCUIT_BREAKER_MIN_CALLS', 5))
+        self.consecutive_failures = consecutive_failures if consecutive_failures is not None else int(
+            os.getenv('CIRCUIT_BREAKER_CONSECUTIVE_FAILURES', 3))
+        self.window_seconds = window_seconds if window_seconds is not None else float(
+            os.getenv('CIRCUIT_BREAKER_WINDOW_SECONDS', 60))
+        self.open_seconds = open_seconds if open_seconds is not None else float(
+            os.getenv('CIRCUIT_BREAKER_OPEN_SECONDS', 30))
+
+        self.state = CLOSED
+        self.calls = deque()  # (instant, succès, latence en secondes)
+        self.failure_streak = 0
+        self.cooldown = self.open_seconds
+        self.opened_at = 0.0
+        self.probing = False
+
+        self.stats = {'rejected': 0, 'opened': 0, 'probes': 0}
+        self.last_error = None
+        self._lock = threading.Lock()
+
+    # ==================== APPELS ====================
+
+    def is_open(self) -> bool:
+        """True si un appel serait refusé maintenant (ne réserve pas l'essai semi-ouvert)"""
+        with self._lock:
+            if self.state == CLOSED:
+                return False
+            if self.state == HALF_OPEN or self.probing or self.probe is not None:
+                return True
+            return time.time() - self.opened_at < self.cooldown
+
+    def call(self, fn: Callable, *args, **kwargs):
+        """
+        Exécute fn sous le disjoncteur (exception ou réponse 5xx/429 = échec).
+
+        Raises:
+            CircuitOpenError: Circuit ouvert (ou essai semi-ouvert déjà en cours)
+        """
+        with self._lock:
+            if self.state == OPEN:
+                # Sans sonde, le premier appel après le délai sert d'essai
+                if self.probe is None and not self.probing and time.time() - self.opened_at >= self.cooldown:
+                    self.state = HALF_OPEN
+                    self.probing = True
+                else:
+                    self.stats['rejected'] += 1
+                    raise CircuitOpenError(f"{self.name}: circuit ouvert")
+            elif self.state == HALF_OPEN:
+                self.stats['rejected'] += 1
+                raise CircuitOpenError(f"{self.name}: essai de reprise en cours")
+
+        start = time.time()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self.record(False, time.time() - start, e)
+            raise
+        failed = is_failed_response(result)
+        self.record(not failed, time.time() - start, f"HTTP {result.status_code}" if failed else None)
+        return result
+
+    def record(self, success: bool, latency: float, error=None):
+        """Enregistre le résultat d'un appel et fait évoluer l'état"""
+        with self._lock:
+            now = time.time()
+            self.calls.append((now, success, latency))
+            self._trim(now)
+
+            if success:
+                self.failure_streak = 0
+                if self.state == HALF_OPEN:
+                    self._close()
+                return
+
+            self.failure_streak += 1
+            self.last_error = str(error) if error else None
+            if self.state == HALF_OPEN:
+                self._open(now, backoff=True)
+            elif self.state == CLOSED and self._should_open():
+                self._open(now)
+
+    def _trim(self, now: float):
+        while self.calls and now - self.calls[0][0] > self.window_seconds:
+            self.calls.popleft()
+
+    def _should_open(self) -> bool:
+        if self.failure_streak >= self.consecutive_failures:
+            return True
+        if len(self.calls) < self.min_calls:
+            return False
+        failures = sum(1 for _, success, _ in self.calls if not success)
+        return failures / len(self.calls) >= self.error_rate
+
+    # ==================== TRANSITIONS ====================
+
+    def _open(self, now: float, backoff: bool = False):
+        """Ouvre le circuit (verrou tenu)"""
+        if backoff:
+            self.cooldown = min(self.cooldown * 2, self.open_seconds * 10)
+        else:
+            self.stats['opened'] += 1
+            print(f"🔌 Circuit {self.name} ouvert: {self.last_error}")
+        self.state = OPEN
+        self.opened_at = now
+        self.probing = False
+
+        if self.probe is not None:
+            self._schedule_probe(self.cooldown)
+
+    def _schedule_probe(self, delay: float):
+        """Programme la sonde de fond (verrou tenu)"""
+        self.probing = True
+        timer = threading.Timer(max(0.0, delay), self._run_probe)
+        timer.daemon = True
+        timer.start()
+
+    def attach_probe(self, probe: Callable):
+        """
+        Ajoute une sonde à un disjoncteur créé sans. Circuit déjà ouvert: la sonde
+        est programmée pour la fin du délai en cours (sinon is_open() resterait vrai).
+        """
+        with self._lock:
+            if self.probe is not None:
+                return
+            self.probe = probe
+            if self.state == OPEN and not self.probing:
+                self._schedule_probe(self.opened_at + self.cooldown - time.time())
+
+    def _close(self):
+        """Referme le circuit (verrou tenu): fenêtre remise à zéro"""
+        self.state = CLOSED
+        self.probing = False
+        self.failure_streak = 0
+        self.cooldown = self.open_seconds
+        self.calls.clear()
+        print(f"✅ Circuit {self.name} refermé")
+
+    def _run_probe(self):
+        """Sonde de fond: referme le circuit si le fournisseur répond, sinon prolonge l'ouverture"""
+        with self._lock:
+            self.state = HALF_OPEN
+            self.stats['probes'] += 1
+
+        start = time.time()
+        try:
+            result = self.probe()
+            error = f"HTTP {result.status_code}" if is_failed_response(result) else None
+        except Exception as e:
+            error = e
+        self.record(error is None, time.time() - start, error)
+
+    # ==================== STATISTIQUES ====================
+
+    def get_stats(self) -> Dict:
+        """État et santé sur la fenêtre glissante (latences en millisecondes)"""
+        with self._lock:
+            self._trim(time.time())
+            latencies = sorted(latency for _, _, latency in self.calls)
+            failures = sum(1 for _, success, _ in self.calls if not success)
+
+            def percentile(p):
+                if not latencies:
+                    return 0.0
+                return latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000
+
+            return dict(
+                self.stats,
+                state=self.state,
+                calls=len(self.calls),
+                error_rate=failures / len(self.calls) if self.calls else 0.0,
+                p50_ms=percentile(50),
+                p95_ms=percentile(95),
+                p99_ms=percentile(99),
+                last_error=self.last_error
+            )
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str, probe: Callable = None) -> CircuitBreaker:
+    """Disjoncteur partagé par tous les clients du process pour ce fournisseur"""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name, probe=probe)
+        elif probe is not None:
+            breaker.attach_probe(probe)
+        return breaker
+
+
+def get_breaker_stats() -> Dict[str, Dict]:
+    """{fournisseur: statistiques} de tous les disjoncteurs du process"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.get_stats() for breaker in breakers}
@@ -5,12 +5,20 @@ Hiérarchie: On-chain (prioritaire) → DexScreener (gratuit) → BirdEye (optio
 """
 
 import os
-from typing import Dict, Optional
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED, TimeoutError as FuturesTimeout
+from typing import Dict, List, Optional
 from web3 import Web3
 import logging
 
 from onchain_fetcher import OnChainFetcher
 from api_fallbacks import DexScreenerFreeAPI, CoinGeckoFreeAPI, BlockchairAPI, BaseScanAPI
+from rate_limiter import PRIORITY_LOW
+from circuit_breaker import get_breaker_stats
+
+# Logger muet des fusions d'essai (mode concurrent)
+PREVIEW_LOGGER = logging.getLogger('DataAggregator.preview')
+PREVIEW_LOGGER.disabled = True
 
 
 class DataAggregator:
@@ -59,9 +67,32 @@ class DataAggregator:
 
         self.enable_onchain = enable_onchain_fallback
 
+        # Enrichissement: 'concurrent' (sources en parallèle sous échéance) ou 'sequential'
+        self.enrichment_mode = os.getenv('ENRICHMENT_MODE', 'concurrent').lower()
+        self.enrichment_deadline = float(os.getenv('ENRICHMENT_DEADLINE_SECONDS', 4))
+
+        # Enrichissement du Filter: passe après le Trader quand le quota est tendu,
+        # et n'attend pas un jeton au-delà de l'échéance par token
+        for client in (self.dexscreener, self.coingecko, self.blockchair, self.basescan):
+            if client:
+                client.priority = PRIORITY_LOW
+                client.rate_limit_timeout = self.enrichment_deadline
+
+        # Un thread par source: une source lente (on-chain, registre des holders) ne
+        # prive pas les autres de workers, et n'est pas relancée tant qu'elle tourne
+        self.executors = {
+            name: ThreadPoolExecutor(max_workers=1, thread_name_prefix=f'enrichment-{name}')
+            for name in self.SOURCE_ORDER
+        }
+        self.inflight = {}  # Source → dernier appel lancé (peut déborder l'échéance d'un token)
+
+        # Réponses DexScreener préchargées par lot (consommées par get_enriched_token_data)
+        self.dexscreener_prefetch = {}
+
         # Statistiques d'utilisation
         self.stats = {
             'onchain_success': 0,
+            'holder_index_success': 0,
             'dexscreener_success': 0,
             'birdeye_success': 0,
             'coingecko_success': 0,
@@ -71,7 +102,24 @@ class DataAggregator:
             'failed_queries': 0
         }
 
-    def get_enriched_token_data(self, token_address: str, pair_address: str = None) -> Dict:
+    def prefetch_dexscreener(self, token_addresses: List[str]):
+        """
+        Précharge DexScreener pour un lot de tokens (30 adresses par requête,
+        seulement pour ceux absents ou trop vieux dans le cache de marché partagé).
+        Chaque réponse, même vide, sert une fois à get_enriched_token_data;
+        un nouveau lot remplace les réponses non consommées du précédent.
+        """
+        if not token_addresses:
+            return
+        try:
+            self.dexscreener_prefetch = self.dexscreener.get_tokens_info(
+                token_addresses, chain="base", fields=('liquidity', 'volume', 'market_cap')
+            )
+        except Exception as e:
+            self.logger.warning(f"⚠️  DexScreener batch failed: {e}")
+
+    def get_enriched_token_data(self, token_address: str, pair_address: str = None,
+                                block_created: int = None) -> Dict:
         """
         Récupère les données enrichies d'un token via toutes les sources disponibles
 
@@ -80,11 +128,14 @@ class DataAggregator:
         2. On-chain (priorité 2) - Si DexScreener échoue ou données incomplètes
         3. BirdEye (priorité 3) - Si disponible, compléter les données manquantes
         4. CoinGecko (priorité 4) - Données basiques si tout échoue
-        5. Blockchair/BaseScan (priorité 5) - Holders uniquement
+        5. Blockchair/BaseScan (priorité 5) - Holders uniquement, si le registre
+           local des balances (holder_index) n'a pas pu être construit
 
         Args:
             token_address: Adresse du token
             pair_address: Adresse du pool (optionnel, accélère on-chain)
+            block_created: Bloc de création de la paire (optionnel, borne le premier
+                passage du registre des holders)
 
         Returns:
             Dict avec toutes les données disponibles
@@ -95,6 +146,7 @@ class DataAggregator:
             # Données de base
             'token_address': token_address.lower(),
             'pair_address': pair_address.lower() if pair_address else '',
+            'block_created': block_created,
 
             # Liquidité
             'liquidity_usd': 0.0,
@@ -127,153 +179,318 @@ class DataAggregator:
             'timestamp': int(time.time())
         }
 
-        # 1️⃣ DEXSCREENER (Priorité 1 - Gratuit, complet, rapide)
-        try:
-            dex_data = self.dexscreener.get_token_info(token_address, chain="base")
-
-            if dex_data:
-                self.stats['dexscreener_success'] += 1
-                result['data_sources'].append('dexscreener')
-
-                # Mise à jour avec données DexScreener
-                result['pair_address'] = dex_data.get('pair_address', result['pair_address'])
-                result['dex_id'] = dex_data.get('dex_id', '')
-                result['liquidity_usd'] = dex_data.get('liquidity_usd', 0.0)
-                result['volume_24h'] = dex_data.get('volume_24h', 0.0)
-                result['volume_1h'] = dex_data.get('volume_1h', 0.0)
-                result['price_usd'] = dex_data.get('price_usd', 0.0)
-                result['price_eth'] = dex_data.get('price_native', 0.0)
-                result['price_change_5min'] = dex_data.get('price_change_5m', 0.0)
-                result['price_change_1h'] = dex_data.get('price_change_1h', 0.0)
-                result['price_change_24h'] = dex_data.get('price_change_24h', 0.0)
-                result['market_cap'] = dex_data.get('market_cap', 0.0)
-                result['fdv'] = dex_data.get('fdv', 0.0)
-
-                self.logger.info(f"✅ DexScreener: ${result['liquidity_usd']:,.0f} liq, ${result['volume_1h']:,.0f} vol 1h")
-
-                # Si données complètes (liquidité + volume_1h > 0), continuer pour enrichir holders
-                # Sinon essayer on-chain
-                if result['liquidity_usd'] > 0 and result['volume_1h'] > 0:
-                    pass  # DexScreener suffit, on complète juste les holders
-                else:
-                    self.logger.warning("⚠️  DexScreener données incomplètes, fallback on-chain")
+        state = {'holders_indexed': False}  # Distribution exacte issue du registre local des balances
 
-        except Exception as e:
-            self.logger.warning(f"⚠️  DexScreener failed: {e}")
+        if self.enrichment_mode == 'concurrent':
+            self._enrich_concurrent(token_address, result, state)
+        else:
+            for name in self.SOURCE_ORDER:
+                if self._wants(name, result, state):
+                    self._merge(name, result, state, self._fetch(name, token_address, result))
 
-        # 2️⃣ ON-CHAIN FALLBACK (Si DexScreener incomplet ou erreur)
-        if self.enable_onchain and self.onchain and (result['liquidity_usd'] == 0 or result['volume_1h'] == 0):
-            try:
-                onchain_data = self.onchain.get_token_data_onchain(token_address, result['pair_address'] or None)
-
-                if onchain_data and onchain_data['liquidity_usd'] > 0:
-                    self.stats['onchain_success'] += 1
-                    result['data_sources'].append('onchain')
-
-                    # Compléter/Remplacer avec données on-chain
-                    if result['liquidity_usd'] == 0:
-                        result['liquidity_usd'] = onchain_data['liquidity_usd']
-                    if result['volume_1h'] == 0:
-                        result['volume_1h'] = onchain_data['volume_1h']
-                    if result['volume_5min'] == 0:
-                        result['volume_5min'] = onchain_data['volume_5min']
-                    if result['price_change_1h'] == 0:
-                        result['price_change_1h'] = onchain_data['price_change_1h']
-                    if result['price_change_5min'] == 0:
-                        result['price_change_5min'] = onchain_data['price_change_5min']
-                    if result['holder_count'] == 0:
-                        result['holder_count'] = onchain_data['holders']
-
-                    self.logger.info(f"✅ On-chain: ${result['liquidity_usd']:,.0f} liq, {result['holder_count']} holders")
+        # Validation finale
+        if result['liquidity_usd'] == 0 and result['volume_1h'] == 0:
+            self.stats['failed_queries'] += 1
+            self.logger.error(f"❌ Aucune donnée disponible pour {token_address}")
+            result['data_sources'].append('failed')
 
-            except Exception as e:
-                self.logger.warning(f"⚠️  On-chain fallback failed: {e}")
+        return result
 
-        # 3️⃣ BIRDEYE (Si disponible et données encore incomplètes)
-        if self.birdeye and (result['volume_1h'] == 0 or result['holder_count'] == 0):
-            try:
-                birdeye_data = self.birdeye.get_token_overview(token_address)
-
-                if birdeye_data:
-                    self.stats['birdeye_success'] += 1
-                    result['data_sources'].append('birdeye')
-
-                    # Compléter avec BirdEye
-                    if result['liquidity_usd'] == 0:
-                        result['liquidity_usd'] = birdeye_data.get('liquidity', 0.0)
-                    if result['volume_24h'] == 0:
-                        result['volume_24h'] = birdeye_data.get('v24hUSD', 0.0)
-                    if result['price_usd'] == 0:
-                        result['price_usd'] = birdeye_data.get('price', 0.0)
-                    if result['holder_count'] == 0:
-                        result['holder_count'] = birdeye_data.get('holder', 0)
-                    if result['market_cap'] == 0:
-                        result['market_cap'] = birdeye_data.get('mc', 0.0)
-
-                    self.logger.info(f"✅ BirdEye: {result['holder_count']} holders")
+    # ==================== SOURCES ====================
+
+    # Ordre de priorité de fusion (chaque source ne complète que les champs encore vides)
+    SOURCE_ORDER = ('dexscreener', 'onchain', 'holder_index', 'birdeye', 'coingecko', 'holders_fallback')
+
+    def _wants(self, name: str, result: Dict, state: Dict) -> bool:
+        """La source peut-elle encore apporter quelque chose au résultat courant ?"""
+        if name == 'dexscreener':
+            return True
+        if name == 'onchain':
+            return bool(self.enable_onchain and self.onchain) and (result['liquidity_usd'] == 0 or result['volume_1h'] == 0)
+        if name == 'holder_index':
+            return bool(self.enable_onchain and self.onchain) and not state['holders_indexed']
+        if name == 'birdeye':
+            return bool(self.birdeye) and (result['volume_1h'] == 0 or result['holder_count'] == 0)
+        if name == 'coingecko':
+            return result['market_cap'] == 0 or result['price_usd'] == 0
+        if name == 'holders_fallback':
+            return not state['holders_indexed'] and result['holder_count'] < 20  # Seuil suspicieusement bas
+        return False
+
+    def _fetch(self, name: str, token_address: str, result: Dict):
+        """
+        Appel réseau d'une source (sans effet sur le résultat).
 
-            except Exception as e:
-                self.logger.warning(f"⚠️  BirdEye failed: {e}")
+        Returns:
+            Données brutes de la source, ou l'exception levée
+        """
+        try:
+            if name == 'dexscreener':
+                if token_address.lower() in self.dexscreener_prefetch:
+                    return self.dexscreener_prefetch.pop(token_address.lower())
+                return self.dexscreener.get_token_info(token_address, chain="base")
+            if name == 'onchain':
+                return self.onchain.get_token_data_onchain(token_address, result['pair_address'] or None,
+                                                         result['block_created'])
+            if name == 'holder_index':
+                return self.onchain.get_holder_metrics(token_address, result['pair_address'] or None,
+                                                      result['block_created'])
+            if name == 'birdeye':
+                return self.birdeye.get_token_overview(token_address)
+            if name == 'coingecko':
+                return self.coingecko.get_token_data(token_address, platform="base")
+            if name == 'holders_fallback':
+                # Blockchair (gratuit, pas de clé), puis BaseScan si holders toujours bas
+                blockchair_holders = self.blockchair.get_holder_count(token_address)
+                basescan_data = None
+                if self.basescan and max(blockchair_holders, result['holder_count']) < 50:
+                    basescan_data = self.basescan.get_token_holder_list(token_address, limit=100)
+                return {'blockchair': blockchair_holders, 'basescan': basescan_data}
+        except Exception as e:
+            return e
+        return None
 
-        # 4️⃣ COINGECKO (Fallback données market cap et prix si tout échoue)
-        if result['market_cap'] == 0 or result['price_usd'] == 0:
-            try:
-                cg_data = self.coingecko.get_token_data(token_address, platform="base")
+    def _merge(self, name: str, result: Dict, state: Dict, data, record: bool = True):
+        """
+        Intègre les données d'une source selon les règles de priorité.
 
-                if cg_data:
-                    self.stats['coingecko_success'] += 1
-                    result['data_sources'].append('coingecko')
+        Args:
+            record: False pour une fusion d'essai (ni statistiques ni logs)
+        """
+        stats = self.stats if record else defaultdict(int)
+        logger = self.logger if record else PREVIEW_LOGGER
 
-                    if result['market_cap'] == 0:
-                        result['market_cap'] = cg_data.get('market_cap', 0.0)
-                    if result['volume_24h'] == 0:
-                        result['volume_24h'] = cg_data.get('volume_24h', 0.0)
-                    if result['price_usd'] == 0:
-                        result['price_usd'] = cg_data.get('price_usd', 0.0)
-                    if result['price_change_24h'] == 0:
-                        result['price_change_24h'] = cg_data.get('price_change_24h', 0.0)
+        if isinstance(data, Exception):
+            label = {'dexscreener': 'DexScreener', 'onchain': 'On-chain fallback', 'holder_index': 'Holder index',
+                     'birdeye': 'BirdEye', 'coingecko': 'CoinGecko', 'holders_fallback': 'Holders fallback'}[name]
+            logger.warning(f"⚠️  {label} failed: {data}")
+            return
 
-                    self.logger.info(f"✅ CoinGecko: ${result['market_cap']:,.0f} mcap")
+        # 1️⃣ DEXSCREENER (Priorité 1 - Gratuit, complet, rapide)
+        if name == 'dexscreener' and data:
+            stats['dexscreener_success'] += 1
+            result['data_sources'].append('dexscreener')
+
+            # Mise à jour avec données DexScreener
+            result['pair_address'] = data.get('pair_address', result['pair_address'])
+            result['dex_id'] = data.get('dex_id', '')
+            result['liquidity_usd'] = data.get('liquidity_usd', 0.0)
+            result['volume_24h'] = data.get('volume_24h', 0.0)
+            result['volume_1h'] = data.get('volume_1h', 0.0)
+            result['price_usd'] = data.get('price_usd', 0.0)
+            result['price_eth'] = data.get('price_native', 0.0)
+            result['price_change_5min'] = data.get('price_change_5m', 0.0)
+            result['price_change_1h'] = data.get('price_change_1h', 0.0)
+            result['price_change_24h'] = data.get('price_change_24h', 0.0)
+            result['market_cap'] = data.get('market_cap', 0.0)
+            result['fdv'] = data.get('fdv', 0.0)
+
+            logger.info(f"✅ DexScreener: ${result['liquidity_usd']:,.0f} liq, ${result['volume_1h']:,.0f} vol 1h")
+
+            # Si données incomplètes, on-chain prend le relais
+            if result['liquidity_usd'] == 0 or result['volume_1h'] == 0:
+                logger.warning("⚠️  DexScreener données incomplètes, fallback on-chain")
 
-            except Exception as e:
-                self.logger.warning(f"⚠️  CoinGecko failed: {e}")
+        # 2️⃣ ON-CHAIN FALLBACK (Si DexScreener incomplet ou erreur)
+        elif name == 'onchain' and data and data['liquidity_usd'] > 0:
+            stats['onchain_success'] += 1
+            result['data_sources'].append('onchain')
+
+            # Compléter/Remplacer avec données on-chain
+            if result['liquidity_usd'] == 0:
+                result['liquidity_usd'] = data['liquidity_usd']
+            if result['volume_1h'] == 0:
+                result['volume_1h'] = data['volume_1h']
+            if result['volume_5min'] == 0:
+                result['volume_5min'] = data['volume_5min']
+            if result['price_change_1h'] == 0:
+                result['price_change_1h'] = data['price_change_1h']
+            if result['price_change_5min'] == 0:
+                result['price_change_5min'] = data['price_change_5min']
+            if data.get('holders_complete'):
+                state['holders_indexed'] = True
+                result['holder_count'] = data['holders']
+                if data['owner_percentage'] is not None:
+                    result['owner_percentage'] = data['owner_percentage']
+            elif result['holder_count'] == 0:
+                result['holder_count'] = data['holders']
+
+            logger.info(f"✅ On-chain: ${result['liquidity_usd']:,.0f} liq, {result['holder_count']} holders")
+
+        # 2️⃣bis HOLDERS ON-CHAIN (registre local des Transfer, aucun appel API)
+        elif name == 'holder_index' and data and data['complete'] and not state['holders_indexed']:
+            state['holders_indexed'] = True
+            stats['holder_index_success'] += 1
+            result['data_sources'].append('holder_index')
+            result['holder_count'] = data['holder_count']
+            if data['owner_percentage'] is not None:
+                result['owner_percentage'] = data['owner_percentage']
+            logger.info(f"✅ Holders on-chain: {result['holder_count']} holders, {result['owner_percentage']:.1f}% owner")
 
-        # 5️⃣ BLOCKCHAIR/BASESCAN (Fallback holders uniquement)
-        if result['holder_count'] < 20:  # Seuil suspicieusement bas
-            try:
-                # Essayer Blockchair (gratuit, pas de clé)
-                blockchair_holders = self.blockchair.get_holder_count(token_address)
-                if blockchair_holders > result['holder_count']:
-                    self.stats['blockchair_success'] += 1
-                    result['data_sources'].append('blockchair')
-                    result['holder_count'] = blockchair_holders
-                    self.logger.info(f"✅ Blockchair: {result['holder_count']} holders")
-
-                # Si BaseScan disponible et holders toujours bas
-                if self.basescan and result['holder_count'] < 50:
-                    basescan_data = self.basescan.get_token_holder_list(token_address, limit=100)
-                    if basescan_data:
-                        self.stats['basescan_success'] += 1
-                        result['data_sources'].append('basescan')
-                        result['holder_count'] = basescan_data.get('holder_count', result['holder_count'])
-                        result['owner_percentage'] = basescan_data.get('owner_percentage', result['owner_percentage'])
-                        self.logger.info(f"✅ BaseScan: {result['holder_count']} holders, {result['owner_percentage']:.1f}% owner")
+        # 3️⃣ BIRDEYE (Si disponible et données encore incomplètes)
+        elif name == 'birdeye' and data:
+            stats['birdeye_success'] += 1
+            result['data_sources'].append('birdeye')
+
+            # Compléter avec BirdEye
+            if result['liquidity_usd'] == 0:
+                result['liquidity_usd'] = data.get('liquidity', 0.0)
+            if result['volume_24h'] == 0:
+                result['volume_24h'] = data.get('v24hUSD', 0.0)
+            if result['price_usd'] == 0:
+                result['price_usd'] = data.get('price', 0.0)
+            if result['holder_count'] == 0:
+                result['holder_count'] = data.get('holder', 0)
+            if result['market_cap'] == 0:
+                result['market_cap'] = data.get('mc', 0.0)
+
+            logger.info(f"✅ BirdEye: {result['holder_count']} holders")
 
-            except Exception as e:
-                self.logger.warning(f"⚠️  Holders fallback failed: {e}")
+        # 4️⃣ COINGECKO (Fallback données market cap et prix si tout échoue)
+        elif name == 'coingecko' and data:
+            stats['coingecko_success'] += 1
+            result['data_sources'].append('coingecko')
+
+            if result['market_cap'] == 0:
+                result['market_cap'] = data.get('market_cap', 0.0)
+            if result['volume_24h'] == 0:
+                result['volume_24h'] = data.get('volume_24h', 0.0)
+            if result['price_usd'] == 0:
+                result['price_usd'] = data.get('price_usd', 0.0)
+            if result['price_change_24h'] == 0:
+                result['price_change_24h'] = data.get('price_change_24h', 0.0)
+
+            logger.info(f"✅ CoinGecko: ${result['market_cap']:,.0f} mcap")
+
+        # 5️⃣ BLOCKCHAIR/BASESCAN (Fallback holders uniquement, registre local indisponible)
+        elif name == 'holders_fallback' and data:
+            if data['blockchair'] > result['holder_count']:
+                stats['blockchair_success'] += 1
+                result['data_sources'].append('blockchair')
+                result['holder_count'] = data['blockchair']
+                logger.info(f"✅ Blockchair: {result['holder_count']} holders")
+
+            basescan_data = data['basescan']
+            if basescan_data and result['holder_count'] < 50:
+                stats['basescan_success'] += 1
+                result['data_sources'].append('basescan')
+                result['holder_count'] = basescan_data.get('holder_count', result['holder_count'])
+                result['owner_percentage'] = basescan_data.get('owner_percentage', result['owner_percentage'])
+                logger.info(f"✅ BaseScan: {result['holder_count']} holders, {result['owner_percentage']:.1f}% owner")
+
+    def _enrich_concurrent(self, token_address: str, result: Dict, state: Dict):
+        """
+        Sources lancées en parallèle par étapes, sous une échéance par token.
 
-        # Validation finale
-        if result['liquidity_usd'] == 0 and result['volume_1h'] == 0:
-            self.stats['failed_queries'] += 1
-            self.logger.error(f"❌ Aucune donnée disponible pour {token_address}")
-            result['data_sources'].append('failed')
+        1. DexScreener (réponse préchargée sans réseau) et registre des holders
+        2. On-chain, BirdEye, CoinGecko: seulement pour ce que DexScreener n'a pas
+           fourni, l'attente s'arrêtant dès qu'aucune source en vol n'est plus utile
+        3. Blockchair/BaseScan, limités en débit, si les holders manquent encore
 
-        return result
+        Un appel qui déborde l'échéance continue sur le thread de sa source; la
+        source est sautée pour les tokens suivants tant qu'il n'est pas terminé.
+        """
+        deadline = time.time() + self.enrichment_deadline
+        pending = {}
+        arrived = {}
+
+        if token_address.lower() in self.dexscreener_prefetch:
+            arrived['dexscreener'] = self._fetch('dexscreener', token_address, result)
+        else:
+            self._submit('dexscreener', token_address, dict(result), pending)
+        if self._wants('holder_index', result, state):
+            self._submit('holder_index', token_address, dict(result), pending)
+
+        self._wait_sources(pending, arrived, deadline, lambda: 'dexscreener' not in pending.values())
+
+        # Fallbacks: décidés sur la fusion d'essai de DexScreener (paire, champs manquants)
+        preview, preview_state = self._preview(arrived, result, state)
+        for name in ('onchain', 'birdeye', 'coingecko'):
+            if not self._wants(name, preview, preview_state):
+                continue
+            if name == 'birdeye' and preview['volume_1h'] and 'holder_index' in pending.values():
+                continue  # Seuls les holders manquent: attendus du registre local
+            self._submit(name, token_address, preview, pending)
+
+        def settled():
+            preview, preview_state = self._preview(arrived, result, state)
+            return not any(self._wants(name, preview, preview_state) for name in pending.values())
+
+        self._wait_sources(pending, arrived, deadline, settled)
+        if time.time() >= deadline:
+            for name in pending.values():
+                self.logger.warning(f"⏱️  {name} ignoré (échéance {self.enrichment_deadline:.1f}s dépassée)")
+
+        self._merge_arrived(arrived, result, state)
+
+        # Fallback holders (rate limité): seulement si encore nécessaire et si le budget le permet
+        remaining = deadline - time.time()
+        if remaining > 0 and self._wants('holders_fallback', result, state):
+            future = self._submit('holders_fallback', token_address, dict(result), {})
+            if future is not None:
+                try:
+                    self._merge('holders_fallback', result, state, future.result(timeout=remaining))
+                except FuturesTimeout:
+                    self.logger.warning(f"⏱️  holders_fallback ignoré (échéance {self.enrichment_deadline:.1f}s dépassée)")
+
+    def _submit(self, name: str, token_address: str, snapshot: Dict, pending: Dict) -> Optional[Future]:
+        """
+        Lance une source sur son thread (ajoutée à pending), sauf si l'appel d'un
+        token précédent y tourne encore.
+
+        Returns:
+            Future de l'appel, None si la source est sautée
+        """
+        running = self.inflight.get(name)
+        if running is not None and not running.done():
+            self.logger.warning(f"⏳ {name} ignoré: appel précédent encore en cours")
+            return None
+        future = self.executors[name].submit(self._fetch, name, token_address, snapshot)
+        self.inflight[name] = future
+        pending[future] = name
+        return future
+
+    @staticmethod
+    def _wait_sources(pending: Dict, arrived: Dict, deadline: float, done_when):
+        """Collecte les réponses jusqu'à done_when(), plus rien en vol, ou l'échéance"""
+        while pending and not done_when():
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return
+            done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                arrived[pending.pop(future)] = future.result()
+
+    def _preview(self, arrived: Dict, result: Dict, state: Dict):
+        """Fusion d'essai (sans statistiques ni logs) des réponses reçues"""
+        preview, preview_state = dict(result, data_sources=[]), dict(state)
+        self._merge_arrived(arrived, preview, preview_state, record=False)
+        return preview, preview_state
+
+    def _merge_arrived(self, arrived: Dict, result: Dict, state: Dict, record: bool = True):
+        """Fusionne les réponses reçues dans l'ordre de priorité (mêmes conditions qu'en séquentiel)"""
+        for name in self.SOURCE_ORDER:
+            if name in arrived and self._wants(name, result, state):
+                self._merge(name, result, state, arrived[name], record=record)
+
+    def retain_pairs(self, pair_addresses: List[str]):
+        """Barres on-chain: évince les paires sorties de l'ensemble analysé"""
+        if self.onchain:
+            self.onchain.bar_store.retain(address for address in pair_addresses if address)
 
     def get_stats(self) -> Dict:
         """Retourne les statistiques d'utilisation des sources"""
         return self.stats.copy()
 
+    def get_source_health(self) -> Dict[str, Dict]:
+        """
+        Santé des fournisseurs externes (disjoncteurs du process)
+
+        Returns:
+            {fournisseur: state, calls, error_rate, p50_ms/p95_ms/p99_ms, rejected, opened, probes, last_error}
+        """
+        return get_breaker_stats()
+
     def reset_stats(self):
         """Réinitialise les statistiques"""
         for key in self.stats:
@@ -336,3 +553,8 @@ if __name__ == "__main__":
     stats = aggregator.get_stats()
     for key, value in stats.items():
         print(f"  • {key}: {value}")
+
+    print(f"\n🔌 Santé des sources:")
+    for name, health in aggregator.get_source_health().items():
+        print(f"  • {name}: {health['state']}, erreurs {health['error_rate']:.0%}, "
+              f"p50 {health['p50_ms']:.0f}ms, p95 {health['p95_ms']:.0f}ms")
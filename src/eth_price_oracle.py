@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+ETH Price Oracle - Prix ETH/USD unique du process, suivi depuis le pool WETH/USDC
+Réserves lues une fois (getReserves) puis tenues à jour par les événements Sync
+du pool, en arrière-plan. Une lecture de prix ne coûte aucun appel réseau et
+indique son âge: un prix périmé est signalé plutôt que remplacé par une valeur fixe,
+et l'absence de prix est None (jamais 0.0, qui ferait passer une paire WETH pour vide).
+"""
+
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from web3 import Web3
+
+WETH = "0x4200000000000000000000000000000000000006"
+USDC = "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913"
+DEFAULT_POOL = "0xcDAC0d6c6C59727a65F871236188350531885C43"  # Aerodrome vAMM-WETH/USDC
+
+# Sync(uint112,uint112) des paires Uniswap V2 / BaseSwap, Sync(uint256,uint256) des pools Aerodrome
+SYNC_TOPICS = [
+    Web3.keccak(text="Sync(uint112,uint112)").hex(),
+    Web3.keccak(text="Sync(uint256,uint256)").hex()
+]
+
+GET_RESERVES_ABI = [
+    {"constant": True, "inputs": [], "name": "getReserves",
+     "outputs": [{"name": "reserve0", "type": "uint256"}, {"name": "reserve1", "type": "uint256"},
+                 {"name": "blockTimestampLast", "type": "uint256"}], "type": "function"},
+    {"constant": True, "inputs": [], "name": "token0", "outputs": [{"name": "", "type": "address"}], "type": "function"},
+    {"constant": True, "inputs": [], "name": "token1", "outputs": [{"name": "", "type": "address"}], "type": "function"}
+]
+
+DEFAULT_REFRESH_SECONDS = 4  # ~2 blocs Base
+DEFAULT_MAX_AGE_SECONDS = 60  # Au-delà, le prix est signalé périmé
+DEFAULT_START_TIMEOUT_SECONDS = 10  # Attente max du premier prix au démarrage
+MAX_LOG_GAP_BLOCKS = 1000  # Retard plus grand: relecture directe des réserves
+
+
+def _raw(value) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    return bytes.fromhex(value[2:] if value.startswith('0x') else value)
+
+
+def _as_int(value) -> int:
+    return int(value, 16) if isinstance(value, str) else value
+
+
+class EthPriceOracle:
+    """
+    Prix ETH/USD tenu à jour depuis les réserves du pool WETH/USDC.
+
+    - get_price(): dernier prix connu (None si aucun), sans appel réseau
+    - get_quote(): prix + bloc, âge en secondes et indicateur stale
+    - refresh(): un passage (tête + Sync depuis le dernier bloc), fait par le thread de fond
+    - start() / stop(): premier prix attendu (borné), puis thread de rafraîchissement
+    """
+
+    def __init__(self, w3, pool_address: str = None, refresh_seconds: float = None,
+                 max_age_seconds: float = None, head_tracker=None, metadata_cache=None,
+                 start_timeout: float = None):
+        """
+        Args:
+            w3: Instance Web3
+            pool_address: Pool WETH/USDC (défaut: ETH_ORACLE_POOL ou Aerodrome vAMM-WETH/USDC)
+            refresh_seconds: Période du thread de fond (défaut: ETH_ORACLE_REFRESH_SECONDS ou 4)
+            max_age_seconds: Âge au-delà duquel le prix est périmé (défaut: ETH_ORACLE_MAX_AGE_SECONDS ou 60)
+            head_tracker: HeadTracker (défaut: tracker partagé de w3)
+            metadata_cache: MetadataCache pour token0/token1 (défaut: cache partagé)
+            start_timeout: Attente max du premier prix dans start() (défaut: ETH_ORACLE_START_TIMEOUT_SECONDS ou 10)
+        """
+        self.w3 = w3
+        self.pool_address = Web3.to_checksum_address(pool_address or os.getenv('ETH_ORACLE_POOL', DEFAULT_POOL))
+        self.refresh_seconds = float(refresh_seconds or os.getenv('ETH_ORACLE_REFRESH_SECONDS', DEFAULT_REFRESH_SECONDS))
+        self.max_age_seconds = float(max_age_seconds or os.getenv('ETH_ORACLE_MAX_AGE_SECONDS', DEFAULT_MAX_AGE_SECONDS))
+        self.start_timeout = float(start_timeout if start_timeout is not None else os.getenv(
+            'ETH_ORACLE_START_TIMEOUT_SECONDS', DEFAULT_START_TIMEOUT_SECONDS))
+
+        if head_tracker is None:
+            from head_tracker import get_head_tracker
+            head_tracker = get_head_tracker(w3)
+        self.head_tracker = head_tracker
+        self.head_tracker.add_reorg_listener(self.forget_from)
+
+        if metadata_cache is None:
+            from metadata_cache import get_metadata_cache
+            metadata_cache = get_metadata_cache()
+        self.metadata_cache = metadata_cache
+
+        self.weth_is_token0 = None
+        self.reserves = None  # (reserve0, reserve1) bruts
+        self.price = None  # Aucun prix tant que les réserves n'ont pas été lues
+        self.synced_block = None  # Réserves valides jusqu'à ce bloc inclus
+        self.synced_timestamp = None  # Timestamp de ce bloc
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.stats = {'refreshes': 0, 'sync_events': 0, 'reserve_reads': 0, 'errors': 0}
+
+    # ==================== LECTURE (sans réseau) ====================
+
+    def get_price(self) -> Optional[float]:
+        """Dernier prix ETH/USD connu (None si aucun)"""
+        return self.price
+
+    def get_quote(self) -> Dict:
+        """
+        Returns:
+            dict price (None si aucun), block, timestamp (bloc des réserves), age_seconds,
+            stale (aucun prix ou plus vieux que max_age_seconds)
+        """
+        with self._lock:
+            price, block, timestamp = self.price, self.synced_block, self.synced_timestamp
+
+        age = time.time() - timestamp if timestamp else None
+        return {
+            'price': price,
+            'block': block,
+            'timestamp': timestamp,
+            'age_seconds': age,
+            'stale': price is None or age is None or age > self.max_age_seconds
+        }
+
+    # ==================== MISE À JOUR ====================
+
+    def _load_pool_tokens(self):
+        """Sens du pool (WETH en token0 ?), token0/token1 servis par le cache de métadonnées"""
+        cached = self.metadata_cache.get_pair(self.pool_address)
+        if cached:
+            token0, token1 = cached['token0'], cached['token1']
+        else:
+            pool = self.w3.eth.contract(address=self.pool_address, abi=GET_RESERVES_ABI)
+            token0 = pool.functions.token0().call().lower()
+            token1 = pool.functions.token1().call().lower()
+            self.metadata_cache.put_pair(self.pool_address, token0, token1)
+
+        if {token0, token1} != {WETH.lower(), USDC.lower()}:
+            raise ValueError(f"Pool {self.pool_address} n'est pas un pool WETH/USDC")
+        self.weth_is_token0 = token0 == WETH.lower()
+
+    def _set_reserves(self, reserve0: int, reserve1: int):
+        weth_reserve, usdc_reserve = (reserve0, reserve1) if self.weth_is_token0 else (reserve1, reserve0)
+        self.reserves = (reserve0, reserve1)
+        if weth_reserve:
+            self.price = (usdc_reserve / 10**6) / (weth_reserve / 10**18)
+
+    def apply_logs(self, logs: List, block: int, timestamp: int):
+        """
+        Intègre les Sync d'une plage de blocs se terminant à `block`
+        (seul le dernier compte: il porte les réserves courantes).
+        """
+        logs = [log for log in logs if not log.get('removed')]
+        with self._lock:
+            if logs:
+                last = max(logs, key=lambda log: (_as_int(log['blockNumber']), _as_int(log.get('logIndex', 0))))
+                data = _raw(last['data'])
+                self._set_reserves(int.from_bytes(data[:32], 'big'), int.from_bytes(data[32:64], 'big'))
+                self.stats['sync_events'] += len(logs)
+            self.synced_block, self.synced_timestamp = block, timestamp
+
+    def refresh(self):
+        """Un passage: tête courante puis Sync depuis le dernier bloc (ou lecture directe des réserves)"""
+        if self.weth_is_token0 is None:
+            self._load_pool_tokens()
+
+        block, timestamp = self.head_tracker.update()
+        self.stats['refreshes'] += 1
+
+        synced = self.synced_block
+        if synced is not None and block <= synced:
+            return
+
+        if synced is None or block - synced > MAX_LOG_GAP_BLOCKS:
+            pool = self.w3.eth.contract(address=self.pool_address, abi=GET_RESERVES_ABI)
+            reserve0, reserve1, _ = pool.functions.getReserves().call(block_identifier=block)
+            self.stats['reserve_reads'] += 1
+            with self._lock:
+                self._set_reserves(reserve0, reserve1)
+                self.synced_block, self.synced_timestamp = block, timestamp
+            return
+
+        logs = self.w3.eth.get_logs({
+            'address': self.pool_address,
+            'fromBlock': synced + 1,
+            'toBlock': block,
+            'topics': [SYNC_TOPICS]
+        })
+        self.apply_logs(logs, block, timestamp)
+
+    def forget_from(self, block: int):
+        """Réorganisation: réserves relues directement au prochain passage (prix gardé d'ici là)"""
+        with self._lock:
+            if self.synced_block is not None and self.synced_block >= block:
+                self.synced_block = None
+
+    # ==================== THREAD DE FOND ====================
+
+    def _run(self):
+        while not self._stop.wait(self.refresh_seconds):
+            try:
+                self.refresh()
+            except Exception as e:
+                self.stats['errors'] += 1
+                print(f"⚠️  Oracle ETH: rafraîchissement échoué ({e}), prix de {self.get_quote()['age_seconds'] or 0:.0f}s")
+
+    def start(self):
+        """
+        Premier prix attendu (essais répétés jusqu'à start_timeout) puis
+        rafraîchissement en arrière-plan. Sans prix au délai, get_price()
+        reste None jusqu'à un passage réussi du thread de fond.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        deadline = time.time() + self.start_timeout
+        error = None
+        while self.price is None:
+            try:
+                self.refresh()
+            except Exception as e:
+                self.stats['errors'] += 1
+                error = e
+            if self.price is not None:
+                break
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                print(f"❌ Oracle ETH: aucun prix après {self.start_timeout:.0f}s: {error or 'réserves WETH vides'}")
+                break
+            time.sleep(min(1.0, remaining))
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='eth-price-oracle', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def get_stats(self) -> Dict:
+        return dict(self.stats, price=self.price, block=self.synced_block)
+
+
+_shared_oracles = {}
+_shared_oracles_lock = threading.Lock()
+
+
+def get_eth_price_oracle(w3) -> EthPriceOracle:
+    """Oracle partagé par instance Web3, démarré au premier accès"""
+    with _shared_oracles_lock:
+        key = id(w3)
+        if key not in _shared_oracles:
+            oracle = EthPriceOracle(w3)
+            oracle.start()
+            _shared_oracles[key] = oracle
+        return _shared_oracles[key]
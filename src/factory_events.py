@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Factory Events - Registre des factories DEX surveillées et de leurs décodeurs
+Permet une seule requête get_logs (toutes adresses + OR des topics de création)
+puis route chaque log vers le décodeur de sa factory via (adresse, topic0).
+
+decode_many() est le chemin rapide des backfills: comparaisons sur les octets bruts
+(adresses de 20 octets, frozenset de base tokens), checksum différé à la persistance.
+"""
+
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Tuple
+from web3 import Web3
+from eth_utils import to_checksum_address
+
+# Factory Addresses (Base Mainnet)
+AERODROME_FACTORY = "0x420DD381b31aEf6683db6B902084cB0FFECe40Da"
+BASESWAP_FACTORY = "0x8909Dc15e40173Ff4699343b6eB8132c65e18eC6"
+UNISWAP_V3_FACTORY = "0x33128a8fC17869897dcE68Ed026d694621f6FDfD"
+
+# Event signatures
+# V2: PairCreated(address indexed token0, address indexed token1, address pair, uint256)
+PAIR_CREATED_EVENT_SIGNATURE = Web3.keccak(text="PairCreated(address,address,address,uint256)").hex()
+# Aerodrome: PoolCreated(address indexed token0, address indexed token1, bool indexed stable, address pool, uint256)
+AERODROME_POOL_CREATED_SIGNATURE = Web3.keccak(text="PoolCreated(address,address,bool,address,uint256)").hex()
+# Uniswap V3: PoolCreated(address indexed token0, address indexed token1, uint24 indexed fee, int24 tickSpacing, address pool)
+V3_POOL_CREATED_SIGNATURE = Web3.keccak(text="PoolCreated(address,address,uint24,int24,address)").hex()
+
+
+def _hex(value) -> str:
+    """HexBytes / bytes / str → hex sans préfixe 0x (HexBytes.hex() inclut le préfixe)"""
+    if isinstance(value, (bytes, bytearray)):
+        value = value.hex()
+    return value[2:] if value.startswith('0x') else value
+
+
+def _normalize_topic(topic) -> str:
+    """Topic en hex minuscule avec préfixe 0x"""
+    return '0x' + _hex(topic).lower()
+
+
+def _raw(value) -> bytes:
+    """HexBytes / bytes / str hex → octets bruts (sans conversion si déjà bytes)"""
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, bytearray):
+        return bytes(value)
+    return bytes.fromhex(value[2:] if value.startswith('0x') else value)
+
+
+def address_bytes(address: str) -> bytes:
+    """Adresse hex → 20 octets"""
+    return _raw(address)[-20:]
+
+
+# Découpage bytes natif: HexBytes surcharge __getitem__ en Python (~5x plus lent)
+_bytes_slice = bytes.__getitem__
+_TOPIC_ADDRESS = slice(12, 32)
+
+
+@lru_cache(maxsize=65536)
+def checksum(raw_address: bytes) -> str:
+    """20 octets → adresse checksummée (keccak mis en cache: tokens/paires reviennent souvent)"""
+    return to_checksum_address(raw_address)
+
+
+def _data_word_address(log, word_index: int) -> str:
+    """Adresse contenue dans le mot N (32 octets) du champ data"""
+    data = _hex(log['data'])
+    start = word_index * 64 + 24
+    return to_checksum_address('0x' + data[start:start + 40])
+
+
+def _topic_address(log, topic_index: int) -> str:
+    """Adresse indexée dans un topic"""
+    return to_checksum_address('0x' + _hex(log['topics'][topic_index])[-40:])
+
+
+def decode_v2_pair_created(log) -> Tuple[str, str, str]:
+    """PairCreated V2: (token0, token1, pair) - pair dans le mot 0 de data"""
+    return _topic_address(log, 1), _topic_address(log, 2), _data_word_address(log, 0)
+
+
+def decode_aerodrome_pool_created(log) -> Tuple[str, str, str]:
+    """PoolCreated Aerodrome: (token0, token1, pool) - stable indexé, pool dans le mot 0 de data"""
+    return _topic_address(log, 1), _topic_address(log, 2), _data_word_address(log, 0)
+
+
+def decode_v3_pool_created(log) -> Tuple[str, str, str]:
+    """PoolCreated Uniswap V3: (token0, token1, pool) - tickSpacing en mot 0, pool en mot 1"""
+    return _topic_address(log, 1), _topic_address(log, 2), _data_word_address(log, 1)
+
+
+# Registre: une entrée par factory surveillée
+FACTORY_REGISTRY = [
+    {
+        'name': 'Aerodrome',
+        'address': to_checksum_address(AERODROME_FACTORY),
+        'topic': AERODROME_POOL_CREATED_SIGNATURE,
+        'decoder': decode_aerodrome_pool_created,
+        'pair_word': 0  # Mot de data contenant l'adresse de la paire
+    },
+    {
+        'name': 'BaseSwap',
+        'address': to_checksum_address(BASESWAP_FACTORY),
+        'topic': PAIR_CREATED_EVENT_SIGNATURE,
+        'decoder': decode_v2_pair_created,
+        'pair_word': 0
+    },
+    {
+        'name': 'Uniswap V3',
+        'address': to_checksum_address(UNISWAP_V3_FACTORY),
+        'topic': V3_POOL_CREATED_SIGNATURE,
+        'decoder': decode_v3_pool_created,
+        'pair_word': 1
+    }
+]
+
+
+class FactoryEventRouter:
+    """
+    Route les logs de création de paires/pools vers le décodeur de leur factory.
+    """
+
+    def __init__(self, registry: List[Dict] = None):
+        self.registry = registry if registry is not None else FACTORY_REGISTRY
+        self.routes = {
+            (entry['address'].lower(), _normalize_topic(entry['topic'])): entry
+            for entry in self.registry
+        }
+        # Même table de routage indexée par octets bruts (chemin rapide),
+        # avec la tranche de data contenant l'adresse de la paire
+        self.raw_routes = {
+            (address_bytes(entry['address']), _raw(entry['topic'])): (
+                entry, slice(entry['pair_word'] * 32 + 12, entry['pair_word'] * 32 + 32)
+            )
+            for entry in self.registry
+        }
+
+    @property
+    def addresses(self) -> List[str]:
+        """Adresses de toutes les factories (filtre address du get_logs)"""
+        return [entry['address'] for entry in self.registry]
+
+    @property
+    def topics(self) -> List:
+        """Filtre topics: topic0 = OR de toutes les signatures de création"""
+        return [sorted({_normalize_topic(entry['topic']) for entry in self.registry})]
+
+    def route(self, log) -> Optional[Dict]:
+        """Entrée du registre correspondant au log (None si inconnu)"""
+        if not log['topics']:
+            return None
+        key = (log['address'].lower(), _normalize_topic(log['topics'][0]))
+        return self.routes.get(key)
+
+    def decode(self, log) -> Optional[Dict]:
+        """
+        Décode un log de création.
+
+        Returns:
+            Dict {token0, token1, pair_address, factory, factory_name} ou None
+        """
+        entry = self.route(log)
+        if not entry:
+            return None
+
+        token0, token1, pair_address = entry['decoder'](log)
+        return {
+            'token0': token0,
+            'token1': token1,
+            'pair_address': pair_address,
+            'factory': entry['address'],
+            'factory_name': entry['name']
+        }
+
+    def decode_many(self, logs: List, base_tokens: FrozenSet[bytes]) -> List[Tuple]:
+        """
+        Décode en masse les logs de création appariés à un base token.
+
+        Aucune conversion hex ni checksum: topics/data lus comme octets bruts,
+        adresses comparées en 20 octets. Logs inconnus, annulés (removed) ou
+        sans base token ignorés.
+
+        Args:
+            logs: Logs get_logs / WebSocket (HexBytes, bytes ou hex)
+            base_tokens: Adresses des base tokens en 20 octets
+
+        Returns:
+            Liste de tuples bruts (token, base_token, pair, token0, token1, entrée du registre, bloc)
+            - adresses en 20 octets, à passer par checksum() avant persistance
+        """
+        routes = self.raw_routes
+        emitters = {}  # adresse telle que reçue → 20 octets (peu de factories distinctes)
+        decoded = []
+
+        for log in logs:
+            topics = log['topics']
+            if len(topics) < 3 or log.get('removed'):
+                continue
+
+            address = log['address']
+            emitter = emitters.get(address)
+            if emitter is None:
+                emitter = emitters[address] = _raw(address)[-20:]
+
+            # HexBytes (web3) est déjà un bytes: conversion seulement pour du hex texte
+            topic0, topic1, topic2 = topics[0], topics[1], topics[2]
+            if not isinstance(topic0, bytes):
+                topic0, topic1, topic2 = _raw(topic0), _raw(topic1), _raw(topic2)
+
+            route = routes.get((emitter, topic0))
+            if route is None:
+                continue
+            entry, pair_slice = route
+
+            token0 = _bytes_slice(topic1, _TOPIC_ADDRESS)
+            token1 = _bytes_slice(topic2, _TOPIC_ADDRESS)
+            if token0 in base_tokens:
+                base_token, token = token0, token1
+            elif token1 in base_tokens:
+                base_token, token = token1, token0
+            else:
+                continue  # Paire non appariée à un base token
+
+            data = log['data']
+            if not isinstance(data, bytes):
+                data = _raw(data)
+            pair = _bytes_slice(data, pair_slice)
+            if len(pair) != 20:
+                continue
+
+            decoded.append((token, base_token, pair, token0, token1, entry, log['blockNumber']))
+
+        return decoded
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Head Tracker - Suivi de la tête de chaîne et détection des réorganisations
+Anneau des derniers (bloc, hash, parentHash): une nouvelle tête dont le parentHash
+ne prolonge pas l'anneau déclenche la recherche de l'ancêtre commun (un lot
+eth_getBlockByNumber) puis notifie les abonnés du premier bloc invalidé.
+Les plages en-deçà de confirmed_block() ne sont plus censées changer.
+"""
+
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from rpc_batch import batch_call
+from block_time_index import get_block_time_index
+
+DEFAULT_CONFIRMATIONS = 10  # ~20s sur Base
+DEFAULT_DEPTH = 128  # Blocs conservés dans l'anneau (~4 min sur Base)
+
+
+def _as_int(value) -> int:
+    return int(value, 16) if isinstance(value, str) else value
+
+
+def _as_hash(value) -> str:
+    """HexBytes / bytes / str → hash hex minuscule avec préfixe 0x"""
+    if isinstance(value, (bytes, bytearray)):
+        value = bytes(value).hex()
+    value = value.lower()
+    return value if value.startswith('0x') else '0x' + value
+
+
+class HeadTracker:
+    """
+    Tête de chaîne sûre vis-à-vis des réorganisations.
+
+    - update(): lit la tête, vérifie la filiation, retourne (bloc, timestamp)
+    - confirmed_block(): dernier bloc ayant SCANNER_CONFIRMATIONS confirmations
+    - add_reorg_listener(callback): callback(premier_bloc_invalide) à chaque réorganisation
+    """
+
+    def __init__(self, w3, confirmations: int = None, depth: int = DEFAULT_DEPTH, block_index=None):
+        """
+        Args:
+            w3: Instance Web3
+            confirmations: Profondeur de confirmation (défaut: SCANNER_CONFIRMATIONS ou 10)
+            depth: Nombre de blocs conservés dans l'anneau
+            block_index: BlockTimeIndex optionnel alimenté par chaque tête et purgé sur réorganisation
+        """
+        self.w3 = w3
+        self.confirmations = max(0, int(
+            confirmations if confirmations is not None else os.getenv('SCANNER_CONFIRMATIONS', DEFAULT_CONFIRMATIONS)
+        ))
+        self.depth = max(2, depth)
+        self.block_index = block_index
+
+        self.blocks = {}  # numéro → (hash, parent_hash)
+        self.head = None  # (numéro, timestamp)
+        self.listeners = []
+        self._lock = threading.Lock()
+
+        self.stats = {'updates': 0, 'reorgs': 0, 'deepest_reorg': 0}
+
+        if block_index is not None:
+            self.add_reorg_listener(block_index.forget_from)
+
+    def add_reorg_listener(self, callback: Callable[[int], None]):
+        """Abonne callback(premier bloc invalidé) aux réorganisations"""
+        self.listeners.append(callback)
+
+    # ==================== LECTURES RPC ====================
+
+    def _fetch_hashes(self, block_numbers: List[int]) -> Dict[int, str]:
+        """Hash canonique actuel d'une liste de blocs (un lot JSON-RPC)"""
+        responses = batch_call(self.w3, [('eth_getBlockByNumber', [hex(number), False]) for number in block_numbers])
+
+        hashes = {}
+        for response in responses:
+            block = response.get('result')
+            if block:
+                hashes[_as_int(block['number'])] = _as_hash(block['hash'])
+        return hashes
+
+    # ==================== SUIVI DE TÊTE ====================
+
+    def update(self) -> Tuple[int, int]:
+        """
+        Lit la tête courante et vérifie qu'elle prolonge la chaîne connue.
+
+        Returns:
+            (numéro du bloc courant, timestamp)
+        """
+        block = self.w3.eth.get_block('latest')
+        self.record(block['number'], block['hash'], block['parentHash'], block['timestamp'])
+        return block['number'], block['timestamp']
+
+    def record(self, number: int, block_hash, parent_hash, timestamp: int) -> Optional[int]:
+        """
+        Ajoute une tête déjà connue (get_block, newHeads...).
+
+        Returns:
+            Premier bloc invalidé si une réorganisation a été détectée, sinon None
+        """
+        block_hash = _as_hash(block_hash)
+        parent_hash = _as_hash(parent_hash)
+        fork_block = None
+
+        with self._lock:
+            self.stats['updates'] += 1
+            known = self.blocks.get(number)
+            if known and known[0] == block_hash:
+                return None
+
+            if self.blocks:
+                if known is None and number < max(self.blocks):
+                    # RPC de secours en retard sur une hauteur non suivie: pas une réorganisation
+                    return None
+                fork_block = self._find_fork(number, parent_hash)
+
+            if fork_block is not None:
+                for stale in [n for n in self.blocks if n >= fork_block]:
+                    del self.blocks[stale]
+
+            self.blocks[number] = (block_hash, parent_hash)
+            while len(self.blocks) > self.depth:
+                del self.blocks[min(self.blocks)]
+            self.head = (number, timestamp)
+
+        self._notify(fork_block)
+        if self.block_index is not None:
+            self.block_index.record(number, timestamp)
+
+        return fork_block
+
+    def _find_fork(self, number: int, parent_hash: str) -> Optional[int]:
+        """
+        Premier bloc de l'anneau qui n'est plus canonique (None si la chaîne connue tient).
+        Appelé sous verrou, l'anneau n'est pas vide.
+        """
+        below = sorted(n for n in self.blocks if n < number)
+        replaced = any(n >= number for n in self.blocks)  # Hauteur déjà suivie avec un autre hash
+
+        # Cas courant: un seul contrôle de filiation sur le plus haut bloc connu
+        if below:
+            highest = below[-1]
+            if highest == number - 1:
+                known_hash = self.blocks[highest][0]
+                if known_hash == parent_hash:
+                    return number if replaced else None
+            else:
+                # Saut de plusieurs blocs (polling): hash canonique actuel du dernier bloc suivi
+                known_hash = self._fetch_hashes([highest]).get(highest)
+                if known_hash == self.blocks[highest][0]:
+                    return number if replaced else None
+
+        # Filiation rompue: ancêtre commun cherché sur tout l'anneau en un lot
+        canonical = self._fetch_hashes(below) if below else {}
+        canonical[number - 1] = parent_hash
+
+        fork_block = number
+        for block_number in reversed(below):
+            if canonical.get(block_number) == self.blocks[block_number][0]:
+                break
+            fork_block = block_number
+
+        if fork_block == number and not replaced:
+            return None
+        return fork_block
+
+    def _notify(self, fork_block: Optional[int]):
+        if fork_block is None:
+            return
+
+        depth = (self.head[0] if self.head else fork_block) - fork_block + 1
+        self.stats['reorgs'] += 1
+        self.stats['deepest_reorg'] = max(self.stats['deepest_reorg'], depth)
+        print(f"🔀 Réorganisation détectée: blocs >= {fork_block} invalidés (profondeur {depth})")
+
+        for callback in self.listeners:
+            try:
+                callback(fork_block)
+            except Exception as e:
+                print(f"⚠️  Erreur abonné réorganisation: {e}")
+
+    def confirmed_block(self, head: Optional[int] = None) -> int:
+        """Dernier bloc considéré comme définitif (tête - confirmations)"""
+        if head is None:
+            head = self.head[0] if self.head else self.update()[0]
+        return max(0, head - self.confirmations)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return dict(self.stats, tracked_blocks=len(self.blocks), head=self.head[0] if self.head else None)
+
+
+_shared_trackers = {}
+_shared_trackers_lock = threading.Lock()
+
+
+def get_head_tracker(w3) -> HeadTracker:
+    """Tracker partagé par instance Web3, branché sur l'index de timestamps partagé"""
+    with _shared_trackers_lock:
+        key = id(w3)
+        if key not in _shared_trackers:
+            _shared_trackers[key] = HeadTracker(w3, block_index=get_block_time_index(w3))
+        return _shared_trackers[key]
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Holder Index - Registre local des balances d'un token reconstruit depuis ses Transfer
+Premier passage: depuis le bloc de création du token (ou de sa paire, avec une
+marge HOLDER_INDEX_CREATION_MARGIN_BLOCKS pour le déploiement), à défaut sur
+HOLDER_INDEX_HISTORY_BLOCKS, ensuite seuls les blocs confirmés apparus depuis la dernière synchronisation.
+Nombre exact de holders, part du plus gros holder, part de l'owner (ou du
+déployeur) et concentration calculés localement, sans Blockchair/BaseScan.
+"""
+
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from web3 import Web3
+
+PROJECT_DIR = Path(__file__).parent.parent
+DEFAULT_INDEX_PATH = PROJECT_DIR / 'data' / 'holder_index.db'
+DEFAULT_HISTORY_BLOCKS = 302400  # 7 jours sur Base: couvre le déploiement des tokens de la fenêtre scanner
+DEFAULT_CREATION_MARGIN_BLOCKS = 1800  # 1h avant la création de la paire: mint au déploiement du token
+
+TRANSFER_TOPIC = Web3.keccak(text="Transfer(address,address,uint256)").hex()
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+BURN_ADDRESSES = {ZERO_ADDRESS, "0x000000000000000000000000000000000000dead"}
+
+_bytes_slice = bytes.__getitem__
+_TOPIC_ADDRESS = slice(12, 32)
+
+
+def _raw(value) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    return bytes.fromhex(value[2:] if value.startswith('0x') else value)
+
+
+class HolderIndex:
+    """
+    Balances par (token, holder) dans SQLite (WAL), balances stockées en texte
+    décimal (uint256).
+
+    - sync(token): intègre les Transfer jusqu'au dernier bloc confirmé
+    - get_metrics(token, exclude): holders, part du plus gros holder, top 10, HHI
+    - forget_from(bloc): réorganisation, les tokens touchés sont reconstruits
+    """
+
+    def __init__(self, w3, db_path: Path = None, log_fetcher=None, head_tracker=None,
+                 history_blocks: int = None, creation_margin: int = None):
+        """
+        Args:
+            w3: Instance Web3
+            db_path: Fichier SQLite (défaut: HOLDER_INDEX_PATH ou data/holder_index.db,
+                chemin relatif résolu depuis la racine du projet)
+            log_fetcher: ParallelLogFetcher (défaut: créé à la demande sur RPC_URL + RPC_BACKUP_*)
+            head_tracker: HeadTracker (défaut: tracker partagé de w3)
+            history_blocks: Profondeur du premier passage en blocs (bloc de création inconnu)
+            creation_margin: Blocs relus avant le bloc de création fourni à sync
+        """
+        self.w3 = w3
+        self.db_path = Path(db_path or os.getenv('HOLDER_INDEX_PATH', DEFAULT_INDEX_PATH))
+        if not self.db_path.is_absolute():
+            self.db_path = PROJECT_DIR / self.db_path  # Relatif à la racine du projet, pas au cwd
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.history_blocks = int(history_blocks or os.getenv('HOLDER_INDEX_HISTORY_BLOCKS', DEFAULT_HISTORY_BLOCKS))
+        self.creation_margin = int(creation_margin if creation_margin is not None else os.getenv(
+            'HOLDER_INDEX_CREATION_MARGIN_BLOCKS', DEFAULT_CREATION_MARGIN_BLOCKS))
+
+        self._log_fetcher = log_fetcher
+        if head_tracker is None:
+            from head_tracker import get_head_tracker
+            head_tracker = get_head_tracker(w3)
+        self.head_tracker = head_tracker
+        self.head_tracker.add_reorg_listener(self.forget_from)
+
+        self._lock = threading.Lock()
+        self.stats = {'syncs': 0, 'transfers': 0, 'rebuilds': 0}
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _init_database(self):
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS holder_tokens (
+                token TEXT PRIMARY KEY,
+                start_block INTEGER NOT NULL,
+                synced_block INTEGER NOT NULL,
+                transfers INTEGER DEFAULT 0,
+                complete INTEGER DEFAULT 1,
+                minter TEXT,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS holder_balances (
+                token TEXT NOT NULL,
+                holder TEXT NOT NULL,
+                balance TEXT NOT NULL,
+                PRIMARY KEY (token, holder)
+            )
+        ''')
+
+        # Migration: déployeur (premier mint) absent des registres créés avant
+        columns = {row[1] for row in cursor.execute("PRAGMA table_info(holder_tokens)")}
+        if 'minter' not in columns:
+            cursor.execute("ALTER TABLE holder_tokens ADD COLUMN minter TEXT")
+
+        conn.commit()
+        conn.close()
+
+    @property
+    def log_fetcher(self):
+        """Moteur get_logs parallèle, créé au premier besoin"""
+        if self._log_fetcher is None:
+            from log_fetcher import ParallelLogFetcher
+            self._log_fetcher = ParallelLogFetcher(
+                rpc_urls=[
+                    os.getenv('RPC_URL', 'https://mainnet.base.org'),
+                    os.getenv('RPC_BACKUP_1', ''),
+                    os.getenv('RPC_BACKUP_2', ''),
+                    os.getenv('RPC_BACKUP_3', '')
+                ],
+                concurrency=int(os.getenv('LOG_FETCH_CONCURRENCY', 8))
+            )
+        return self._log_fetcher
+
+    # ==================== SYNCHRONISATION ====================
+
+    @staticmethod
+    def _deltas(logs: List) -> Dict[str, int]:
+        """Variation de balance par adresse sur un lot de Transfer"""
+        deltas = {}
+        for log in logs:
+            topics = log['topics']
+            if len(topics) < 3:
+                continue  # Transfer ERC721 / non standard
+
+            data = _raw(log['data'])
+            if len(data) < 32:
+                continue
+
+            value = int.from_bytes(data[:32], 'big')
+            if value == 0:
+                continue
+
+            sender = '0x' + _bytes_slice(_raw(topics[1]), _TOPIC_ADDRESS).hex()
+            receiver = '0x' + _bytes_slice(_raw(topics[2]), _TOPIC_ADDRESS).hex()
+            deltas[sender] = deltas.get(sender, 0) - value
+            deltas[receiver] = deltas.get(receiver, 0) + value
+        return deltas
+
+    def _state(self, conn: sqlite3.Connection, token: str) -> Optional[tuple]:
+        return conn.execute(
+            "SELECT start_block, synced_block, complete FROM holder_tokens WHERE token = ?", (token,)
+        ).fetchone()
+
+    @staticmethod
+    def _first_minter(logs: List) -> Optional[str]:
+        """Destinataire du premier mint (Transfer depuis l'adresse zéro): déployeur du token"""
+        mints = [log for log in logs
+                 if len(log['topics']) >= 3 and _bytes_slice(_raw(log['topics'][1]), _TOPIC_ADDRESS) == bytes(20)]
+        if not mints:
+            return None
+        first = min(mints, key=lambda log: (log['blockNumber'], log.get('logIndex', 0)))
+        return '0x' + _bytes_slice(_raw(first['topics'][2]), _TOPIC_ADDRESS).hex()
+
+    def sync(self, token_address: str, to_block: Optional[int] = None,
+             created_block: Optional[int] = None) -> Optional[int]:
+        """
+        Intègre les Transfer du token jusqu'au dernier bloc confirmé.
+
+        Le get_logs se fait hors verrou: seule l'écriture du lot le prend, et un lot
+        dont le registre a bougé entre-temps (autre sync, réorganisation) est abandonné.
+
+        Args:
+            token_address: Token
+            to_block: Dernier bloc à intégrer (défaut: dernier bloc confirmé)
+            created_block: Bloc de création du token ou de sa paire: premier passage
+                depuis ce bloc (moins creation_margin) plutôt que sur history_blocks
+
+        Returns:
+            Dernier bloc intégré (None si aucun passage possible)
+        """
+        token = token_address.lower()
+        if to_block is None:
+            to_block = self.head_tracker.confirmed_block()
+
+        with self._lock:
+            conn = self._connect()
+            try:
+                row = self._state(conn, token)
+                if row and row[2] and created_block is not None and row[0] > created_block:
+                    # Registre commencé après la création: transferts antérieurs manquants
+                    with conn:
+                        conn.execute("UPDATE holder_tokens SET complete = 0 WHERE token = ?", (token,))
+                    row = (row[0], row[1], 0)
+            finally:
+                conn.close()
+
+        if row:
+            start_block, synced_block, complete = row
+            from_block = synced_block + 1
+        else:
+            if created_block is not None:
+                start_block = max(0, min(created_block, to_block) - self.creation_margin)
+            else:
+                start_block = max(0, to_block - self.history_blocks)
+            synced_block, complete = start_block - 1, 1
+            from_block = start_block
+
+        if from_block > to_block:
+            return synced_block
+
+        logs, synced_to = self.log_fetcher.fetch_logs(
+            address=Web3.to_checksum_address(token),
+            topics=[TRANSFER_TOPIC],
+            from_block=from_block,
+            to_block=to_block
+        )
+        if synced_to < from_block:
+            return synced_block if row else None
+
+        deltas = self._deltas(logs)
+
+        with self._lock:
+            conn = self._connect()
+            try:
+                current = self._state(conn, token)
+                if (current[1] if current else None) != (synced_block if row else None):
+                    # Registre avancé ou purgé pendant le get_logs: lot déjà intégré ou périmé
+                    return current[1] if current else None
+
+                if not row:
+                    self.stats['rebuilds'] += 1
+                self.stats['syncs'] += 1
+                self.stats['transfers'] += len(logs)
+
+                with conn:
+                    balances = {}
+                    holders = list(deltas)
+                    for start in range(0, len(holders), 500):
+                        chunk = holders[start:start + 500]
+                        placeholders = ','.join('?' * len(chunk))
+                        for holder, balance in conn.execute(
+                            f"SELECT holder, balance FROM holder_balances WHERE token = ? AND holder IN ({placeholders})",
+                            [token] + chunk
+                        ):
+                            balances[holder] = int(balance)
+
+                    updated = []
+                    emptied = []
+                    for holder, delta in deltas.items():
+                        balance = balances.get(holder, 0) + delta
+                        if balance == 0:
+                            emptied.append((token, holder))
+                        else:
+                            if balance < 0 and holder != ZERO_ADDRESS:
+                                complete = 0  # Historique antérieur manquant (mint avant start_block)
+                            updated.append((token, holder, str(balance)))
+
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO holder_balances (token, holder, balance) VALUES (?, ?, ?)",
+                        updated
+                    )
+                    conn.executemany("DELETE FROM holder_balances WHERE token = ? AND holder = ?", emptied)
+                    conn.execute('''
+                        INSERT INTO holder_tokens (token, start_block, synced_block, transfers, complete, minter, updated_at)
+                        VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                        ON CONFLICT(token) DO UPDATE SET
+                            synced_block = excluded.synced_block,
+                            transfers = holder_tokens.transfers + excluded.transfers,
+                            complete = excluded.complete,
+                            minter = COALESCE(holder_tokens.minter, excluded.minter),
+                            updated_at = excluded.updated_at
+                    ''', (token, start_block, synced_to, len(logs), complete, self._first_minter(logs)))
+
+                return synced_to
+            finally:
+                conn.close()
+
+    def forget_from(self, block: int):
+        """Réorganisation: registres ayant intégré des blocs >= block supprimés (reconstruits au prochain sync)"""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                tokens = [row[0] for row in conn.execute(
+                    "SELECT token FROM holder_tokens WHERE synced_block >= ?", (block,)
+                )]
+                conn.executemany("DELETE FROM holder_balances WHERE token = ?", [(t,) for t in tokens])
+                conn.executemany("DELETE FROM holder_tokens WHERE token = ?", [(t,) for t in tokens])
+            conn.close()
+
+    # ==================== MÉTRIQUES ====================
+
+    def get_metrics(self, token_address: str, exclude: Iterable[str] = (), owner: Optional[str] = None) -> Optional[Dict]:
+        """
+        Distribution du token depuis le registre local.
+
+        Args:
+            exclude: Adresses hors calcul de concentration (paires/pools de liquidité)
+            owner: Adresse owner() du token (défaut: déployeur, destinataire du premier mint vu)
+
+        Returns:
+            dict holder_count, top_holder, top_holder_percentage, top10_percentage,
+            hhi (0-10000), circulating_supply, owner, owner_percentage (None si ni owner
+            ni déployeur connus, 0 si renoncé), complete, synced_block
+            ou None si le token n'est pas indexé
+        """
+        token = token_address.lower()
+        excluded = {address.lower() for address in exclude} | BURN_ADDRESSES
+
+        conn = self._connect()
+        state = conn.execute(
+            "SELECT synced_block, complete, minter FROM holder_tokens WHERE token = ?", (token,)
+        ).fetchone()
+        rows = conn.execute(
+            "SELECT holder, balance FROM holder_balances WHERE token = ?", (token,)
+        ).fetchall() if state else []
+        conn.close()
+
+        if not state:
+            return None
+
+        balances = [(holder, int(balance)) for holder, balance in rows]
+        holder_count = sum(1 for holder, balance in balances if balance > 0 and holder != ZERO_ADDRESS)
+
+        # Concentration hors pools et adresses de burn
+        circulating = [balance for holder, balance in balances if balance > 0 and holder not in excluded]
+        circulating.sort(reverse=True)
+        total = sum(circulating)
+
+        top_holder = None
+        if circulating:
+            top_balance = circulating[0]
+            top_holder = next(holder for holder, balance in balances
+                              if balance == top_balance and holder not in excluded)
+
+        # Part de l'owner (ou du déployeur) dans la supply en circulation
+        owner = (owner or state[2] or '').lower() or None
+        owner_percentage = None
+        if owner in excluded:
+            owner_percentage = 0.0  # Owner renoncé (burn) ou détenu par la paire
+        elif owner:
+            owner_balance = next((balance for holder, balance in balances if holder == owner), 0)
+            owner_percentage = max(owner_balance, 0) / total * 100 if total else 0.0
+
+        return {
+            'holder_count': holder_count,
+            'top_holder': top_holder,
+            'top_holder_percentage': circulating[0] / total * 100 if total else 0.0,
+            'top10_percentage': sum(circulating[:10]) / total * 100 if total else 0.0,
+            'hhi': sum((balance / total) ** 2 for balance in circulating) * 10000 if total else 0.0,
+            'circulating_supply': total,
+            'owner': owner,
+            'owner_percentage': owner_percentage,
+            'complete': bool(state[1]),
+            'synced_block': state[0]
+        }
+
+    def get_stats(self) -> Dict:
+        conn = self._connect()
+        tokens = conn.execute("SELECT COUNT(*) FROM holder_tokens").fetchone()[0]
+        conn.close()
+        return dict(self.stats, tokens=tokens)
+
+
+_shared_indexes = {}
+_shared_indexes_lock = threading.Lock()
+
+
+def get_holder_index(w3) -> HolderIndex:
+    """Registre partagé par instance Web3"""
+    with _shared_indexes_lock:
+        key = id(w3)
+        if key not in _shared_indexes:
+            _shared_indexes[key] = HolderIndex(w3)
+        return _shared_indexes[key]
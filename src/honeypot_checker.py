@@ -9,6 +9,10 @@ from typing import Dict, Optional
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from circuit_breaker import get_circuit_breaker, CircuitOpenError
+
+WETH = "0x4200000000000000000000000000000000000006"
+
 
 class HoneypotChecker:
     """Vérification honeypot via API Honeypot.is"""
@@ -16,6 +20,11 @@ class HoneypotChecker:
     def __init__(self):
         self.api_url = "https://api.honeypot.is/v2/IsHoneypot"
         self.session = self._create_session()
+        self.breaker = get_circuit_breaker('honeypot', probe=self._probe)
+
+    def _probe(self):
+        """Requête légère de la sonde du disjoncteur"""
+        return self.session.get(self.api_url, params={'address': WETH, 'chainID': 8453}, timeout=8)
 
     def _create_session(self) -> requests.Session:
         """Crée une session avec retry automatique"""
@@ -60,7 +69,8 @@ class HoneypotChecker:
                 'chainID': chain_id
             }
 
-            response = self.session.get(
+            response = self.breaker.call(
+                self.session.get,
                 self.api_url,
                 params=params,
                 timeout=8  # Timeout court pour ne pas bloquer le bot
@@ -165,6 +175,9 @@ class HoneypotChecker:
                 'error': None
             }
 
+        except CircuitOpenError:
+            # API indisponible: rejet immédiat au lieu d'attendre le timeout
+            return self._error_response("API circuit open")
         except requests.Timeout:
             # Timeout = rejeter par sécurité mais pas bloquer le bot
             return self._error_response("API timeout")
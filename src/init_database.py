@@ -24,20 +24,43 @@ def init_database():
     # Activer les foreign keys
     cursor.execute('PRAGMA foreign_keys = ON')
     
-    # Table scanner_state
+    # Table scanner_state (curseur "dernier bloc scanné" par factory)
+    # Migration: l'ancien singleton (id = 1) n'a jamais été alimenté, on le remplace
+    cursor.execute("PRAGMA table_info(scanner_state)")
+    state_columns = [col[1] for col in cursor.fetchall()]
+    if state_columns and 'factory' not in state_columns:
+        cursor.execute("DROP TABLE scanner_state")
+
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS scanner_state (
-            id INTEGER PRIMARY KEY CHECK(id = 1),
+            factory TEXT PRIMARY KEY,
             last_block INTEGER DEFAULT 0,
             last_update TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     ''')
-    
-    # Initialiser scanner_state
+
+    # Table pair_events (événements PairCreated stockés localement par le Scanner)
+    # queue_status: 0 = en attente, 1 = traité, 2 = rejeté (présélection), 3 = expiré
     cursor.execute('''
-        INSERT OR IGNORE INTO scanner_state (id, last_block)
-        VALUES (1, 0)
+        CREATE TABLE IF NOT EXISTS pair_events (
+            pair_address TEXT PRIMARY KEY,
+            token_address TEXT NOT NULL,
+            base_token TEXT NOT NULL,
+            factory TEXT NOT NULL,
+            factory_name TEXT,
+            block_number INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            queue_status INTEGER DEFAULT 0,
+            processed_at TIMESTAMP
+        )
     ''')
+
+    # Migration: file de travail ajoutée sur une table pair_events existante
+    cursor.execute("PRAGMA table_info(pair_events)")
+    event_columns = [col[1] for col in cursor.fetchall()]
+    if 'queue_status' not in event_columns:
+        cursor.execute("ALTER TABLE pair_events ADD COLUMN queue_status INTEGER DEFAULT 0")
+        cursor.execute("ALTER TABLE pair_events ADD COLUMN processed_at TIMESTAMP")
     
     # Table discovered_tokens (schéma complet aligné avec Scanner.py et Filter.py)
     # ✅ SCHEMA UNIFIÉ avec pair_created_at (date blockchain) et discovered_at (date découverte)
@@ -68,9 +91,15 @@ def init_database():
             owner_percentage REAL DEFAULT 100.0,
             buy_tax REAL,
             sell_tax REAL,
+            owner_renounced INTEGER,
             discovered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     ''')
+
+    # Migration: renonciation owner() ajoutée sur une table discovered_tokens existante
+    cursor.execute("PRAGMA table_info(discovered_tokens)")
+    if 'owner_renounced' not in [col[1] for col in cursor.fetchall()]:
+        cursor.execute("ALTER TABLE discovered_tokens ADD COLUMN owner_renounced INTEGER")
     
     # Table approved_tokens (schéma aligné avec filter.py et trader.py)
     cursor.execute('''
@@ -234,12 +263,14 @@ def init_database():
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_trade_log_time ON trade_log(timestamp DESC)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_trailing_token ON trailing_level_stats(token_address)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_losing_cooldown_until ON losing_tokens_cooldown(cooldown_until)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_pair_events_block ON pair_events(block_number)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_pair_events_queue ON pair_events(queue_status, block_number)')
     
     conn.commit()
     conn.close()
     
     print(f"✅ Base de données initialisée: {DB_PATH}")
-    print(f"📊 Tables créées: 10")
+    print(f"📊 Tables créées: 11")
     print(f"📈 Stratégie: Momentum Safe v2 (fenêtre 3.5-8h)")
     print(f"⚙️ Configuration: 15% position, max 2 positions, 3 trades/jour")
     print(f"🔒 Discipline: Losing token cooldown 24h actif")
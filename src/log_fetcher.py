@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Log Fetcher - Moteur get_logs parallèle par chunks
+Répartit les chunks de blocs sur tous les RPC configurés (pool de workers borné)
+et réassemble les logs dans l'ordre des blocs.
+La taille des chunks s'adapte aux réponses de chaque RPC (AdaptiveRangeController).
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, List, Optional, Tuple
+from rpc_batch import make_web3
+
+DEFAULT_CHUNK_SIZE = 1000  # Taille initiale (blocs par requête get_logs)
+MIN_CHUNK_SIZE = 10
+MAX_CHUNK_SIZE = 10000
+DEFAULT_CONCURRENCY = 8  # Requêtes get_logs simultanées
+MAX_ATTEMPTS_PER_CHUNK = 3  # Tentatives par chunk (sur des RPC différents)
+CEILING_DECAY_SUCCESSES = 20  # Succès consécutifs avant de relever le plafond d'un RPC
+
+# Messages renvoyés par les providers quand la plage est trop large
+RANGE_LIMIT_MARKERS = [
+    'more than', 'too many', 'limit exceeded', 'exceeds', 'block range',
+    'range is too large', 'response size', '-32005', 'query timeout'
+]
+# Timeouts réseau: réessayés sur chaque autre RPC, puis plage en échec (panne, pas taille)
+TIMEOUT_MARKERS = ['timeout', 'timed out']
+
+
+class AdaptiveRangeController:
+    """
+    Taille de plage get_logs adaptative, mémorisée par RPC.
+
+    - Succès rapide → la plage grandit (x grow_factor)
+    - "query returned more than N results" (ou timeouts sur tous les RPC) → la plage
+      est divisée par 2 et la taille en échec devient un plafond pour ce RPC
+    - Le plafond est relevé (x grow_factor) après ceiling_decay succès consécutifs,
+      pour qu'une panne passagère ne réduise pas la plage définitivement
+    - La meilleure taille ayant réussi est conservée par RPC
+    """
+
+    def __init__(self, initial_size: int = DEFAULT_CHUNK_SIZE, min_size: int = MIN_CHUNK_SIZE,
+                 max_size: int = MAX_CHUNK_SIZE, grow_factor: float = 1.5,
+                 fast_latency: float = 1.0, ceiling_decay: int = CEILING_DECAY_SUCCESSES):
+        """
+        Args:
+            initial_size: Taille de départ pour un RPC inconnu
+            min_size: Taille minimale (jamais en dessous)
+            max_size: Taille maximale (jamais au-dessus)
+            grow_factor: Facteur de croissance après un succès rapide
+            fast_latency: Latence (s) en dessous de laquelle un succès est "rapide"
+            ceiling_decay: Succès consécutifs avant de relever le plafond
+        """
+        self.initial_size = initial_size
+        self.min_size = min_size
+        self.max_size = max_size
+        self.grow_factor = grow_factor
+        self.fast_latency = fast_latency
+        self.ceiling_decay = ceiling_decay
+
+        self.sizes = {}  # endpoint -> taille courante
+        self.ceilings = {}  # endpoint -> plus petite taille en échec
+        self.streaks = {}  # endpoint -> succès consécutifs depuis le dernier échec
+        self.best = {}  # endpoint -> plus grande taille réussie
+        self._lock = threading.Lock()
+
+    def size_for(self, endpoint: str) -> int:
+        """Taille de plage à utiliser pour ce RPC"""
+        with self._lock:
+            return int(self.sizes.get(endpoint, self.initial_size))
+
+    def on_success(self, endpoint: str, blocks: int, latency: float):
+        """Enregistre un succès (blocks = taille de la plage demandée)"""
+        with self._lock:
+            self.best[endpoint] = max(self.best.get(endpoint, 0), blocks)
+            current = self.sizes.get(endpoint, self.initial_size)
+
+            # Plafond ancien: le relever après une série de succès
+            self.streaks[endpoint] = self.streaks.get(endpoint, 0) + 1
+            ceiling = self.ceilings.get(endpoint)
+            if ceiling is not None and self.streaks[endpoint] >= self.ceiling_decay:
+                self.streaks[endpoint] = 0
+                raised = int(ceiling * self.grow_factor)
+                if raised > self.max_size:
+                    del self.ceilings[endpoint]
+                else:
+                    self.ceilings[endpoint] = raised
+
+            if latency < self.fast_latency and blocks >= current:
+                grown = current * self.grow_factor
+                ceiling = self.ceilings.get(endpoint)
+                if ceiling is not None:
+                    grown = min(grown, ceiling - 1)
+                self.sizes[endpoint] = max(self.min_size, min(self.max_size, grown))
+
+    def on_range_error(self, endpoint: str, blocks: int):
+        """Plage trop large (limite de résultats ou timeouts répétés): réduire et plafonner"""
+        with self._lock:
+            self.streaks[endpoint] = 0
+            ceiling = self.ceilings.get(endpoint)
+            self.ceilings[endpoint] = blocks if ceiling is None else min(ceiling, blocks)
+            self.sizes[endpoint] = max(self.min_size, blocks // 2)
+
+    def get_best_sizes(self) -> Dict[str, int]:
+        """Meilleure taille réussie par RPC"""
+        with self._lock:
+            return dict(self.best)
+
+    @staticmethod
+    def is_range_error(error: Exception) -> bool:
+        """True si le RPC refuse explicitement la plage (à découper)"""
+        message = str(error).lower()
+        return any(marker in message for marker in RANGE_LIMIT_MARKERS)
+
+    @staticmethod
+    def is_timeout(error: Exception) -> bool:
+        """True si la requête a expiré (RPC lent ou plage trop lourde)"""
+        message = str(error).lower()
+        return isinstance(error, TimeoutError) or any(marker in message for marker in TIMEOUT_MARKERS)
+
+
+class ParallelLogFetcher:
+    """
+    Récupère des logs sur de grandes plages de blocs en parallèle.
+
+    - Les chunks sont distribués en round-robin sur tous les RPC
+    - La taille de chaque chunk est choisie par le contrôleur adaptatif du RPC cible
+    - Un chunk refusé (limite de résultats) est coupé en deux, jamais sous MIN_CHUNK_SIZE
+    - Un chunk en timeout est d'abord réessayé sur les autres RPC, puis coupé
+      s'il expire partout
+    - Un chunk en échec est réessayé sur le RPC suivant
+    - Les logs sont réassemblés par (blockNumber, logIndex)
+    """
+
+    def __init__(self, rpc_urls: List[str], concurrency: int = DEFAULT_CONCURRENCY,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, request_timeout: int = 10,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            rpc_urls: Liste des RPC HTTP (RPC_URL + RPC_BACKUP_*)
+            concurrency: Nombre maximum de requêtes get_logs en vol
+            chunk_size: Nombre de blocs par requête au démarrage (ajusté par RPC ensuite)
+            request_timeout: Timeout HTTP par requête (secondes)
+            logger: Logger optionnel
+        """
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+        self.concurrency = max(1, concurrency)
+        self.range_controller = AdaptiveRangeController(initial_size=max(MIN_CHUNK_SIZE, chunk_size))
+
+        self.endpoints = []
+        for url in rpc_urls:
+            if not url:
+                continue
+            self.endpoints.append({
+                'url': url,
+                'w3': make_web3(url, timeout=request_timeout)
+            })
+
+        if not self.endpoints:
+            raise ValueError("Aucun RPC configuré pour le log fetcher")
+
+        self.executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='get_logs')
+
+        # Statistiques cumulées
+        self.stats = {
+            'requests': 0,
+            'errors': 0,
+            'blocks': 0,
+            'seconds': 0.0,
+            'splits': 0
+        }
+
+    def _get_logs(self, endpoint_index: int, params: Dict) -> Tuple[List, float]:
+        """Exécute un get_logs sur un RPC donné, retourne (logs, latence)"""
+        started = time.time()
+        logs = self.endpoints[endpoint_index]['w3'].eth.get_logs(params)
+        return logs, time.time() - started
+
+    def fetch_logs(self, address, topics: List, from_block: int, to_block: int) -> Tuple[List, int]:
+        """
+        Récupère les logs d'une adresse sur une plage de blocs.
+
+        Returns:
+            (logs triés par bloc, dernier bloc couvert sans interruption)
+        """
+        return self.fetch_many([{
+            'address': address,
+            'topics': topics,
+            'from_block': from_block,
+            'to_block': to_block
+        }])[0]
+
+    def fetch_many(self, queries: List[Dict]) -> List[Tuple[List, int]]:
+        """
+        Exécute plusieurs requêtes (ex: une par factory) dans un même passage parallèle.
+
+        Args:
+            queries: Liste de dicts {address, topics, from_block, to_block}
+
+        Returns:
+            Pour chaque requête: (logs triés, dernier bloc couvert sans interruption).
+            En cas de chunk définitivement en échec (erreur répétée, timeout sur tous
+            les RPC, plage minimale refusée partout), seuls les logs précédant le trou
+            sont retournés et le bloc couvert s'arrête juste avant.
+        """
+        started = time.time()
+
+        cursors = [query['from_block'] for query in queries]  # Prochain bloc à découper
+        retry_queue = deque()  # Plages à réessayer ou issues d'un découpage
+        results = {}  # (requête, from) -> (to, logs)
+        failed = {}  # requête -> premier bloc en échec définitif
+        pending = {}  # future -> (plage, index RPC)
+        round_robin = [0]
+        chunk_count = 0
+
+        def fail(chunk: Dict, reason: str):
+            """Plage abandonnée pour ce passage: la requête s'arrête avant elle"""
+            self.logger.warning(f"⚠️  Chunk {chunk['from']}-{chunk['to']} abandonné: {reason[:120]}")
+            previous = failed.get(chunk['query'])
+            failed[chunk['query']] = chunk['from'] if previous is None else min(previous, chunk['from'])
+
+        def carve(endpoint_index: int) -> Optional[Dict]:
+            """Découpe la prochaine plage à la taille adaptée au RPC"""
+            size = self.range_controller.size_for(self.endpoints[endpoint_index]['url'])
+            for query_index, query in enumerate(queries):
+                if query_index in failed or cursors[query_index] > query['to_block']:
+                    continue
+                start = cursors[query_index]
+                end = min(start + size - 1, query['to_block'])
+                cursors[query_index] = end + 1
+                return {'query': query_index, 'from': start, 'to': end, 'attempts': 0, 'timeouts': 0,
+                        'endpoint': None}
+            return None
+
+        def submit() -> bool:
+            nonlocal chunk_count
+            if retry_queue:
+                chunk = retry_queue.popleft()
+                endpoint_index = (chunk['endpoint'] + 1) % len(self.endpoints) if chunk['endpoint'] is not None \
+                    else round_robin[0] % len(self.endpoints)
+            else:
+                endpoint_index = round_robin[0] % len(self.endpoints)
+                chunk = carve(endpoint_index)
+                if chunk is None:
+                    return False
+            round_robin[0] += 1
+            chunk_count += 1
+
+            query = queries[chunk['query']]
+            chunk['endpoint'] = endpoint_index
+            params = {
+                'fromBlock': chunk['from'],
+                'toBlock': chunk['to'],
+                'address': query['address'],
+                'topics': query['topics']
+            }
+            future = self.executor.submit(self._get_logs, endpoint_index, params)
+            pending[future] = chunk
+            return True
+
+        while True:
+            # Remplir le pool jusqu'à la concurrence configurée
+            while len(pending) < self.concurrency and submit():
+                pass
+
+            if not pending:
+                break
+
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk = pending.pop(future)
+                endpoint_url = self.endpoints[chunk['endpoint']]['url']
+                blocks = chunk['to'] - chunk['from'] + 1
+                self.stats['requests'] += 1
+
+                try:
+                    logs, latency = future.result()
+                    self.range_controller.on_success(endpoint_url, blocks, latency)
+                    results[(chunk['query'], chunk['from'])] = (chunk['to'], logs)
+
+                except Exception as e:
+                    self.stats['errors'] += 1
+
+                    # Timeout: réessayer tel quel sur les autres RPC; un tour complet en
+                    # timeout est une panne, pas une plage trop large: pas de découpe
+                    if AdaptiveRangeController.is_timeout(e):
+                        chunk['timeouts'] += 1
+                        if chunk['timeouts'] < len(self.endpoints):
+                            retry_queue.append(chunk)
+                        else:
+                            fail(chunk, f"timeout sur les {len(self.endpoints)} RPC")
+                        continue
+
+                    if AdaptiveRangeController.is_range_error(e):
+                        self.range_controller.on_range_error(endpoint_url, blocks)
+                        if blocks >= 2 * self.range_controller.min_size:
+                            # Plage trop large pour ce RPC: couper en deux (moitiés jamais sous la taille minimale)
+                            self.stats['splits'] += 1
+                            middle = chunk['from'] + blocks // 2
+                            fresh = {'attempts': 0, 'timeouts': 0, 'endpoint': None}
+                            retry_queue.appendleft({**chunk, 'from': middle, **fresh})
+                            retry_queue.appendleft({**chunk, 'to': middle - 1, **fresh})
+                            continue
+                        if chunk['attempts'] + 1 >= min(MAX_ATTEMPTS_PER_CHUNK, len(self.endpoints)):
+                            # Taille minimale refusée partout: ne plus découper
+                            fail(chunk, f"plage minimale refusée par tous les RPC: {e}")
+                            continue
+
+                    self.logger.warning(f"⚠️  Chunk {chunk['from']}-{chunk['to']}: {str(e)[:120]}")
+                    chunk['attempts'] += 1
+                    if chunk['attempts'] < min(MAX_ATTEMPTS_PER_CHUNK, len(self.endpoints) + 1):
+                        retry_queue.append(chunk)
+                    else:
+                        fail(chunk, str(e))
+
+        # Réassembler chaque requête dans l'ordre des blocs, jusqu'au premier trou
+        outputs = []
+        for query_index, query in enumerate(queries):
+            logs = []
+            position = query['from_block']
+
+            while position <= query['to_block'] and (query_index, position) in results:
+                chunk_to, chunk_logs = results[(query_index, position)]
+                logs.extend(chunk_logs)
+                position = chunk_to + 1
+
+            if query_index in failed:
+                self.logger.error(
+                    f"❌ Plage à partir du bloc {failed[query_index]} en échec sur tous les RPC, "
+                    f"reprise au prochain cycle"
+                )
+
+            logs.sort(key=lambda log: (log['blockNumber'], log['logIndex']))
+            outputs.append((logs, position - 1))
+
+        elapsed = time.time() - started
+        total_blocks = sum(max(0, q['to_block'] - q['from_block'] + 1) for q in queries)
+        self.stats['blocks'] += total_blocks
+        self.stats['seconds'] += elapsed
+
+        if chunk_count:
+            self.logger.info(
+                f"📈 get_logs: {total_blocks} blocs en {elapsed:.2f}s "
+                f"({total_blocks / max(elapsed, 1e-6):,.0f} blocs/s, {chunk_count} requêtes, "
+                f"{len(self.endpoints)} RPC, concurrence {self.concurrency})"
+            )
+
+        return outputs
+
+    def get_blocks_per_second(self) -> float:
+        """Débit moyen obtenu depuis le démarrage (blocs/s)"""
+        if self.stats['seconds'] <= 0:
+            return 0.0
+        return self.stats['blocks'] / self.stats['seconds']
+
+    def close(self):
+        """Arrête le pool de workers"""
+        self.executor.shutdown(wait=False)
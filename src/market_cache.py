@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Market Cache - Cache des données de marché partagé entre process (Filter, Trader)
+Réponses brutes des APIs stockées par token dans une base SQLite (WAL) commune,
+avec une durée de validité par champ: une lecture ne demande que la fraîcheur des
+champs qu'elle utilise. Au-delà du TTL mais dans la fenêtre de péremption tolérée,
+la valeur est servie immédiatement et rafraîchie en arrière-plan
+(stale-while-revalidate): le chemin critique n'attend HTTP que sans valeur récente.
+"""
+
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+PROJECT_DIR = Path(__file__).parent.parent
+DEFAULT_CACHE_PATH = PROJECT_DIR / 'data' / 'market_cache.db'
+
+# Champ → (TTL, péremption tolérée au-delà du TTL) en secondes
+FIELD_LIMITS = {
+    'price': (float(os.getenv('MARKET_CACHE_PRICE_TTL', 3)), float(os.getenv('MARKET_CACHE_PRICE_MAX_STALE', 10))),
+    'volume': (30, 300),
+    'liquidity': (30, 300),
+    'market_cap': (60, 600),
+    'pair': (3600, 86400)
+}
+
+# Fonction de rafraîchissement: adresses → {adresse minuscule: payload} (adresses sans réponse omises)
+FetchFn = Callable[[List[str]], Dict[str, object]]
+
+
+class MarketCache:
+    """
+    Cache (source, token) → payload JSON + instant de lecture.
+
+    - get_many(source, adresses, fetch, fields): lecture avec repli HTTP groupé
+      pour les absents et revalidation de fond pour les périmés
+    - put_many(source, payloads): écriture (aussi utilisée par le thread de fond)
+    """
+
+    def __init__(self, db_path: Path = None):
+        """
+        Args:
+            db_path: Fichier SQLite partagé (défaut: MARKET_CACHE_PATH ou data/market_cache.db)
+        """
+        self.db_path = Path(db_path or os.getenv('MARKET_CACHE_PATH', DEFAULT_CACHE_PATH))
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._queue = queue.Queue()
+        self._inflight = set()  # (source, token) en cours de revalidation
+        self._lock = threading.Lock()
+        self._worker = None
+
+        self.stats = {'fresh': 0, 'stale': 0, 'misses': 0, 'revalidations': 0}
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _init_database(self):
+        conn = self._connect()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS market_data (
+                source TEXT NOT NULL,
+                token TEXT NOT NULL,
+                payload TEXT,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (source, token)
+            )
+        ''')
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def limits(fields: Optional[Iterable[str]] = None) -> Tuple[float, float]:
+        """(TTL, péremption tolérée) les plus stricts des champs demandés (tous par défaut)"""
+        selected = [FIELD_LIMITS[field] for field in (fields or FIELD_LIMITS)]
+        return min(ttl for ttl, _ in selected), min(stale for _, stale in selected)
+
+    # ==================== LECTURE / ÉCRITURE ====================
+
+    def get_entries(self, source: str, addresses: List[str]) -> Dict[str, Tuple[object, float]]:
+        """{adresse minuscule: (payload, âge en secondes)} des entrées présentes"""
+        entries = {}
+        now = time.time()
+        conn = self._connect()
+        for start in range(0, len(addresses), 500):
+            chunk = addresses[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            for token, payload, fetched_at in conn.execute(
+                f"SELECT token, payload, fetched_at FROM market_data WHERE source = ? AND token IN ({placeholders})",
+                [source] + chunk
+            ):
+                entries[token] = (json.loads(payload), now - fetched_at)
+        conn.close()
+        return entries
+
+    def put_many(self, source: str, payloads: Dict[str, object]):
+        """Enregistre des réponses (None = token inconnu de la source, mis en cache aussi)"""
+        if not payloads:
+            return
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO market_data (source, token, payload, fetched_at) VALUES (?, ?, ?, ?)",
+                [(source, token.lower(), json.dumps(payload), now) for token, payload in payloads.items()]
+            )
+        conn.close()
+
+    def get_many(self, source: str, addresses: List[str], fetch: FetchFn,
+                 fields: Optional[Iterable[str]] = None) -> Dict[str, object]:
+        """
+        Args:
+            source: Espace de noms (ex: 'dexscreener')
+            addresses: Tokens demandés
+            fetch: Lecture HTTP groupée des tokens absents ou à revalider
+            fields: Champs utilisés par l'appelant (fixent TTL et péremption tolérée)
+
+        Returns:
+            {adresse minuscule: payload, None si aucune donnée}
+        """
+        addresses = list(dict.fromkeys(address.lower() for address in addresses))
+        ttl, max_stale = self.limits(fields)
+        entries = self.get_entries(source, addresses)
+
+        results = {}
+        missing = []
+        stale = []
+        for address in addresses:
+            entry = entries.get(address)
+            if entry is None or entry[1] > ttl + max_stale:
+                missing.append(address)
+                continue
+            results[address] = entry[0]
+            if entry[1] > ttl:
+                stale.append(address)
+
+        with self._lock:
+            self.stats['fresh'] += len(results) - len(stale)
+            self.stats['stale'] += len(stale)
+            self.stats['misses'] += len(missing)
+
+        if missing:
+            fetched = fetch(missing)
+            self.put_many(source, fetched)
+            results.update({address: fetched.get(address) for address in missing})
+
+        if stale:
+            self.revalidate(source, stale, fetch)
+
+        return results
+
+    # ==================== REVALIDATION DE FOND ====================
+
+    def revalidate(self, source: str, addresses: List[str], fetch: FetchFn):
+        """Planifie le rafraîchissement de tokens (ignorés s'ils sont déjà en cours)"""
+        with self._lock:
+            todo = [address for address in addresses if (source, address) not in self._inflight]
+            self._inflight.update((source, address) for address in todo)
+            if not todo:
+                return
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._revalidate_loop, name='market-cache', daemon=True)
+                self._worker.start()
+        self._queue.put((source, todo, fetch))
+
+    def _revalidate_loop(self):
+        while True:
+            source, addresses, fetch = self._queue.get()
+            try:
+                self.put_many(source, fetch(addresses))
+                self.stats['revalidations'] += 1
+            except Exception as e:
+                print(f"⚠️  Market cache: revalidation {source} échouée: {e}")
+            finally:
+                with self._lock:
+                    self._inflight.difference_update((source, address) for address in addresses)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return dict(self.stats, revalidating=len(self._inflight))
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_market_cache() -> MarketCache:
+    """Instance partagée par tous les modules du process (la base est commune aux process)"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = MarketCache()
+        return _shared_cache
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Metadata Cache - Cache persistant des données immuables (tokens et paires)
+name/symbol/decimals d'un token et token0/token1/factory d'une paire ne changent
+jamais: une fois lus on-chain, ils sont servis depuis un LRU mémoire adossé à
+une base SQLite (WAL) partagée par tous les process (Scanner, Filter, Trader).
+"""
+
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from cachetools import LRUCache
+
+PROJECT_DIR = Path(__file__).parent.parent
+DEFAULT_CACHE_PATH = PROJECT_DIR / 'data' / 'metadata_cache.db'
+DEFAULT_LRU_SIZE = 20000
+
+
+class MetadataCache:
+    """
+    Cache clé = adresse (minuscule) pour:
+    - tokens: name, symbol, decimals
+    - paires: token0, token1, factory
+    """
+
+    def __init__(self, db_path: Path = None, lru_size: int = DEFAULT_LRU_SIZE):
+        """
+        Args:
+            db_path: Fichier SQLite partagé (défaut: data/metadata_cache.db)
+            lru_size: Nombre d'entrées gardées en mémoire (tokens + paires)
+        """
+        self.db_path = Path(db_path or os.getenv('METADATA_CACHE_PATH', DEFAULT_CACHE_PATH))
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.tokens = LRUCache(maxsize=lru_size)
+        self.pairs = LRUCache(maxsize=lru_size)
+        self._lock = threading.Lock()
+
+        self.stats = {'hits': 0, 'disk_hits': 0, 'misses': 0}
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _init_database(self):
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS token_metadata (
+                address TEXT PRIMARY KEY,
+                name TEXT,
+                symbol TEXT,
+                decimals INTEGER NOT NULL
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS pair_metadata (
+                address TEXT PRIMARY KEY,
+                token0 TEXT NOT NULL,
+                token1 TEXT NOT NULL,
+                factory TEXT
+            )
+        ''')
+
+        conn.commit()
+        conn.close()
+
+    # ==================== TOKENS ====================
+
+    def get_tokens(self, addresses: Iterable[str]) -> Dict[str, Dict]:
+        """
+        Métadonnées connues pour une liste d'adresses.
+
+        Returns:
+            Dict {adresse minuscule: {name, symbol, decimals}} (absentes = inconnues)
+        """
+        found = {}
+        missing = []
+
+        with self._lock:
+            for address in addresses:
+                key = address.lower()
+                entry = self.tokens.get(key)
+                if entry is not None:
+                    found[key] = entry
+                    self.stats['hits'] += 1
+                else:
+                    missing.append(key)
+
+        if missing:
+            conn = self._connect()
+            cursor = conn.cursor()
+            rows = []
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                cursor.execute(
+                    f"SELECT address, name, symbol, decimals FROM token_metadata "
+                    f"WHERE address IN ({','.join('?' * len(chunk))})",
+                    chunk
+                )
+                rows.extend(cursor.fetchall())
+            conn.close()
+
+            with self._lock:
+                for address, name, symbol, decimals in rows:
+                    entry = {'name': name, 'symbol': symbol, 'decimals': decimals}
+                    self.tokens[address] = entry
+                    found[address] = entry
+                self.stats['disk_hits'] += len(rows)
+                self.stats['misses'] += len(missing) - len(rows)
+
+        return found
+
+    def get_token(self, address: str) -> Optional[Dict]:
+        """Métadonnées d'un token (None si inconnu)"""
+        return self.get_tokens([address]).get(address.lower())
+
+    def put_tokens(self, tokens: Dict[str, Dict]):
+        """Enregistre des métadonnées {adresse: {name, symbol, decimals}}"""
+        if not tokens:
+            return
+
+        rows = [
+            (address.lower(), data['name'], data['symbol'], int(data['decimals']))
+            for address, data in tokens.items()
+        ]
+
+        conn = self._connect()
+        conn.executemany('''
+            INSERT OR IGNORE INTO token_metadata (address, name, symbol, decimals)
+            VALUES (?, ?, ?, ?)
+        ''', rows)
+        conn.commit()
+        conn.close()
+
+        with self._lock:
+            for address, name, symbol, decimals in rows:
+                self.tokens[address] = {'name': name, 'symbol': symbol, 'decimals': decimals}
+
+    # ==================== PAIRES ====================
+
+    def get_pair(self, address: str) -> Optional[Dict]:
+        """
+        Composition d'une paire.
+
+        Returns:
+            {token0, token1, factory} en minuscules, ou None si inconnue
+        """
+        key = address.lower()
+
+        with self._lock:
+            entry = self.pairs.get(key)
+            if entry is not None:
+                self.stats['hits'] += 1
+                return entry
+
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT token0, token1, factory FROM pair_metadata WHERE address = ?", (key,))
+        row = cursor.fetchone()
+        conn.close()
+
+        with self._lock:
+            if not row:
+                self.stats['misses'] += 1
+                return None
+
+            entry = {'token0': row[0], 'token1': row[1], 'factory': row[2]}
+            self.pairs[key] = entry
+            self.stats['disk_hits'] += 1
+            return entry
+
+    def put_pairs(self, pairs: List[Dict]):
+        """Enregistre des paires [{pair_address, token0, token1, factory}]"""
+        if not pairs:
+            return
+
+        rows = [
+            (p['pair_address'].lower(), p['token0'].lower(), p['token1'].lower(),
+             p['factory'].lower() if p.get('factory') else None)
+            for p in pairs
+        ]
+
+        conn = self._connect()
+        conn.executemany('''
+            INSERT OR IGNORE INTO pair_metadata (address, token0, token1, factory)
+            VALUES (?, ?, ?, ?)
+        ''', rows)
+        conn.commit()
+        conn.close()
+
+        with self._lock:
+            for address, token0, token1, factory in rows:
+                self.pairs[address] = {'token0': token0, 'token1': token1, 'factory': factory}
+
+    def put_pair(self, pair_address: str, token0: str, token1: str, factory: str = None):
+        """Enregistre une paire"""
+        self.put_pairs([{'pair_address': pair_address, 'token0': token0, 'token1': token1, 'factory': factory}])
+
+    def get_stats(self) -> Dict:
+        """Statistiques hits/misses"""
+        with self._lock:
+            return dict(self.stats, tokens_in_memory=len(self.tokens), pairs_in_memory=len(self.pairs))
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_metadata_cache() -> MetadataCache:
+    """Instance partagée par tous les modules du process"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = MetadataCache()
+        return _shared_cache
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Multicall - Regroupement d'appels eth_call via Multicall3.aggregate3
+Un seul aller-retour RPC pour des centaines de lectures (tolérance d'échec par appel).
+Inclut le résolveur de métadonnées ERC20 par batch (name/symbol/decimals/totalSupply).
+"""
+
+from typing import Dict, List, Optional, Tuple
+from eth_abi import encode, decode
+from eth_utils import to_checksum_address
+
+# Multicall3 (même adresse sur toutes les chaînes EVM, dont Base)
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+AGGREGATE3_SELECTOR = bytes.fromhex("82ad56cb")  # aggregate3((address,bool,bytes)[])
+MAX_CALLS_PER_BATCH = 500  # Appels par eth_call (limite de gas/taille de réponse)
+
+# Sélecteurs ERC20
+NAME_SELECTOR = bytes.fromhex("06fdde03")
+SYMBOL_SELECTOR = bytes.fromhex("95d89b41")
+DECIMALS_SELECTOR = bytes.fromhex("313ce567")
+TOTAL_SUPPLY_SELECTOR = bytes.fromhex("18160ddd")
+
+DEFAULT_METADATA = {'name': 'Unknown', 'symbol': '???', 'decimals': 18, 'total_supply': 0}
+
+
+class Multicall:
+    """
+    Client Multicall3: exécute une liste d'appels (target, calldata) en aggregate3.
+    """
+
+    def __init__(self, w3, max_calls_per_batch: int = MAX_CALLS_PER_BATCH):
+        self.w3 = w3
+        self.max_calls_per_batch = max(1, max_calls_per_batch)
+        self.address = to_checksum_address(MULTICALL3_ADDRESS)
+
+    def aggregate3(self, calls: List[Tuple[str, bytes]], block_identifier='latest') -> List[Tuple[bool, bytes]]:
+        """
+        Exécute les appels par paquets de max_calls_per_batch.
+
+        Args:
+            calls: Liste de (adresse cible, calldata)
+            block_identifier: Bloc de lecture
+
+        Returns:
+            Pour chaque appel: (succès, données retournées)
+        """
+        results = []
+
+        for start in range(0, len(calls), self.max_calls_per_batch):
+            batch = calls[start:start + self.max_calls_per_batch]
+            payload = AGGREGATE3_SELECTOR + encode(
+                ['(address,bool,bytes)[]'],
+                [[(to_checksum_address(target), True, data) for target, data in batch]]
+            )
+
+            raw = self.w3.eth.call({'to': self.address, 'data': payload}, block_identifier)
+            decoded = decode(['(bool,bytes)[]'], bytes(raw))[0]
+            results.extend((success, bytes(data)) for success, data in decoded)
+
+        return results
+
+
+def decode_string(data: bytes) -> Optional[str]:
+    """Décode un retour string ABI, ou bytes32 (anciens tokens type MKR)"""
+    if not data:
+        return None
+
+    if len(data) == 32:
+        # bytes32 non standard: texte complété par des zéros
+        return data.rstrip(b'\x00').decode('utf-8', errors='ignore') or None
+
+    try:
+        return decode(['string'], data)[0]
+    except Exception:
+        return data[:32].rstrip(b'\x00').decode('utf-8', errors='ignore') or None
+
+
+def decode_uint(data: bytes) -> Optional[int]:
+    """Décode un retour uint256 (None si vide)"""
+    if len(data) < 32:
+        return None
+    return int.from_bytes(data[:32], 'big')
+
+
+class TokenMetadataResolver:
+    """
+    Résout name/symbol/decimals/totalSupply d'un lot de tokens en aggregate3
+    (4 appels par token, un seul aller-retour pour tout le lot).
+
+    Avec un MetadataCache, les tokens déjà connus ne coûtent que totalSupply
+    (la seule valeur non immuable), et ceux résolus sont ajoutés au cache.
+    """
+
+    def __init__(self, w3, multicall: Multicall = None, cache=None):
+        self.multicall = multicall or Multicall(w3)
+        self.cache = cache
+
+    def resolve_many(self, token_addresses: List[str], include_supply: bool = True) -> Dict[str, Dict]:
+        """
+        Args:
+            token_addresses: Adresses des tokens
+            include_supply: Lire totalSupply (sinon les tokens en cache ne coûtent aucun appel)
+
+        Returns:
+            Dict {adresse checksum: {name, symbol, decimals, total_supply, resolved}}
+            resolved=False si aucun appel n'a réussi (pas un ERC20 ou contrat absent)
+        """
+        addresses = list(dict.fromkeys(to_checksum_address(a) for a in token_addresses))
+        if not addresses:
+            return {}
+
+        cached = self.cache.get_tokens(addresses) if self.cache else {}
+        known = [a for a in addresses if a.lower() in cached]
+        unknown = [a for a in addresses if a.lower() not in cached]
+
+        selectors = [NAME_SELECTOR, SYMBOL_SELECTOR, DECIMALS_SELECTOR, TOTAL_SUPPLY_SELECTOR]
+        calls = [(address, selector) for address in unknown for selector in selectors]
+        if include_supply:
+            calls += [(address, TOTAL_SUPPLY_SELECTOR) for address in known]
+        results = self.multicall.aggregate3(calls) if calls else []
+
+        metadata = {}
+        if include_supply:
+            supply_results = results[len(unknown) * 4:]
+            for address, (success, data) in zip(known, supply_results):
+                total_supply = decode_uint(data) if success else None
+                metadata[address] = dict(
+                    cached[address.lower()],
+                    total_supply=total_supply if total_supply is not None else DEFAULT_METADATA['total_supply'],
+                    resolved=True
+                )
+        else:
+            for address in known:
+                metadata[address] = dict(
+                    cached[address.lower()], total_supply=DEFAULT_METADATA['total_supply'], resolved=True
+                )
+
+        for index, address in enumerate(unknown):
+            name_res, symbol_res, decimals_res, supply_res = results[index * 4:index * 4 + 4]
+
+            name = decode_string(name_res[1]) if name_res[0] else None
+            symbol = decode_string(symbol_res[1]) if symbol_res[0] else None
+            decimals = decode_uint(decimals_res[1]) if decimals_res[0] else None
+            total_supply = decode_uint(supply_res[1]) if supply_res[0] else None
+
+            metadata[address] = {
+                'name': name or DEFAULT_METADATA['name'],
+                'symbol': symbol or DEFAULT_METADATA['symbol'],
+                'decimals': decimals if decimals is not None and decimals <= 255 else DEFAULT_METADATA['decimals'],
+                'total_supply': total_supply if total_supply is not None else DEFAULT_METADATA['total_supply'],
+                'resolved': any(value is not None for value in (name, symbol, decimals, total_supply))
+            }
+
+        # Ne mettre en cache que les tokens dont decimals a été lu (données immuables fiables)
+        if self.cache:
+            self.cache.put_tokens({
+                address: metadata[address]
+                for index, address in enumerate(unknown)
+                if results[index * 4 + 2][0] and decode_uint(results[index * 4 + 2][1]) is not None
+            })
+
+        return metadata
+
+    def resolve(self, token_address: str, include_supply: bool = True) -> Dict:
+        """Métadonnées d'un seul token (au plus un aller-retour)"""
+        return self.resolve_many([token_address], include_supply)[to_checksum_address(token_address)]
@@ -5,9 +5,19 @@ Fonctionne même si toutes les APIs externes tombent (BirdEye, DexScreener, etc.
 """
 
 import time
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
 from web3 import Web3
 import json
+import numpy as np
+from metadata_cache import get_metadata_cache
+from block_time_index import get_block_time_index
+from head_tracker import get_head_tracker
+from bar_store import get_bar_store
+from holder_index import get_holder_index
+from eth_price_oracle import get_eth_price_oracle
+from multicall import TokenMetadataResolver
+from swap_decoder import decode_swaps, decode_v3_swaps, base_flows, total_volume, vwap, block_mask
+from v3_pool_reader import V3PoolReader, compute_pool_address, FEE_TIERS
 
 
 class OnChainFetcher:
@@ -16,7 +26,7 @@ class OnChainFetcher:
     - Liquidité via getReserves()
     - Volume via Swap events
     - Holders via Transfer events
-    - Prix ETH via CoinGecko fallback
+    - Prix ETH via l'oracle on-chain partagé (pool WETH/USDC)
     """
 
     # ABIs essentiels
@@ -45,14 +55,62 @@ class OnChainFetcher:
     AERODROME_FACTORY = "0x420DD381b31aEf6683db6B902084cB0FFECe40Da"
     BASESWAP_FACTORY = "0x8909Dc15e40173Ff4699343b6eB8132c65e18eC6"
 
+    BASE_TOKENS = (WETH.lower(), USDC.lower(), USDBC.lower())
+    BASE_TOKEN_DECIMALS = {WETH.lower(): 18, USDC.lower(): 6, USDBC.lower(): 6}
+
+    # Topics calculés une fois pour toutes
+    SWAP_TOPIC = Web3.keccak(text="Swap(address,uint256,uint256,uint256,uint256,address)").hex()
+    V3_SWAP_TOPIC = Web3.keccak(text="Swap(address,address,int256,int256,uint160,uint128,int24)").hex()
+    TRANSFER_TOPIC = Web3.keccak(text="Transfer(address,address,uint256)").hex()
+    OWNER_SELECTOR = "0x8da5cb5b"  # owner()
+
+    # Fenêtre de Swap lue par get_swap_analytics: 1h + fenêtre de référence de 5min
+    SWAP_LOOKBACK_MINUTES = 65
+
     def __init__(self, w3: Web3):
         """
         Args:
             w3: Instance Web3 connectée à Base mainnet
         """
         self.w3 = w3
-        self.eth_price_cache = {'price': 3000.0, 'timestamp': 0}  # Cache 5min
-        self.cache_ttl = 300  # 5 minutes
+        self.metadata_cache = get_metadata_cache()  # token0/token1 immuables
+        self.metadata_resolver = TokenMetadataResolver(w3, cache=self.metadata_cache)  # Décimales des tokens
+        self.block_index = get_block_time_index(w3)  # Fenêtres temporelles → plages de blocs exactes
+        self.head_tracker = get_head_tracker(w3)  # Tête vérifiée par hash (réorganisations → index purgé)
+        self.bar_store = get_bar_store()  # Barres 1min par paire, alimentées par les nouveaux Swap seulement
+        self.head_tracker.add_reorg_listener(self.bar_store.forget_from)
+        self.eth_oracle = get_eth_price_oracle(w3)  # Prix ETH/USD suivi en arrière-plan, lecture sans réseau
+        self.holder_index = get_holder_index(w3)  # Balances reconstruites depuis les Transfer (holders exacts)
+        self.v3_reader = V3PoolReader(w3, cache=self.metadata_cache)  # Pools Uniswap V3 (pas de getReserves)
+
+    def _get_pair_tokens(self, pair_address: str, pool=None) -> Tuple[str, str]:
+        """
+        token0/token1 (minuscules) d'une paire, servis par le cache de métadonnées.
+        Un seul passage RPC par paire sur toute la vie du cache.
+        """
+        cached = self.metadata_cache.get_pair(pair_address)
+        if cached:
+            return cached['token0'], cached['token1']
+
+        if pool is None:
+            pool = self.w3.eth.contract(
+                address=Web3.to_checksum_address(pair_address),
+                abi=self.UNISWAP_V2_PAIR_ABI
+            )
+
+        token0 = pool.functions.token0().call().lower()
+        token1 = pool.functions.token1().call().lower()
+        self.metadata_cache.put_pair(pair_address, token0, token1)
+        return token0, token1
+
+    @staticmethod
+    def _v3_fee(pair_address: str, token0: str, token1: str) -> Optional[int]:
+        """Fee tier si la paire est un pool Uniswap V3 (adresse CREATE2 recalculée, sans RPC), sinon None"""
+        pair_address = pair_address.lower()
+        for fee in FEE_TIERS:
+            if compute_pool_address(token0, token1, fee).lower() == pair_address:
+                return fee
+        return None
 
     def get_pair_address(self, token_address: str, factory_address: str = None) -> Optional[str]:
         """
@@ -80,12 +138,14 @@ class OnChainFetcher:
 
         return None
 
-    def get_pool_liquidity_usd(self, token_address: str, pair_address: str = None) -> float:
+    def get_pool_liquidity_usd(self, token_address: str, pair_address: str = None) -> Optional[float]:
         """
-        Récupère la liquidité USD du pool via getReserves()
+        Récupère la liquidité USD du pool via getReserves() (V2), ou la balance
+        de base token du pool lue par V3PoolReader (Uniswap V3)
 
         Returns:
-            Liquidité en USD (reserve de base * prix base)
+            Liquidité en USD (reserve de base * prix base), None si la base est
+            WETH et que le prix ETH est indisponible (liquidité inconnue, pas nulle)
         """
         try:
             # Si pas de pair fournie, la chercher
@@ -96,34 +156,42 @@ class OnChainFetcher:
                 if pair_address is None:
                     return 0.0
 
-            pool = self.w3.eth.contract(
-                address=Web3.to_checksum_address(pair_address),
-                abi=self.UNISWAP_V2_PAIR_ABI
-            )
-
-            # Récupérer reserves
-            reserves = pool.functions.getReserves().call()
-            token0 = pool.functions.token0().call().lower()
-            token1 = pool.functions.token1().call().lower()
+            token0, token1 = self._get_pair_tokens(pair_address)
 
             # Identifier quelle reserve est la base (WETH/USDC/USDbC)
             base_tokens = [self.WETH.lower(), self.USDC.lower(), self.USDBC.lower()]
 
             if token0 in base_tokens:
-                base_reserve = reserves[0] / 10**18
-                base_token = token0
+                base_index, base_token, token = 0, token0, token1
             elif token1 in base_tokens:
-                base_reserve = reserves[1] / 10**18
-                base_token = token1
+                base_index, base_token, token = 1, token1, token0
             else:
                 # Pas de base token connu
                 return 0.0
 
+            fee = self._v3_fee(pair_address, token0, token1)
+            if fee is not None:
+                # Pool V3: balance du base token détenue par le pool (pas de getReserves)
+                states = self.v3_reader.read_pools(token, base_token, fee_tiers=(fee,))
+                if not states:
+                    return 0.0
+                base_reserve = states[0]['quote_balance']
+            else:
+                # Récupérer reserves
+                pool = self.w3.eth.contract(
+                    address=Web3.to_checksum_address(pair_address),
+                    abi=self.UNISWAP_V2_PAIR_ABI
+                )
+                reserves = pool.functions.getReserves().call()
+                base_reserve = reserves[base_index] / 10 ** self._token_decimals(base_token)  # 6 pour USDC/USDbC
+
             # Prix de la base
             if base_token in [self.USDC.lower(), self.USDBC.lower()]:
                 base_price = 1.0  # Stablecoins
             else:
                 base_price = self.get_eth_price_onchain()  # WETH
+                if base_price is None:
+                    return None
 
             liquidity_usd = base_reserve * base_price
 
@@ -133,6 +201,150 @@ class OnChainFetcher:
             print(f"❌ Erreur get_pool_liquidity_usd: {e}")
             return 0.0
 
+    def _token_decimals(self, token_address: str) -> int:
+        """Décimales d'un token (base tokens connus, sinon cache de métadonnées / Multicall3)"""
+        token_address = token_address.lower()
+        if token_address in self.BASE_TOKEN_DECIMALS:
+            return self.BASE_TOKEN_DECIMALS[token_address]
+        return self.metadata_resolver.resolve(token_address, include_supply=False).get('decimals', 18)
+
+    def _token_owner(self, token_address: str) -> Optional[str]:
+        """owner() du token (None si le token n'expose pas owner())"""
+        try:
+            data = self.w3.eth.call({'to': Web3.to_checksum_address(token_address), 'data': self.OWNER_SELECTOR})
+        except Exception:
+            return None
+        if len(data) < 32:
+            return None
+        return '0x' + bytes(data[12:32]).hex()
+
+    def _fetch_swaps(self, pair_address: str, from_block: int, to_block: int) -> Tuple[Dict, Optional[str]]:
+        """
+        Swaps d'une paire sur une plage de blocs, décodés en colonnes numpy (swap_decoder).
+        Événement Swap V3 (montants signés) pour les pools Uniswap V3, Swap V2 sinon.
+
+        Returns:
+            (flux {block, volume, base_amount, token_amount, is_buy} en unités humaines,
+             base token ou None si aucun swap)
+        """
+        token0, token1 = self._get_pair_tokens(pair_address)
+        is_v3 = self._v3_fee(pair_address, token0, token1) is not None
+        decode = decode_v3_swaps if is_v3 else decode_swaps
+
+        logs = self.w3.eth.get_logs({
+            'address': Web3.to_checksum_address(pair_address),
+            'fromBlock': max(0, from_block),
+            'toBlock': to_block,
+            'topics': [self.V3_SWAP_TOPIC if is_v3 else self.SWAP_TOPIC]
+        })
+
+        if not logs:
+            return base_flows(decode([]), True), None
+
+        base_is_token0 = token0 in self.BASE_TOKENS
+        base_token, token = (token0, token1) if base_is_token0 else (token1, token0)
+
+        flows = base_flows(
+            decode(logs),
+            base_is_token0,
+            base_decimals=self._token_decimals(base_token),
+            token_decimals=self._token_decimals(token)
+        )
+        return flows, base_token
+
+    def _to_usd(self, base_amount: float, base_token: Optional[str]) -> float:
+        """Montant en base token → USD (stablecoins à 1$, WETH au prix on-chain)"""
+        if not base_amount or base_token is None:
+            return 0.0
+        if base_token in (self.USDC.lower(), self.USDBC.lower()):
+            return base_amount
+        eth_price = self.get_eth_price_onchain()
+        return base_amount * eth_price if eth_price is not None else 0.0
+
+    @staticmethod
+    def _price_change(recent_price: float, past_price: float) -> float:
+        if past_price == 0 or recent_price == 0:
+            return 0.0
+        return ((recent_price / past_price) - 1) * 100
+
+    def _sync_bars(self, pair_address: str, head: Tuple[int, int]):
+        """Intègre dans le bar store les Swap de la paire postérieurs au dernier bloc ingéré"""
+        current_block, current_timestamp = head
+        lookback_from = self.block_index.block_at(current_timestamp - self.SWAP_LOOKBACK_MINUTES * 60)
+
+        synced = self.bar_store.synced_block(pair_address)
+        if synced is not None and synced >= lookback_from - 1:
+            from_block, reset = synced + 1, False
+        else:
+            # Paire non suivie ou historique trop ancien: relecture de toute la fenêtre
+            from_block, reset = lookback_from, True
+
+        if from_block > current_block:
+            return
+
+        flows, _ = self._fetch_swaps(pair_address, from_block, current_block)
+
+        # Un timestamp par bloc distinct, redistribué sur les swaps
+        blocks = np.unique(flows['block'])
+        block_timestamps = np.array([self.block_index.timestamp_of(int(block)) for block in blocks], dtype=np.int64)
+
+        self.bar_store.append(
+            pair_address,
+            timestamps=block_timestamps[np.searchsorted(blocks, flows['block'])],
+            volumes=flows['volume'],
+            base_amounts=flows['base_amount'],
+            token_amounts=flows['token_amount'],
+            is_buy=flows['is_buy'],
+            synced_block=current_block,
+            reset=reset
+        )
+
+    def get_swap_analytics(self, pair_address: str, head: Optional[Tuple[int, int]] = None) -> Dict:
+        """
+        Volume 5min/1h, VWAP par sous-fenêtre et changements de prix 5min/1h
+        depuis les barres 1min de la paire (bar store).
+
+        Seuls les Swap apparus depuis le dernier appel sont lus (une seule requête,
+        65 dernières minutes au premier passage); les métriques sont ensuite
+        calculées sur les barres en mémoire.
+
+        Sous-fenêtres (mêmes définitions que get_volume_last_minutes / get_price_change):
+        - récente: 5 dernières minutes
+        - passé 5min: de -10 à -5 minutes
+        - passé 1h: de -65 à -60 minutes
+
+        Args:
+            pair_address: Adresse du pool
+            head: (bloc, timestamp) courant déjà connu (évite un appel RPC)
+
+        Returns:
+            dict avec volume_5min, volume_1h (USD), vwap_recent, vwap_past_5min,
+            vwap_past_1h, price_change_5min, price_change_1h, buys_5min, sells_5min
+        """
+        head = head or self.head_tracker.update()
+        self._sync_bars(pair_address, head)
+        _, current_timestamp = head
+
+        recent = self.bar_store.window(pair_address, current_timestamp, 5)
+        hour = self.bar_store.window(pair_address, current_timestamp, 60)
+        past_5m = self.bar_store.window(pair_address, current_timestamp, 5, offset_minutes=5)
+        past_1h = self.bar_store.window(pair_address, current_timestamp, 5, offset_minutes=60)
+
+        token0, token1 = self._get_pair_tokens(pair_address)
+        base_token = token0 if token0 in self.BASE_TOKENS else token1
+
+        return {
+            'volume_5min': self._to_usd(recent['volume'], base_token),
+            'volume_1h': self._to_usd(hour['volume'], base_token),
+            'vwap_recent': recent['vwap'],
+            'vwap_past_5min': past_5m['vwap'],
+            'vwap_past_1h': past_1h['vwap'],
+            'price_change_5min': self._price_change(recent['vwap'], past_5m['vwap']),
+            'price_change_1h': self._price_change(recent['vwap'], past_1h['vwap']),
+            'buys_5min': recent['buys'],
+            'sells_5min': recent['sells']
+        }
+
     def get_volume_last_minutes(self, pair_address: str, minutes: int = 5) -> float:
         """
         Calcule le volume USD des swaps sur les X dernières minutes
@@ -146,65 +358,9 @@ class OnChainFetcher:
             Volume en USD
         """
         try:
-            to_block = self.w3.eth.block_number
-            # Base: ~2 secondes par bloc = 30 blocs/minute
-            blocks_per_minute = 30
-            from_block = max(0, to_block - int(minutes * blocks_per_minute))
-
-            # Topic Swap = keccak256("Swap(address,uint256,uint256,uint256,uint256,address)")
-            swap_topic = self.w3.keccak(text="Swap(address,uint256,uint256,uint256,uint256,address)").hex()
-
-            logs = self.w3.eth.get_logs({
-                'address': Web3.to_checksum_address(pair_address),
-                'fromBlock': from_block,
-                'toBlock': to_block,
-                'topics': [swap_topic]
-            })
-
-            if not logs:
-                return 0.0
-
-            # Récupérer token0/token1 du pool
-            pool = self.w3.eth.contract(
-                address=Web3.to_checksum_address(pair_address),
-                abi=self.UNISWAP_V2_PAIR_ABI
-            )
-            token0 = pool.functions.token0().call().lower()
-            token1 = pool.functions.token1().call().lower()
-
-            # Identifier base token
-            base_tokens = [self.WETH.lower(), self.USDC.lower(), self.USDBC.lower()]
-            base_is_token0 = token0 in base_tokens
-
-            total_volume_usd = 0.0
-            eth_price = self.get_eth_price_onchain()
-
-            for log in logs:
-                # Décoder data (amount0In, amount1In, amount0Out, amount1Out)
-                data = log['data']
-                # 4 uint256 = 32 bytes chacun
-                amount0In = int(data[2:66], 16)
-                amount1In = int(data[66:130], 16)
-                amount0Out = int(data[130:194], 16)
-                amount1Out = int(data[194:258], 16)
-
-                # Volume = somme des amounts de la base token
-                if base_is_token0:
-                    base_amount = (amount0In + amount0Out) / 10**18
-                    base_token = token0
-                else:
-                    base_amount = (amount1In + amount1Out) / 10**18
-                    base_token = token1
-
-                # Convertir en USD
-                if base_token in [self.USDC.lower(), self.USDBC.lower()]:
-                    usd_value = base_amount
-                else:
-                    usd_value = base_amount * eth_price
-
-                total_volume_usd += usd_value
-
-            return total_volume_usd
+            from_block, to_block = self.block_index.block_range_for_last(minutes * 60, head=self.head_tracker.update())
+            flows, base_token = self._fetch_swaps(pair_address, from_block, to_block)
+            return self._to_usd(total_volume(flows), base_token)
 
         except Exception as e:
             print(f"❌ Erreur get_volume_last_minutes: {e}")
@@ -223,23 +379,18 @@ class OnChainFetcher:
             Pourcentage de changement (ex: 7.5 pour +7.5%)
         """
         try:
-            current_block = self.w3.eth.block_number
-            blocks_per_minute = 30
+            current_block, current_timestamp = self.head_tracker.update()
 
-            # Prix actuel (derniers 5min)
-            recent_from = current_block - int(minutes_window * blocks_per_minute)
-            recent_price = self._get_avg_price_from_swaps(pair_address, recent_from, current_block)
+            recent_from = self.block_index.block_at(current_timestamp - minutes_window * 60)
+            past_to = self.block_index.block_at(current_timestamp - minutes_ago * 60)
+            past_from = self.block_index.block_at(current_timestamp - (minutes_ago + minutes_window) * 60)
 
-            # Prix passé (minutes_ago - minutes_window à minutes_ago)
-            past_to = current_block - int(minutes_ago * blocks_per_minute)
-            past_from = past_to - int(minutes_window * blocks_per_minute)
-            past_price = self._get_avg_price_from_swaps(pair_address, past_from, past_to)
-
-            if past_price == 0 or recent_price == 0:
-                return 0.0
+            # Une seule lecture couvrant la fenêtre passée et la fenêtre récente
+            flows, _ = self._fetch_swaps(pair_address, past_from, current_block)
 
-            change_percent = ((recent_price / past_price) - 1) * 100
-            return change_percent
+            recent_price = vwap(flows, block_mask(flows, recent_from, current_block))
+            past_price = vwap(flows, block_mask(flows, past_from, past_to))
+            return self._price_change(recent_price, past_price)
 
         except Exception as e:
             print(f"❌ Erreur get_price_change: {e}")
@@ -250,62 +401,12 @@ class OnChainFetcher:
         Calcule le prix moyen pondéré par volume à partir des swaps
         """
         try:
-            swap_topic = self.w3.keccak(text="Swap(address,uint256,uint256,uint256,uint256,address)").hex()
-
-            logs = self.w3.eth.get_logs({
-                'address': Web3.to_checksum_address(pair_address),
-                'fromBlock': max(0, from_block),
-                'toBlock': to_block,
-                'topics': [swap_topic]
-            })
-
-            if not logs:
-                return 0.0
-
-            # Récupérer token0/token1
-            pool = self.w3.eth.contract(
-                address=Web3.to_checksum_address(pair_address),
-                abi=self.UNISWAP_V2_PAIR_ABI
-            )
-            token0 = pool.functions.token0().call().lower()
-            token1 = pool.functions.token1().call().lower()
-
-            base_tokens = [self.WETH.lower(), self.USDC.lower(), self.USDBC.lower()]
-            base_is_token0 = token0 in base_tokens
-
-            total_base = 0.0
-            total_token = 0.0
-
-            for log in logs:
-                data = log['data']
-                amount0In = int(data[2:66], 16) / 10**18
-                amount1In = int(data[66:130], 16) / 10**18
-                amount0Out = int(data[130:194], 16) / 10**18
-                amount1Out = int(data[194:258], 16) / 10**18
-
-                if base_is_token0:
-                    # Base = token0, Token = token1
-                    base_amount = amount0In if amount0In > 0 else amount0Out
-                    token_amount = amount1Out if amount0In > 0 else amount1In
-                else:
-                    # Base = token1, Token = token0
-                    base_amount = amount1In if amount1In > 0 else amount1Out
-                    token_amount = amount0Out if amount1In > 0 else amount0In
-
-                total_base += base_amount
-                total_token += token_amount
-
-            if total_token == 0:
-                return 0.0
-
-            # Prix = base/token (combien de base pour 1 token)
-            avg_price = total_base / total_token
-            return avg_price
-
+            flows, _ = self._fetch_swaps(pair_address, from_block, to_block)
+            return vwap(flows)
         except Exception:
             return 0.0
 
-    def estimate_holders(self, token_address: str, hours: int = 2) -> int:
+    def estimate_holders(self, token_address: str, hours: int = 2, head: Optional[Tuple[int, int]] = None) -> int:
         """
         Estime le nombre de holders via les Transfer events (dernières X heures)
         Note: Estimation conservatrice, ne compte que les adresses actives récemment
@@ -314,18 +415,13 @@ class OnChainFetcher:
             Nombre d'adresses uniques ayant reçu/envoyé le token
         """
         try:
-            to_block = self.w3.eth.block_number
-            blocks_per_hour = 1800  # ~2 sec par bloc
-            from_block = max(0, to_block - int(hours * blocks_per_hour))
-
-            # Topic Transfer = keccak256("Transfer(address,address,uint256)")
-            transfer_topic = self.w3.keccak(text="Transfer(address,address,uint256)").hex()
+            from_block, to_block = self.block_index.block_range_for_last(hours * 3600, head=head or self.head_tracker.update())
 
             logs = self.w3.eth.get_logs({
                 'address': Web3.to_checksum_address(token_address),
                 'fromBlock': from_block,
                 'toBlock': to_block,
-                'topics': [transfer_topic]
+                'topics': [self.TRANSFER_TOPIC]
             })
 
             if not logs:
@@ -350,83 +446,57 @@ class OnChainFetcher:
             print(f"❌ Erreur estimate_holders: {e}")
             return 0
 
-    def get_eth_price_onchain(self) -> float:
+    def get_holder_metrics(self, token_address: str, pair_address: str = None,
+                           created_block: int = None) -> Optional[Dict]:
         """
-        Récupère le prix ETH en USD via un pool stable (WETH/USDC)
-        Cache de 5 minutes pour économiser les appels
+        Distribution exacte du token depuis le registre local des balances
+        (synchronisé jusqu'au dernier bloc confirmé, incrémental après le premier passage,
+        premier passage depuis created_block si connu)
 
         Returns:
-            Prix ETH en USD (fallback 3000.0 si erreur)
+            dict holder_count, top_holder, top_holder_percentage (paire exclue),
+            top10_percentage, hhi, owner_percentage (owner() ou déployeur),
+            complete... ou None si erreur
         """
         try:
-            # Vérifier cache
-            now = time.time()
-            if now - self.eth_price_cache['timestamp'] < self.cache_ttl:
-                return self.eth_price_cache['price']
-
-            # Chercher pool WETH/USDC sur Aerodrome ou BaseSwap
-            factory = self.w3.eth.contract(
-                address=Web3.to_checksum_address(self.AERODROME_FACTORY),
-                abi=self.FACTORY_ABI
-            )
-
-            weth = Web3.to_checksum_address(self.WETH)
-            usdc = Web3.to_checksum_address(self.USDC)
-
-            pair = factory.functions.getPair(weth, usdc).call()
-
-            if pair == "0x0000000000000000000000000000000000000000":
-                # Essayer BaseSwap
-                factory = self.w3.eth.contract(
-                    address=Web3.to_checksum_address(self.BASESWAP_FACTORY),
-                    abi=self.FACTORY_ABI
-                )
-                pair = factory.functions.getPair(weth, usdc).call()
-
-            if pair == "0x0000000000000000000000000000000000000000":
-                # Fallback hardcodé
-                return 3000.0
-
-            # Récupérer reserves
-            pool = self.w3.eth.contract(
-                address=pair,
-                abi=self.UNISWAP_V2_PAIR_ABI
-            )
-
-            reserves = pool.functions.getReserves().call()
-            token0 = pool.functions.token0().call().lower()
-
-            # Calculer prix
-            if token0 == weth.lower():
-                # reserve0 = WETH, reserve1 = USDC
-                eth_reserve = reserves[0] / 10**18
-                usdc_reserve = reserves[1] / 10**6  # USDC = 6 decimals
-            else:
-                # reserve0 = USDC, reserve1 = WETH
-                usdc_reserve = reserves[0] / 10**6
-                eth_reserve = reserves[1] / 10**18
+            if pair_address is None:
+                pair_address = (self.get_pair_address(token_address, self.AERODROME_FACTORY)
+                                or self.get_pair_address(token_address, self.BASESWAP_FACTORY))
 
-            if eth_reserve == 0:
-                return 3000.0
+            if self.holder_index.sync(token_address, created_block=created_block) is None:
+                return None
 
-            eth_price = usdc_reserve / eth_reserve
+            return self.holder_index.get_metrics(token_address, exclude=[pair_address] if pair_address else [],
+                                                 owner=self._token_owner(token_address))
 
-            # Mettre à jour cache
-            self.eth_price_cache = {'price': eth_price, 'timestamp': now}
+        except Exception as e:
+            print(f"❌ Erreur get_holder_metrics: {e}")
+            return None
 
-            return eth_price
+    def get_eth_price_onchain(self) -> Optional[float]:
+        """
+        Prix ETH en USD servi par l'oracle du process (réserves du pool WETH/USDC
+        suivies par les événements Sync), sans appel réseau
 
-        except Exception as e:
-            print(f"❌ Erreur get_eth_price_onchain: {e}")
-            return 3000.0  # Fallback conservateur
+        Returns:
+            Prix ETH en USD (None si l'oracle n'a encore aucun prix)
+        """
+        quote = self.eth_oracle.get_quote()
+        if quote['stale'] and quote['price']:
+            print(f"⚠️  Prix ETH périmé ({quote['age_seconds']:.0f}s, bloc {quote['block']})")
+        return quote['price']
 
-    def get_token_data_onchain(self, token_address: str, pair_address: str = None) -> Dict:
+    def get_token_data_onchain(self, token_address: str, pair_address: str = None,
+                               created_block: int = None) -> Optional[Dict]:
         """
-        Récupère toutes les données on-chain pour un token
+        Récupère toutes les données on-chain pour un token (created_block: bloc de
+        création de la paire, point de départ du registre des holders)
 
         Returns:
             dict avec liquidity_usd, volume_5min, volume_1h, price_change_5min,
-            price_change_1h, holders, eth_price
+            price_change_1h, holders, owner_percentage (None si owner inconnu),
+            holders_complete, eth_price,
+            ou None si la liquidité est inconnue (paire WETH sans prix ETH)
         """
         data = {
             'liquidity_usd': 0.0,
@@ -435,7 +505,9 @@ class OnChainFetcher:
             'price_change_5min': 0.0,
             'price_change_1h': 0.0,
             'holders': 0,
-            'eth_price': 3000.0
+            'owner_percentage': None,
+            'holders_complete': False,
+            'eth_price': 0.0
         }
 
         try:
@@ -448,26 +520,37 @@ class OnChainFetcher:
                     print(f"⚠️  Aucun pool trouvé pour {token_address}")
                     return data
 
-            # 2. Prix ETH (cache 5min)
+            # 2. Prix ETH (oracle, sans appel réseau)
             data['eth_price'] = self.get_eth_price_onchain()
 
             # 3. Liquidité
-            data['liquidity_usd'] = self.get_pool_liquidity_usd(token_address, pair_address)
+            liquidity_usd = self.get_pool_liquidity_usd(token_address, pair_address)
+            if liquidity_usd is None:
+                print(f"⚠️  Prix ETH indisponible: liquidité de {pair_address} inconnue")
+                return None
+            data['liquidity_usd'] = liquidity_usd
 
             # Si liquidité trop faible, pas besoin d'aller plus loin
             if data['liquidity_usd'] < 500:
                 return data
 
-            # 4. Volume 5min et 1h
-            data['volume_5min'] = self.get_volume_last_minutes(pair_address, 5)
-            data['volume_1h'] = self.get_volume_last_minutes(pair_address, 60)
-
-            # 5. Changements de prix
-            data['price_change_5min'] = self.get_price_change(pair_address, 5, 5)
-            data['price_change_1h'] = self.get_price_change(pair_address, 60, 5)
-
-            # 6. Holders (estimation via Transfer events 2h)
-            data['holders'] = self.estimate_holders(token_address, 2)
+            # 4-5. Volumes et changements de prix: une seule lecture des Swap (65min)
+            head = self.head_tracker.update()
+            try:
+                swaps = self.get_swap_analytics(pair_address, head=head)
+                for key in ('volume_5min', 'volume_1h', 'price_change_5min', 'price_change_1h'):
+                    data[key] = swaps[key]
+            except Exception as e:
+                print(f"❌ Erreur get_swap_analytics: {e}")
+
+            # 6. Holders: registre local des balances, estimation Transfer 2h en secours
+            holders = self.get_holder_metrics(token_address, pair_address, created_block)
+            if holders:
+                data['holders'] = holders['holder_count']
+                data['owner_percentage'] = holders['owner_percentage']
+                data['holders_complete'] = holders['complete']
+            else:
+                data['holders'] = self.estimate_holders(token_address, 2, head=head)
 
             return data
 
@@ -489,11 +572,15 @@ if __name__ == "__main__":
 
     data = fetcher.get_token_data_onchain(test_token)
 
-    print(f"📊 Résultats:")
-    print(f"  • Liquidité: ${data['liquidity_usd']:,.0f}")
-    print(f"  • Volume 5min: ${data['volume_5min']:,.0f}")
-    print(f"  • Volume 1h: ${data['volume_1h']:,.0f}")
-    print(f"  • Δ Prix 5min: {data['price_change_5min']:+.2f}%")
-    print(f"  • Δ Prix 1h: {data['price_change_1h']:+.2f}%")
-    print(f"  • Holders (2h): {data['holders']}")
-    print(f"  • Prix ETH: ${data['eth_price']:,.2f}")
+    if data is None:
+        print("❌ Prix ETH indisponible, liquidité inconnue")
+    else:
+        print(f"📊 Résultats:")
+        print(f"  • Liquidité: ${data['liquidity_usd']:,.0f}")
+        print(f"  • Volume 5min: ${data['volume_5min']:,.0f}")
+        print(f"  • Volume 1h: ${data['volume_1h']:,.0f}")
+        print(f"  • Δ Prix 5min: {data['price_change_5min']:+.2f}%")
+        print(f"  • Δ Prix 1h: {data['price_change_1h']:+.2f}%")
+        owner = f"{data['owner_percentage']:.1f}%" if data['owner_percentage'] is not None else "inconnu"
+        print(f"  • Holders: {data['holders']} (owner {owner})")
+        print(f"  • Prix ETH: ${data['eth_price'] or 0:,.2f}")
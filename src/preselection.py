@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Preselection - Présélection on-chain d'un batch de tokens en deux allers-retours
+1. eth_getCode de tous les tokens en un lot JSON-RPC (bytecode présent + code hash)
+2. Multicall3: owner() des tokens + réserves de base des paires (token0 + getReserves,
+   balanceOf pour V3)
+Les tokens manifestement morts sont écartés avant d'atteindre discovered_tokens.
+"""
+
+import os
+from typing import Dict, List, Optional, Tuple
+from web3 import Web3
+from eth_utils import to_checksum_address
+
+from multicall import Multicall, decode_uint
+from rpc_batch import batch_call
+
+# Sélecteurs
+OWNER_SELECTOR = bytes.fromhex("8da5cb5b")  # owner()
+TOKEN0_SELECTOR = bytes.fromhex("0dfe1681")  # token0()
+GET_RESERVES_SELECTOR = bytes.fromhex("0902f1ac")  # getReserves()
+BALANCE_OF_SELECTOR = bytes.fromhex("70a08231")  # balanceOf(address)
+
+# Adresses considérées comme "owner renoncé"
+RENOUNCED_OWNERS = {
+    "0x0000000000000000000000000000000000000000",
+    "0x000000000000000000000000000000000000dead"
+}
+
+# Décimales des base tokens (Base mainnet)
+BASE_TOKEN_DECIMALS = {
+    "0x4200000000000000000000000000000000000006": 18,  # WETH
+    "0x833589fcd6edb6e08f4c7c32d4f71b54bda02913": 6,  # USDC
+    "0xd9aaec86b65d86f6a7b5b1b0c42ffa531710b6ca": 6  # USDbC
+}
+WETH = "0x4200000000000000000000000000000000000006"
+
+
+class OnChainPreselector:
+    """
+    Présélection par batch.
+
+    Rejets:
+    - pas de bytecode (adresse vide / contrat auto-détruit)
+    - code hash dans la liste noire (PRESELECTION_BLOCKED_CODE_HASHES)
+    - réserve de base token sous le minimum (pool vide ou retirée)
+
+    owner()/renonciation est remonté dans le token (owner_renounced) sans rejet.
+    """
+
+    def __init__(self, w3, multicall: Multicall = None):
+        self.w3 = w3
+        self.multicall = multicall or Multicall(w3)
+
+        self.min_weth_reserve = float(os.getenv('PRESELECTION_MIN_WETH_RESERVE', '0.05'))
+        self.min_stable_reserve = float(os.getenv('PRESELECTION_MIN_STABLE_RESERVE', '100'))
+        self.blocked_code_hashes = {
+            h.strip().lower() for h in os.getenv('PRESELECTION_BLOCKED_CODE_HASHES', '').split(',') if h.strip()
+        }
+
+    def _fetch_code(self, tokens: List[Dict]) -> List[bytes]:
+        """Bytecode de tous les tokens en un lot JSON-RPC"""
+        responses = batch_call(self.w3, [
+            ('eth_getCode', [to_checksum_address(t['token_address']), 'latest']) for t in tokens
+        ])
+
+        codes = []
+        for response in responses:
+            result = response.get('result') or '0x'
+            codes.append(bytes.fromhex(result[2:]) if isinstance(result, str) else bytes(result))
+        return codes
+
+    def _state_calls(self, tokens: List[Dict]) -> Tuple[List[Tuple[str, bytes]], List[Tuple]]:
+        """
+        owner() du token + lecture de réserve de base (token0() + getReserves en V2,
+        balanceOf en V3) pour tout le batch.
+
+        Returns:
+            (appels Multicall3, par token: (index owner, index token0 ou None, index réserve))
+        """
+        calls = []
+        slots = []
+        for token in tokens:
+            owner_index = len(calls)
+            calls.append((token['token_address'], OWNER_SELECTOR))
+            if token.get('factory_name') == 'Uniswap V3':
+                # V3: pas de getReserves, balance du base token détenue par le pool
+                padded_pool = bytes(12) + bytes.fromhex(token['pair_address'][2:])
+                calls.append((token['base_token'], BALANCE_OF_SELECTOR + padded_pool))
+                slots.append((owner_index, None, owner_index + 1))
+            else:
+                calls.append((token['pair_address'], TOKEN0_SELECTOR))
+                calls.append((token['pair_address'], GET_RESERVES_SELECTOR))
+                slots.append((owner_index, owner_index + 1, owner_index + 2))
+        return calls, slots
+
+    @staticmethod
+    def _base_reserve(token: Dict, token0: Optional[Tuple[bool, bytes]], reserves: Tuple[bool, bytes]) -> float:
+        """Réserve de base token (unités humaines) depuis token0() + getReserves ou balanceOf"""
+        success, data = reserves
+        if not success or len(data) < 32:
+            return 0.0
+
+        base = token['base_token'].lower()
+        decimals = BASE_TOKEN_DECIMALS.get(base, 18)
+
+        if token.get('factory_name') == 'Uniswap V3':
+            raw = decode_uint(data)
+        else:
+            token0_ok, token0_data = token0
+            if len(data) < 64 or not token0_ok or len(token0_data) < 32:
+                return 0.0
+            # Côté de la base lu sur la paire (token0), pas déduit de l'ordre des adresses
+            base_is_token0 = '0x' + token0_data[12:32].hex() == base
+            raw = int.from_bytes(data[0:32] if base_is_token0 else data[32:64], 'big')
+
+        return raw / 10 ** decimals
+
+    @staticmethod
+    def _owner_renounced(success: bool, data: bytes) -> Optional[bool]:
+        """True si owner() est l'adresse nulle / dead, None si le token n'a pas d'owner()"""
+        if not success or len(data) < 32:
+            return None  # Pas de owner() (non Ownable)
+        return '0x' + data[12:32].hex() in RENOUNCED_OWNERS
+
+    def preselect(self, tokens: List[Dict]) -> Tuple[List[Dict], Dict[str, str]]:
+        """
+        Args:
+            tokens: Tokens décodés (token_address, pair_address, base_token, factory_name)
+
+        Returns:
+            (tokens retenus enrichis de owner_renounced (None sans owner()) et base_reserve,
+             {token_address: raison du rejet})
+        """
+        if not tokens:
+            return [], {}
+
+        codes = self._fetch_code(tokens)
+        calls, slots = self._state_calls(tokens)
+        results = self.multicall.aggregate3(calls)
+
+        kept = []
+        rejected = {}
+
+        for index, token in enumerate(tokens):
+            code = codes[index]
+            if not code:
+                rejected[token['token_address']] = "pas de bytecode"
+                continue
+
+            code_hash = Web3.keccak(code).hex()
+            if code_hash.lower() in self.blocked_code_hashes:
+                rejected[token['token_address']] = f"code hash bloqué ({code_hash[:10]}...)"
+                continue
+
+            owner_index, token0_index, reserve_index = slots[index]
+            token0 = results[token0_index] if token0_index is not None else None
+
+            base_reserve = self._base_reserve(token, token0, results[reserve_index])
+            min_reserve = self.min_weth_reserve if token['base_token'].lower() == WETH else self.min_stable_reserve
+            if base_reserve < min_reserve:
+                rejected[token['token_address']] = f"réserve base {base_reserve:.4f} < {min_reserve}"
+                continue
+
+            kept.append(dict(
+                token,
+                owner_renounced=self._owner_renounced(*results[owner_index]),
+                base_reserve=base_reserve
+            ))
+
+        return kept, rejected
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Rate Limiter - Token bucket par fournisseur partagé entre process (Scanner, Filter, Trader)
+L'état des seaux vit dans une base SQLite (WAL) commune: chaque prise de jeton est une
+transaction BEGIN IMMEDIATE, donc le quota d'un fournisseur est respecté globalement
+et non plus par objet client.
+
+Priorités: un appelant prioritaire en attente bloque les priorités inférieures
+(marqueur de demande), et une réserve de jetons est gardée hors de portée des
+basses priorités, pour que les rafraîchissements de positions du Trader passent
+avant l'enrichissement du Filter quand le quota est tendu.
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Tuple
+
+PROJECT_DIR = Path(__file__).parent.parent
+DEFAULT_LIMITER_PATH = PROJECT_DIR / 'data' / 'rate_limits.db'
+
+PRIORITY_HIGH = 0    # Trader: prix des positions, validation avant achat
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2     # Filter: enrichissement des candidats
+
+# Part de la capacité du seau réservée aux priorités supérieures
+PRIORITY_RESERVE = {PRIORITY_HIGH: 0.0, PRIORITY_NORMAL: 0.2, PRIORITY_LOW: 0.5}
+
+# Fournisseur → (requêtes par minute, capacité du seau), débit surchargeable
+# par RATE_LIMIT_<FOURNISSEUR>_PER_MINUTE
+DEFAULT_LIMITS = {
+    'dexscreener': (280, 10),  # 300/min officiellement
+    'blockchair': (60, 1),     # 1 req/sec
+    'basescan': (240, 4),      # 5 req/sec officiellement
+    'coingecko': (25, 2),      # 10-50 req/min sans clé
+}
+
+
+def _provider_limits() -> Dict[str, Tuple[float, float]]:
+    return {
+        provider: (float(os.getenv(f'RATE_LIMIT_{provider.upper()}_PER_MINUTE', per_minute)), burst)
+        for provider, (per_minute, burst) in DEFAULT_LIMITS.items()
+    }
+
+
+class RateLimiter:
+    """
+    Seaux de jetons (fournisseur) → jetons disponibles + instant de la dernière recharge.
+
+    - try_acquire(fournisseur, priorité): prise non bloquante
+    - acquire(fournisseur, priorité, timeout): attente bloquante (threads)
+    - acquire_async(fournisseur, priorité, timeout): attente asyncio
+    """
+
+    def __init__(self, db_path: Path = None, limits: Dict[str, Tuple[float, float]] = None):
+        """
+        Args:
+            db_path: Fichier SQLite partagé (défaut: RATE_LIMIT_PATH ou data/rate_limits.db)
+            limits: {fournisseur: (requêtes par minute, capacité)} (défaut: DEFAULT_LIMITS)
+        """
+        self.db_path = Path(db_path or os.getenv('RATE_LIMIT_PATH', DEFAULT_LIMITER_PATH))
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.limits = limits or _provider_limits()
+        self.max_wait = float(os.getenv('RATE_LIMIT_MAX_WAIT_SECONDS', 30))
+
+        self._lock = threading.Lock()
+        self.stats = {'acquired': 0, 'refused': 0, 'waited_seconds': 0.0}
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _init_database(self):
+        conn = self._connect()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS buckets (
+                provider TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS demand (
+                provider TEXT NOT NULL,
+                priority INTEGER NOT NULL,
+                until REAL NOT NULL,
+                PRIMARY KEY (provider, priority)
+            )
+        ''')
+        conn.close()
+
+    # ==================== PRISE DE JETONS ====================
+
+    def _take(self, provider: str, priority: int, tokens: float) -> float:
+        """
+        Tente de prendre des jetons (une transaction, tous process confondus).
+
+        Returns:
+            0.0 si pris, sinon attente estimée en secondes avant un nouvel essai
+        """
+        if provider not in self.limits:
+            return 0.0  # Fournisseur sans quota connu
+        per_minute, capacity = self.limits[provider]
+        rate = per_minute / 60.0
+        reserve = int(PRIORITY_RESERVE.get(priority, 0.0) * capacity)
+
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            row = conn.execute(
+                "SELECT tokens, updated_at FROM buckets WHERE provider = ?", (provider,)
+            ).fetchone()
+            available = capacity if row is None else min(capacity, row[0] + (now - row[1]) * rate)
+
+            # Un appelant plus prioritaire attend: lui laisser les prochains jetons
+            blocked_until = conn.execute(
+                "SELECT MAX(until) FROM demand WHERE provider = ? AND priority < ? AND until > ?",
+                (provider, priority, now)
+            ).fetchone()[0]
+
+            if blocked_until is None and available - tokens >= reserve:
+                available -= tokens
+                wait = 0.0
+                conn.execute(
+                    "DELETE FROM demand WHERE provider = ? AND priority = ?", (provider, priority)
+                )
+            else:
+                wait = max((tokens + reserve - available) / rate, (blocked_until or now) - now, 0.01)
+                # Signaler la demande aux priorités inférieures (sauf la plus basse)
+                if priority < PRIORITY_LOW:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO demand (provider, priority, until) VALUES (?, ?, ?)",
+                        (provider, priority, now + wait + 1.0)
+                    )
+
+            conn.execute(
+                "INSERT OR REPLACE INTO buckets (provider, tokens, updated_at) VALUES (?, ?, ?)",
+                (provider, available, now)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        with self._lock:
+            self.stats['acquired' if wait == 0.0 else 'refused'] += 1
+        return wait
+
+    def try_acquire(self, provider: str, priority: int = PRIORITY_NORMAL, tokens: float = 1) -> bool:
+        """Prise non bloquante: True si la requête peut partir tout de suite"""
+        return self._take(provider, priority, tokens) == 0.0
+
+    def acquire(self, provider: str, priority: int = PRIORITY_NORMAL, timeout: float = None,
+                tokens: float = 1) -> bool:
+        """
+        Attend un jeton (threads / code synchrone).
+
+        Returns:
+            False si le délai (défaut: RATE_LIMIT_MAX_WAIT_SECONDS) expire avant
+        """
+        deadline = time.time() + (self.max_wait if timeout is None else timeout)
+        while True:
+            wait = self._take(provider, priority, tokens)
+            if wait == 0.0:
+                return True
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return False
+            sleep_time = min(wait, remaining)
+            with self._lock:
+                self.stats['waited_seconds'] += sleep_time
+            time.sleep(sleep_time)
+
+    async def acquire_async(self, provider: str, priority: int = PRIORITY_NORMAL, timeout: float = None,
+                            tokens: float = 1) -> bool:
+        """Comme acquire, sans bloquer la boucle asyncio"""
+        deadline = time.time() + (self.max_wait if timeout is None else timeout)
+        while True:
+            wait = self._take(provider, priority, tokens)
+            if wait == 0.0:
+                return True
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return False
+            sleep_time = min(wait, remaining)
+            with self._lock:
+                self.stats['waited_seconds'] += sleep_time
+            await asyncio.sleep(sleep_time)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return dict(self.stats)
+
+
+_shared_limiter = None
+_shared_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Instance partagée par tous les clients du process (les seaux sont communs aux process)"""
+    global _shared_limiter
+    with _shared_limiter_lock:
+        if _shared_limiter is None:
+            _shared_limiter = RateLimiter()
+        return _shared_limiter
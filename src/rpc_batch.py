@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+RPC Batch - Transport JSON-RPC par lots pour Web3
+Provider HTTP compatible Web3.HTTPProvider: les lectures courtes émises en parallèle
+(eth_call, eth_getCode, eth_getBlockByNumber...) sont regroupées en tableaux
+JSON-RPC batch sur une session HTTP keep-alive partagée, envoyés par un petit
+pool de threads (un lot lent ne retarde pas les suivants).
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from web3 import Web3
+from web3.providers.rpc import HTTPProvider
+
+DEFAULT_MAX_BATCH_SIZE = 50  # Requêtes par tableau JSON-RPC
+DEFAULT_FLUSH_MS = 5  # Attente max pour remplir un lot (millisecondes)
+DEFAULT_TIMEOUT = 10
+DEFAULT_SENDERS = 4  # Lots envoyés simultanément
+DEFAULT_BATCH_RETRY_SECONDS = 300  # Délai avant de réessayer les lots après un refus
+
+# Lectures courtes sans effet de bord: regroupables sans risque.
+# Exclues: eth_getLogs (réponses lourdes et lentes), eth_estimateGas et
+# eth_getTransactionCount (chemin d'envoi du Trader, sensibles à la latence / au nonce)
+BATCHABLE_METHODS = {
+    'eth_call', 'eth_getCode', 'eth_getBlockByNumber', 'eth_getBlockByHash',
+    'eth_getBalance', 'eth_getStorageAt', 'eth_getTransactionReceipt', 'eth_getTransactionByHash',
+    'eth_blockNumber', 'eth_chainId', 'eth_gasPrice'
+}
+
+
+class BatchingHTTPProvider(HTTPProvider):
+    """
+    Provider HTTP qui regroupe les requêtes concurrentes.
+
+    - make_request(): mise en file; un thread de flush constitue un lot dès que
+      max_batch_size requêtes sont en attente ou après flush_ms, et le confie
+      au pool d'envoi (plusieurs lots en vol)
+    - batch_request(): envoi explicite d'une liste d'appels depuis un seul thread
+    - Méthodes non regroupables (eth_sendRawTransaction, eth_getLogs...) envoyées directement
+    - Si le RPC refuse les lots, repli requête par requête pendant batch_retry_seconds
+    """
+
+    def __init__(self, endpoint_uri: str, request_kwargs: Optional[Dict] = None,
+                 max_batch_size: int = None, flush_ms: float = None, senders: int = None,
+                 batch_retry_seconds: float = None):
+        """
+        Args:
+            endpoint_uri: URL HTTP du RPC
+            request_kwargs: Comme HTTPProvider (timeout, headers...)
+            max_batch_size: Taille max d'un lot (défaut: RPC_BATCH_MAX_SIZE ou 50, 1 = désactivé)
+            flush_ms: Délai max de constitution d'un lot (défaut: RPC_BATCH_FLUSH_MS ou 5)
+            senders: Lots envoyés simultanément (défaut: RPC_BATCH_SENDERS ou 4)
+            batch_retry_seconds: Repli sans lots après un refus, avant nouvel essai
+                (défaut: RPC_BATCH_RETRY_SECONDS ou 300)
+        """
+        super().__init__(endpoint_uri, request_kwargs=request_kwargs)
+
+        self.max_batch_size = max(1, int(max_batch_size or os.getenv('RPC_BATCH_MAX_SIZE', DEFAULT_MAX_BATCH_SIZE)))
+        self.flush_seconds = float(flush_ms if flush_ms is not None else os.getenv('RPC_BATCH_FLUSH_MS', DEFAULT_FLUSH_MS)) / 1000
+        self.timeout = (request_kwargs or {}).get('timeout', DEFAULT_TIMEOUT)
+        self.senders = max(1, int(senders or os.getenv('RPC_BATCH_SENDERS', DEFAULT_SENDERS)))
+        self.batch_retry_seconds = float(batch_retry_seconds if batch_retry_seconds is not None
+                                         else os.getenv('RPC_BATCH_RETRY_SECONDS', DEFAULT_BATCH_RETRY_SECONDS))
+
+        # Session keep-alive partagée par tous les threads
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._queue = queue.Queue()
+        self._flusher = None
+        self._flusher_lock = threading.Lock()
+        self._sender_pool = None
+        self._batch_disabled_until = 0.0  # Lots refusés par le RPC jusqu'à cet instant
+
+        self._stats_lock = threading.Lock()
+        self.stats = {'requests': 0, 'batches': 0, 'largest_batch': 0, 'fallbacks': 0}
+
+    @property
+    def batch_supported(self) -> bool:
+        """False pendant le délai de repli qui suit un refus des lots par le RPC"""
+        return time.time() >= self._batch_disabled_until
+
+    # ==================== ENVOI ====================
+
+    def _post(self, payload: bytes) -> Any:
+        response = self.session.post(
+            self.endpoint_uri,
+            data=payload,
+            headers=self.get_request_headers(),
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return self.decode_rpc_response(response.content)
+
+    def _send_batch(self, calls: List[Tuple[str, Any]]) -> List[Dict]:
+        """Envoie un lot, retourne les réponses dans l'ordre des appels"""
+        with self._stats_lock:
+            self.stats['requests'] += len(calls)
+
+        if len(calls) == 1 or not self.batch_supported:
+            return [self._post(self.encode_rpc_request(method, params)) for method, params in calls]
+
+        encoded = [self.encode_rpc_request(method, params) for method, params in calls]
+        ids = [self.decode_rpc_response(request)['id'] for request in encoded]
+
+        with self._stats_lock:
+            self.stats['batches'] += 1
+            self.stats['largest_batch'] = max(self.stats['largest_batch'], len(calls))
+        responses = self._post(b'[' + b','.join(encoded) + b']')
+
+        if not isinstance(responses, list):
+            # Lot refusé (RPC sans support, page 429...): repli requête par requête, nouvel essai plus tard
+            self._batch_disabled_until = time.time() + self.batch_retry_seconds
+            with self._stats_lock:
+                self.stats['fallbacks'] += 1
+            return [self._post(request) for request in encoded]
+
+        by_id = {response.get('id'): response for response in responses}
+        return [
+            by_id.get(request_id, {'jsonrpc': '2.0', 'id': request_id,
+                                   'error': {'code': -32603, 'message': 'Réponse absente du lot'}})
+            for request_id in ids
+        ]
+
+    def batch_request(self, calls: List[Tuple[str, Any]]) -> List[Dict]:
+        """
+        Envoie explicitement une liste d'appels en lots de max_batch_size.
+
+        Args:
+            calls: Liste de (méthode, params)
+
+        Returns:
+            Réponses JSON-RPC brutes ({'result': ...} ou {'error': ...}) dans l'ordre
+        """
+        responses = []
+        for start in range(0, len(calls), self.max_batch_size):
+            responses.extend(self._send_batch(calls[start:start + self.max_batch_size]))
+        return responses
+
+    # ==================== REGROUPEMENT AUTOMATIQUE ====================
+
+    def _ensure_flusher(self):
+        with self._flusher_lock:
+            if self._sender_pool is None:
+                self._sender_pool = ThreadPoolExecutor(max_workers=self.senders, thread_name_prefix='rpc-batch-send')
+            if self._flusher is None or not self._flusher.is_alive():
+                self._flusher = threading.Thread(target=self._flush_loop, name='rpc-batch', daemon=True)
+                self._flusher.start()
+
+    def _deliver(self, pending: List[Tuple[str, Any, Future]]):
+        """Envoie un lot constitué et rend chaque réponse à son appelant (thread du pool d'envoi)"""
+        try:
+            responses = self._send_batch([(method, params) for method, params, _ in pending])
+            for (_, _, future), response in zip(pending, responses):
+                future.set_result(response)
+        except Exception as e:
+            for _, _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+
+    def _flush_loop(self):
+        while True:
+            pending = [self._queue.get()]
+            deadline = time.time() + self.flush_seconds
+
+            while len(pending) < self.max_batch_size:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    pending.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            # Envoi hors du thread de constitution: le lot suivant part sans attendre la réponse
+            self._sender_pool.submit(self._deliver, pending)
+
+    def make_request(self, method, params):
+        if self.max_batch_size <= 1 or method not in BATCHABLE_METHODS:
+            with self._stats_lock:
+                self.stats['requests'] += 1
+            return self._post(self.encode_rpc_request(method, params))
+
+        self._ensure_flusher()
+        future = Future()
+        self._queue.put((method, params, future))
+        return future.result(timeout=self.timeout * 2)
+
+    def get_stats(self) -> Dict:
+        with self._stats_lock:
+            return dict(self.stats)
+
+
+_shared_providers = {}
+_shared_providers_lock = threading.Lock()
+
+
+def make_web3(rpc_url: str, timeout: int = DEFAULT_TIMEOUT) -> Web3:
+    """
+    Instance Web3 sur le transport par lots (remplace Web3(Web3.HTTPProvider(url))).
+
+    Un seul provider par (URL, timeout) dans le process: les basculements de RPC et
+    les endpoints du log fetcher réutilisent son thread de flush, son pool d'envoi
+    et sa session au lieu d'en démarrer de nouveaux à chaque appel.
+    """
+    with _shared_providers_lock:
+        key = (rpc_url, timeout)
+        if key not in _shared_providers:
+            _shared_providers[key] = BatchingHTTPProvider(rpc_url, request_kwargs={'timeout': timeout})
+        provider = _shared_providers[key]
+    return Web3(provider)
+
+
+def batch_call(w3, calls: List[Tuple[str, Any]]) -> List[Dict]:
+    """
+    Envoie une liste d'appels JSON-RPC en lots si le provider le permet,
+    sinon un par un (provider Web3 standard).
+    """
+    provider = w3.provider
+    if hasattr(provider, 'batch_request'):
+        return provider.batch_request(calls)
+    return [provider.make_request(method, params) for method, params in calls]
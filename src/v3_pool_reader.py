@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+V3 Pool Reader - État des pools Uniswap V3 d'un token lu en un seul aggregate3
+Adresses des pools calculées localement (CREATE2), puis slot0, liquidity et
+balances des deux tokens pour tous les fee tiers en un aller-retour RPC.
+Prix spot, profondeur de la liquidité active et cotations d'un montant
+(getAmountsOut sur les réserves virtuelles) dérivés localement, sans Quoter.
+"""
+
+import math
+from typing import Dict, List, Optional
+
+from eth_abi import encode
+from eth_utils import keccak, to_checksum_address
+
+from multicall import Multicall, decode_uint, DECIMALS_SELECTOR
+
+UNISWAP_V3_FACTORY = "0x33128a8fC17869897dcE68Ed026d694621f6FDfD"
+POOL_INIT_CODE_HASH = bytes.fromhex("e34f199b19b2b4f47f68442619d555527d244f78a3297ea89325f843f87b8b54")
+FEE_TIERS = (100, 500, 3000, 10000)
+
+WETH = "0x4200000000000000000000000000000000000006"
+
+SLOT0_SELECTOR = keccak(text="slot0()")[:4]
+LIQUIDITY_SELECTOR = keccak(text="liquidity()")[:4]
+BALANCE_OF_SELECTOR = keccak(text="balanceOf(address)")[:4]
+
+Q96 = 2 ** 96
+DEPTH_PERCENT = 2.0  # Profondeur mesurée pour un mouvement de prix de ±2%
+
+
+def compute_pool_address(token_a: str, token_b: str, fee: int,
+                         factory: str = UNISWAP_V3_FACTORY, init_code_hash: bytes = POOL_INIT_CODE_HASH) -> str:
+    """Adresse CREATE2 d'un pool V3 (déployé ou non), sans appel RPC"""
+    token0, token1 = sorted((token_a.lower(), token_b.lower()))
+    salt = keccak(encode(['address', 'address', 'uint24'], [token0, token1, fee]))
+    digest = keccak(b'\xff' + bytes.fromhex(factory[2:]) + salt + init_code_hash)
+    return to_checksum_address(digest[12:])
+
+
+def _int24(value: int) -> int:
+    value &= (1 << 24) - 1
+    return value - (1 << 24) if value >= 1 << 23 else value
+
+
+def swap_amount_out(state: Dict, amount_in: int, sell: bool) -> int:
+    """
+    Sortie d'un swap exactInput dans un pool lu par read_pools: getAmountsOut sur
+    les réserves virtuelles de la liquidité active (x = L/√P, y = L·√P), frais du
+    tier déduits. Exact tant que le swap reste dans le tick courant; au-delà la
+    liquidité hors plage est inconnue, la sortie est bornée par la balance réelle.
+
+    Args:
+        state: Pool retourné par read_pools
+        amount_in: Montant entrant en unités brutes
+        sell: True token → quote, False quote → token
+
+    Returns:
+        Montant sortant en unités brutes (0 si pas de liquidité active)
+    """
+    liquidity = state['liquidity']
+    if not liquidity or amount_in <= 0:
+        return 0
+    sqrt_price = state['sqrt_price_x96'] / Q96
+    reserve0, reserve1 = liquidity / sqrt_price, liquidity * sqrt_price
+
+    token_in_is_token0 = state['token_is_token0'] == sell
+    reserve_in, reserve_out = (reserve0, reserve1) if token_in_is_token0 else (reserve1, reserve0)
+    amount_in_after_fee = amount_in * (1 - state['fee'] / 1_000_000)
+    amount_out = reserve_out * amount_in_after_fee / (reserve_in + amount_in_after_fee)
+
+    if sell:
+        balance_out = state['quote_balance'] * 10 ** state['quote_decimals']
+    else:
+        balance_out = state['token_balance'] * 10 ** state['token_decimals']
+    return int(min(amount_out, balance_out))
+
+
+class V3PoolReader:
+    """
+    Lecture groupée des pools V3 token/quote.
+
+    - read_pools(token): état de chaque fee tier déployé (un aggregate3)
+    - best_pool(token): pool le plus profond, prix spot en quote par token
+    """
+
+    def __init__(self, w3, multicall: Multicall = None, cache=None):
+        """
+        Args:
+            w3: Instance Web3
+            multicall: Client Multicall3 (défaut: nouveau client sur w3)
+            cache: MetadataCache pour les décimales (défaut: cache partagé)
+        """
+        self.w3 = w3
+        self.multicall = multicall or Multicall(w3)
+        if cache is None:
+            from metadata_cache import get_metadata_cache
+            cache = get_metadata_cache()
+        self.cache = cache
+
+    def read_pools(self, token_address: str, quote_token: str = WETH,
+                   fee_tiers=FEE_TIERS, block_identifier='latest') -> List[Dict]:
+        """
+        Args:
+            token_address: Token à évaluer
+            quote_token: Token de cotation (WETH par défaut)
+
+        Returns:
+            Pour chaque pool déployé: fee, address, sqrt_price_x96, tick, liquidity,
+            token_is_token0, token_decimals / quote_decimals,
+            token_balance / quote_balance (unités humaines), price (quote par token),
+            quote_depth (quote nécessaire pour bouger le prix de DEPTH_PERCENT % à liquidité constante)
+        """
+        token = to_checksum_address(token_address)
+        quote = to_checksum_address(quote_token)
+        token_is_token0 = token.lower() < quote.lower()
+
+        # Décimales depuis le cache, sinon lues dans le même lot
+        cached = self.cache.get_tokens([token, quote]) if self.cache else {}
+        missing = [address for address in (token, quote) if address.lower() not in cached]
+
+        pools = [(fee, compute_pool_address(token, quote, fee)) for fee in fee_tiers]
+        calls = []
+        for _, pool in pools:
+            calls += [
+                (pool, SLOT0_SELECTOR),
+                (pool, LIQUIDITY_SELECTOR),
+                (token, BALANCE_OF_SELECTOR + encode(['address'], [pool])),
+                (quote, BALANCE_OF_SELECTOR + encode(['address'], [pool]))
+            ]
+        calls += [(address, DECIMALS_SELECTOR) for address in missing]
+
+        results = self.multicall.aggregate3(calls, block_identifier)
+
+        decimals = {address.lower(): cached[address.lower()]['decimals'] for address in (token, quote)
+                    if address.lower() in cached}
+        for address, (success, data) in zip(missing, results[len(pools) * 4:]):
+            value = decode_uint(data) if success else None
+            decimals[address.lower()] = value if value is not None and value <= 255 else 18
+        token_decimals, quote_decimals = decimals[token.lower()], decimals[quote.lower()]
+
+        states = []
+        for index, (fee, pool) in enumerate(pools):
+            slot0, liquidity, token_balance, quote_balance = results[index * 4:index * 4 + 4]
+
+            # Pool non déployé: appel vers une adresse sans code → retour vide
+            if not slot0[0] or len(slot0[1]) < 64 or not liquidity[0]:
+                continue
+
+            sqrt_price_x96 = decode_uint(slot0[1])
+            if not sqrt_price_x96:
+                continue  # Pool créé mais non initialisé
+            tick = _int24(int.from_bytes(slot0[1][32:64], 'big'))
+            active_liquidity = decode_uint(liquidity[1]) or 0
+
+            # Prix brut token1/token0 = (sqrtP / 2^96)^2
+            sqrt_price = sqrt_price_x96 / Q96
+            raw_price = sqrt_price ** 2
+            if token_is_token0:
+                price = raw_price * 10 ** (token_decimals - quote_decimals)
+                # Quote = token1: Δy = L·Δ√P
+                quote_depth_raw = active_liquidity * sqrt_price * (math.sqrt(1 + DEPTH_PERCENT / 100) - 1)
+            else:
+                price = (1 / raw_price) * 10 ** (token_decimals - quote_decimals)
+                # Quote = token0: Δx = L·(1/√P' - 1/√P) avec √P' = √P·√(1+d)
+                quote_depth_raw = active_liquidity / sqrt_price * (1 - 1 / math.sqrt(1 + DEPTH_PERCENT / 100))
+
+            states.append({
+                'fee': fee,
+                'address': pool,
+                'sqrt_price_x96': sqrt_price_x96,
+                'tick': tick,
+                'liquidity': active_liquidity,
+                'token_is_token0': token_is_token0,
+                'token_decimals': token_decimals,
+                'quote_decimals': quote_decimals,
+                'token_balance': (decode_uint(token_balance[1]) or 0) / 10 ** token_decimals if token_balance[0] else 0.0,
+                'quote_balance': (decode_uint(quote_balance[1]) or 0) / 10 ** quote_decimals if quote_balance[0] else 0.0,
+                'price': price,
+                'quote_depth': quote_depth_raw / 10 ** quote_decimals
+            })
+
+        return states
+
+    def best_pool(self, token_address: str, quote_token: str = WETH) -> Optional[Dict]:
+        """Pool le plus profond (liquidité active en quote) parmi les fee tiers, None si aucun"""
+        states = [state for state in self.read_pools(token_address, quote_token) if state['liquidity'] > 0]
+        if not states:
+            return None
+        return max(states, key=lambda state: state['quote_depth'])
@@ -6,12 +6,21 @@ Utilitaires Web3 pour interactions blockchain reelles
 import json
 import time
 import threading
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from web3 import Web3
 from eth_account import Account
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
+from multicall import TokenMetadataResolver
+from metadata_cache import get_metadata_cache
+from rpc_batch import make_web3
+from v3_pool_reader import V3PoolReader, swap_amount_out
+from eth_price_oracle import get_eth_price_oracle
+from market_cache import get_market_cache
+from rate_limiter import get_rate_limiter, PRIORITY_NORMAL
+from circuit_breaker import get_circuit_breaker, CircuitOpenError
+from api_fallbacks import fetch_dexscreener_pairs, DEXSCREENER_MAX_TOKENS_PER_REQUEST
 
 class BaseWeb3Manager:
     """Gestionnaire Web3 pour Base Layer 2"""
@@ -30,7 +39,7 @@ class BaseWeb3Manager:
         self.w3 = None
         for url in self.rpc_urls:
             try:
-                self.w3 = Web3(Web3.HTTPProvider(url))
+                self.w3 = make_web3(url)
                 if self.w3.is_connected():
                     print(f"Connecte a Base via {url}")
                     break
@@ -61,16 +70,15 @@ class BaseWeb3Manager:
             if not Web3.is_address(token_address):
                 return None
                 
-            token = self.w3.eth.contract(
-                address=Web3.to_checksum_address(token_address),
-                abi=self.erc20_abi
-            )
+            # name/symbol/decimals/totalSupply en un seul aller-retour (Multicall3, cache immuable)
+            metadata = TokenMetadataResolver(self.w3, cache=get_metadata_cache()).resolve(token_address)
+            if not metadata['resolved']:
+                return None
             
-            # Appels avec timeout
-            name = token.functions.name().call()
-            symbol = token.functions.symbol().call()
-            decimals = token.functions.decimals().call()
-            total_supply = token.functions.totalSupply().call()
+            name = metadata['name']
+            symbol = metadata['symbol']
+            decimals = metadata['decimals']
+            total_supply = metadata['total_supply']
             
             return {
                 'address': token_address.lower(),
@@ -219,6 +227,9 @@ class UniswapV3Manager:
         except Exception as e:
             print(f"Erreur initialisation quoter: {e}")
             self.quoter_contract = None
+
+        # État des pools V3 (prix spot + profondeur) en un aller-retour
+        self.pool_reader = V3PoolReader(self.w3)
         
     def get_pool_address(self, token0: str, token1: str, fee: int = 3000) -> Optional[str]:
         """Calcule l'adresse d'une pool Uniswap V3"""
@@ -262,54 +273,51 @@ class UniswapV3Manager:
             return None
         
     def get_token_price(self, token_address: str, amount: int = None, is_sell: bool = False) -> float:
-        """Recupere le prix d'un token en WETH"""
+        """
+        Recupere le prix d'un token en WETH depuis le pool V3 le plus profond
+        (slot0/liquidity de tous les fee tiers en un seul aggregate3, sans Quoter).
+
+        Args:
+            amount: Montant entrant en unites brutes (tokens si is_sell, sinon WETH);
+                None pour le prix spot
+            is_sell: Sens du swap (token -> WETH)
+
+        Returns:
+            Prix spot, ou prix moyen d'execution pour ce montant et ce sens
+            (frais et impact inclus), en WETH par token; 0 si aucun pool
+        """
         try:
-            if not self.quoter_contract:
+            pool = self.pool_reader.best_pool(token_address, self.WETH_ADDRESS)
+            if not pool:
                 return 0
-                
             if amount is None:
-                amount = 10 ** 18  # 1 token par defaut
-            
-            # Inverser les tokens si c'est une vente
-            if is_sell:
-                token_in = Web3.to_checksum_address(token_address)
-                token_out = Web3.to_checksum_address(self.WETH_ADDRESS)
-            else:
-                token_in = Web3.to_checksum_address(self.WETH_ADDRESS)
-                token_out = Web3.to_checksum_address(token_address)
-                
-            # Essayer differents fee tiers
-            for fee in [3000, 500, 10000, 100]:
-                try:
-                    result = self.quoter_contract.functions.quoteExactInputSingle(
-                        token_in,
-                        token_out,
-                        amount,
-                        fee,
-                        0
-                    ).call()
-                    
-                    if result[0] > 0:
-                        # Convertir en prix decimal
-                        if is_sell:
-                            price_in_weth = result[0] / 10**18
-                        else:
-                            price_in_weth = amount / result[0] if result[0] > 0 else 0
-                        return price_in_weth
-                except Exception:
-                    continue
-                    
-            return 0
+                return pool['price']
+
+            amount_out = swap_amount_out(pool, amount, sell=is_sell)
+            if amount_out <= 0:
+                return 0
+            weth_raw, token_raw = (amount_out, amount) if is_sell else (amount, amount_out)
+            return (weth_raw / 10 ** pool['quote_decimals']) / (token_raw / 10 ** pool['token_decimals'])
         except Exception as e:
             print(f"Erreur get_token_price: {e}")
             return 0
 
 class DexScreenerAPI:
     """Client pour l'API DexScreener avec retry"""
-    
+
+    MAX_TOKENS_PER_REQUEST = DEXSCREENER_MAX_TOKENS_PER_REQUEST
+
     def __init__(self):
         self.base_url = "https://api.dexscreener.com/latest/dex"
         self.session = self._create_session()
+        self.cache = get_market_cache()  # Partage avec le Filter (SQLite WAL commun)
+        self.limiter = get_rate_limiter()  # 300 req/min partagees entre Scanner, Filter et Trader
+        self.priority = PRIORITY_NORMAL
+        self.breaker = get_circuit_breaker('dexscreener', probe=self._probe)
+
+    def _probe(self):
+        """Requete legere de la sonde du disjoncteur"""
+        return self.session.get(f"{self.base_url}/tokens/{UniswapV3Manager.WETH_ADDRESS}", timeout=10)
         
     def _create_session(self) -> requests.Session:
         """Cree une session avec retry automatique"""
@@ -329,29 +337,48 @@ class DexScreenerAPI:
         if self.session:
             self.session.close()
         
-    def get_token_info(self, token_address: str) -> Optional[Dict]:
+    def get_token_info(self, token_address: str, fields=None) -> Optional[Dict]:
         """Recupere les infos d'un token depuis DexScreener"""
-        try:
-            url = f"{self.base_url}/tokens/{token_address}"
-            response = self.session.get(url, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('pairs'):
-                    # Filtrer les paires sur Base
-                    base_pairs = [p for p in data['pairs'] if p.get('chainId') == 'base']
-                    if not base_pairs:
-                        base_pairs = data['pairs']
-                        
-                    # Prendre la paire avec le plus de liquidite
-                    pairs = sorted(base_pairs, key=lambda x: float(x.get('liquidity', {}).get('usd', 0)), reverse=True)
-                    if pairs:
-                        return self._parse_pair_data(pairs[0])
-            return None
-        except Exception as e:
-            print(f"Erreur DexScreener API: {e}")
-            return None
-            
+        return self.get_tokens_info([token_address], fields).get(token_address.lower())
+
+    def _fetch_pairs(self, addresses: List[str]) -> Dict[str, List[Dict]]:
+        """Paires brutes par token, par lots de MAX_TOKENS_PER_REQUEST adresses (fetch_dexscreener_pairs)"""
+        return fetch_dexscreener_pairs(self.session, self.base_url, addresses, self.limiter, self.breaker,
+                                       self.priority, max_tokens=self.MAX_TOKENS_PER_REQUEST)
+
+    def get_tokens_info(self, token_addresses: List[str], fields=None) -> Dict[str, Optional[Dict]]:
+        """
+        Recupere les infos de plusieurs tokens via le cache de marche partage
+        (HTTP groupe seulement pour les tokens sans valeur assez recente)
+
+        Args:
+            fields: Champs utilises ('price', 'volume', 'liquidity', 'market_cap', 'pair'),
+                    fixent la fraicheur exigee (tous par defaut)
+
+        Returns:
+            Dict {adresse minuscule: donnees de la paire la plus liquide, ou None}
+        """
+        addresses = list(dict.fromkeys(address.lower() for address in token_addresses))
+        if self.cache is not None:
+            pairs_by_token = self.cache.get_many('dexscreener', addresses, self._fetch_pairs, fields)
+        else:
+            pairs_by_token = self._fetch_pairs(addresses)
+
+        results = {}
+        for address in addresses:
+            token_pairs = pairs_by_token.get(address)
+            if not token_pairs:
+                results[address] = None
+                continue
+            # Filtrer les paires sur Base
+            base_pairs = [p for p in token_pairs if p.get('chainId') == 'base'] or token_pairs
+
+            # Prendre la paire avec le plus de liquidite
+            best = max(base_pairs, key=lambda x: float(x.get('liquidity', {}).get('usd', 0)))
+            results[address] = self._parse_pair_data(best)
+
+        return results
+
     def get_recent_pairs_on_chain(self, chain_id: str = 'base', limit: int = 50) -> list:
         """
         Recupere les paires recentes sur une blockchain donnee
@@ -658,6 +685,11 @@ class CoinGeckoAPI:
         self.session.headers.update(self.headers)
         self._eth_price_cache = {'price': 3000, 'timestamp': 0}
         self._cache_lock = threading.Lock()
+        self.breaker = get_circuit_breaker('coingecko', probe=self._probe)
+
+    def _probe(self):
+        """Requete legere de la sonde du disjoncteur"""
+        return self.session.get(f"{self.base_url}/ping", timeout=10)
         
     def _create_session(self) -> requests.Session:
         """Cree une session avec retry"""
@@ -688,7 +720,8 @@ class CoinGeckoAPI:
             url = f"{self.base_url}/simple/price"
             params = {'ids': 'ethereum', 'vs_currencies': 'usd'}
             
-            response = self.session.get(url, params=params, timeout=10)
+            # Circuit ouvert: CircuitOpenError immediate, derniere valeur connue
+            response = self.breaker.call(self.session.get, url, params=params, timeout=10)
             if response.status_code == 200:
                 data = response.json()
                 price = float(data.get('ethereum', {}).get('usd', 3000))
@@ -697,6 +730,9 @@ class CoinGeckoAPI:
                     self._eth_price_cache = {'price': price, 'timestamp': time.time()}
                 return price
             return 3000  # Fallback
+        except CircuitOpenError:
+            with self._cache_lock:
+                return self._eth_price_cache.get('price', 3000)
         except Exception as e:
             print(f"Erreur get_eth_price: {e}")
             with self._cache_lock:
@@ -989,27 +1025,16 @@ class MarketDataAggregator:
         return result
 
     def _get_onchain_price(self, token_address: str) -> float:
-        """Récupère le prix on-chain via Uniswap V3 quote"""
+        """Récupère le prix on-chain via l'état des pools Uniswap V3 et l'oracle ETH"""
         try:
             if not self.uniswap_manager:
                 return 0
 
-            # Quote 1 token → WETH
-            weth_address = "0x4200000000000000000000000000000000000006"
-            weth_amount = self.uniswap_manager.get_quote(
-                token_in=token_address,
-                token_out=weth_address,
-                amount_in=10**18,  # 1 token (18 decimals)
-                fee=3000  # 0.3%
-            )
-
-            if weth_amount and weth_amount > 0:
-                # Prix approximatif WETH = $3000 (à ajuster selon marché)
-                eth_price_usd = 3000
-                price_usd = (weth_amount / 10**18) * eth_price_usd
-                return price_usd
-
-            return 0
+            price_eth = self.uniswap_manager.get_token_price(token_address)
+            eth_price_usd = get_eth_price_oracle(self.uniswap_manager.w3).get_price()
+            if eth_price_usd is None:
+                return 0  # Prix ETH indisponible
+            return price_eth * eth_price_usd
         except Exception as e:
             print(f"Erreur prix on-chain: {e}")
             return 0
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+WebSocket Listener - Découverte en push via eth_subscribe
+Souscrit aux logs (adresses des factories + topics de création) et aux newHeads,
+se reconnecte avec backoff exponentiel et laisse l'appelant combler le trou
+(backfill HTTP) à chaque (re)connexion avant de traiter les notifications.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Callable, Dict, List, Optional
+
+import websockets
+from hexbytes import HexBytes
+from eth_utils import to_checksum_address
+
+DEFAULT_MAX_RECONNECT_DELAY = 60  # Secondes
+HEALTHY_SILENCE_SECONDS = 30  # Sans message au-delà → flux considéré en panne
+
+
+def normalize_log(raw: Dict) -> Dict:
+    """Log JSON-RPC brut (hex) → même forme que w3.eth.get_logs"""
+    return {
+        'address': to_checksum_address(raw['address']),
+        'topics': [HexBytes(topic) for topic in raw.get('topics', [])],
+        'data': HexBytes(raw.get('data', '0x')),
+        'blockNumber': int(raw['blockNumber'], 16),
+        'blockHash': HexBytes(raw['blockHash']) if raw.get('blockHash') else None,
+        'transactionHash': HexBytes(raw['transactionHash']) if raw.get('transactionHash') else None,
+        'logIndex': int(raw['logIndex'], 16),
+        'removed': bool(raw.get('removed', False))
+    }
+
+
+async def _call(callback: Optional[Callable], *args):
+    """Appelle un callback synchrone ou asynchrone"""
+    if callback is None:
+        return None
+    result = callback(*args)
+    if asyncio.iscoroutine(result):
+        return await result
+    return result
+
+
+class WebSocketLogListener:
+    """
+    Flux push des logs de création de paires.
+
+    Callbacks:
+        on_connect(): appelé après chaque (re)connexion, avant les notifications (backfill)
+        on_logs(logs): liste de logs normalisés
+        on_head(number, timestamp, block_hash, parent_hash): nouveau bloc
+    """
+
+    def __init__(self, ws_url: str, addresses: List[str], topics: List,
+                 on_logs: Callable, on_head: Callable = None, on_connect: Callable = None,
+                 logger: Optional[logging.Logger] = None,
+                 max_reconnect_delay: float = DEFAULT_MAX_RECONNECT_DELAY, open_timeout: float = 10):
+        self.ws_url = ws_url
+        self.addresses = addresses
+        self.topics = topics
+        self.on_logs = on_logs
+        self.on_head = on_head
+        self.on_connect = on_connect
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+        self.max_reconnect_delay = max_reconnect_delay
+        self.open_timeout = open_timeout
+
+        self.connected = False
+        self.last_message_at = 0.0
+        self.last_head = None  # (numéro, timestamp)
+        self._pending = []
+        self._stopping = False
+
+        self.stats = {'connections': 0, 'disconnections': 0, 'logs': 0, 'heads': 0}
+
+    @property
+    def healthy(self) -> bool:
+        """Connecté et flux vivant (newHeads reçus récemment)"""
+        return self.connected and (time.time() - self.last_message_at) < HEALTHY_SILENCE_SECONDS
+
+    def stop(self):
+        self._stopping = True
+
+    async def _subscribe(self, ws) -> Dict[str, str]:
+        """Crée les souscriptions logs + newHeads, retourne {id souscription: type}"""
+        requests_by_id = {
+            1: ('logs', {'jsonrpc': '2.0', 'id': 1, 'method': 'eth_subscribe',
+                         'params': ['logs', {'address': self.addresses, 'topics': self.topics}]}),
+            2: ('newHeads', {'jsonrpc': '2.0', 'id': 2, 'method': 'eth_subscribe', 'params': ['newHeads']})
+        }
+        for _, request in requests_by_id.values():
+            await ws.send(json.dumps(request))
+
+        subscriptions = {}
+        pending = []  # Notifications arrivées avant les confirmations
+        while len(subscriptions) < len(requests_by_id):
+            message = json.loads(await asyncio.wait_for(ws.recv(), timeout=self.open_timeout))
+            if message.get('id') in requests_by_id:
+                if 'error' in message:
+                    raise ConnectionError(f"eth_subscribe refusé: {message['error']}")
+                subscriptions[message['result']] = requests_by_id[message['id']][0]
+            else:
+                pending.append(message)
+
+        self._pending = pending
+        return subscriptions
+
+    async def _handle(self, message: Dict, subscriptions: Dict[str, str]):
+        if message.get('method') != 'eth_subscription':
+            return
+
+        params = message['params']
+        kind = subscriptions.get(params.get('subscription'))
+        result = params.get('result')
+
+        if kind == 'logs':
+            self.stats['logs'] += 1
+            await _call(self.on_logs, [normalize_log(result)])
+        elif kind == 'newHeads':
+            self.stats['heads'] += 1
+            self.last_head = (int(result['number'], 16), int(result['timestamp'], 16))
+            await _call(self.on_head, *self.last_head, result.get('hash'), result.get('parentHash'))
+
+    async def run(self):
+        """Boucle connexion → souscription → backfill → notifications, avec reconnexion"""
+        delay = 1.0
+
+        while not self._stopping:
+            try:
+                async with websockets.connect(self.ws_url, open_timeout=self.open_timeout,
+                                              max_size=None) as ws:
+                    subscriptions = await self._subscribe(ws)
+                    self.connected = True
+                    self.last_message_at = time.time()
+                    self.stats['connections'] += 1
+                    self.logger.info(f"🔌 WebSocket connecté ({len(subscriptions)} souscriptions)")
+
+                    # Combler le trou depuis la dernière position connue (HTTP) avant de consommer
+                    await _call(self.on_connect)
+                    delay = 1.0
+
+                    for message in self._pending:
+                        await self._handle(message, subscriptions)
+                    self._pending = []
+
+                    async for raw in ws:
+                        self.last_message_at = time.time()
+                        await self._handle(json.loads(raw), subscriptions)
+                        if self._stopping:
+                            break
+
+            except asyncio.CancelledError:
+                self.connected = False
+                raise
+            except Exception as e:
+                self.logger.warning(f"⚠️  WebSocket déconnecté: {str(e)[:120]}")
+
+            if self.connected:
+                self.stats['disconnections'] += 1
+            self.connected = False
+
+            if self._stopping:
+                break
+
+            self.logger.info(f"🔄 Reconnexion WebSocket dans {delay:.0f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
@@ -5,12 +5,18 @@ Détecte les tokens entre 2h et 12h d'âge via les logs blockchain
 Sans dépendance à DexScreener/GeckoTerminal
 """
 
+import sys
+import time
 import logging
+from pathlib import Path
 from typing import List, Dict, Optional
 from web3 import Web3
 from web3.exceptions import BlockNotFound, ContractLogicError
 from eth_utils import to_checksum_address
 
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+from log_fetcher import AdaptiveRangeController
+
 # Configuration RPC et Factories
 RPC_URL = "https://base.llamarpc.com"
 BLOCKS_PER_HOUR = 1800  # Base: ~2s par bloc
@@ -43,6 +49,8 @@ class PairEventWindowScanner:
             logger: Logger optionnel (créé si non fourni)
         """
         self.w3 = Web3(Web3.HTTPProvider(rpc_url))
+        self.rpc_url = rpc_url
+        self.range_controller = AdaptiveRangeController()
         self.logger = logger or self._setup_logger()
 
         # Vérifier la connexion
@@ -176,21 +184,23 @@ class PairEventWindowScanner:
         tokens = []
 
         try:
-            # 🔧 Découper en chunks de 1000 blocs (limite RPC)
-            CHUNK_SIZE = 1000
+            # 🔧 Découper en chunks adaptatifs (taille ajustée selon les limites du RPC)
             block_range = to_block - from_block
+            chunk_size = self.range_controller.size_for(self.rpc_url)
 
-            if block_range > CHUNK_SIZE:
+            if block_range > chunk_size:
                 self.logger.info(
-                    f"📦 {factory_name}: Découpage en chunks de {CHUNK_SIZE} blocs "
+                    f"📦 {factory_name}: Découpage en chunks de ~{chunk_size} blocs "
                     f"({block_range} blocs total)"
                 )
 
             all_logs = []
             current_from = from_block
 
-            while current_from < to_block:
-                current_to = min(current_from + CHUNK_SIZE, to_block)
+            while current_from <= to_block:
+                chunk_size = self.range_controller.size_for(self.rpc_url)
+                current_to = min(current_from + chunk_size - 1, to_block)
+                started = time.time()
 
                 try:
                     chunk_logs = self.w3.eth.get_logs({
@@ -200,6 +210,9 @@ class PairEventWindowScanner:
                         'topics': [PAIR_CREATED_EVENT_SIGNATURE]
                     })
 
+                    self.range_controller.on_success(
+                        self.rpc_url, current_to - current_from + 1, time.time() - started
+                    )
                     all_logs.extend(chunk_logs)
 
                     if chunk_logs:
@@ -208,6 +221,12 @@ class PairEventWindowScanner:
                         )
 
                 except Exception as e:
+                    if AdaptiveRangeController.is_range_error(e) and \
+                            current_to - current_from + 1 > self.range_controller.min_size:
+                        # Plage trop large: réduire et réessayer le même départ
+                        self.range_controller.on_range_error(self.rpc_url, current_to - current_from + 1)
+                        continue
+
                     self.logger.warning(
                         f"⚠️ Erreur chunk {current_from}-{current_to}: {e}"
                     )
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test bar_store.py - barres OHLCV 1 minute par paire en anneau numpy
+Regroupement par minute, recouvrement de l'anneau, remise à zéro après un trou
+d'historique, éviction des paires non suivies et réorganisation.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from bar_store import BarStore
+
+PAIR = "0x" + "22" * 20
+OTHER = "0x" + "33" * 20
+
+T0 = 1_700_000_000 // 60 * 60  # Début de minute
+
+
+def swaps(*rows):
+    """(seconde, volume, base, token, achat) → colonnes BarStore.append"""
+    timestamps, volumes, base, token, buys = zip(*rows)
+    return dict(timestamps=timestamps, volumes=volumes, base_amounts=base, token_amounts=token, is_buy=buys)
+
+
+def test_minute_bucketing_ohlc_and_window():
+    store = BarStore(minutes=10, max_pairs=5)
+    store.append(PAIR, synced_block=100, **swaps(
+        (T0 + 1, 1.0, 1.0, 100.0, True),  # Prix 0.01
+        (T0 + 30, 2.0, 2.0, 100.0, True),  # 0.02
+        (T0 + 59, 1.0, 1.5, 100.0, False),  # 0.015
+        (T0 + 61, 3.0, 3.0, 100.0, True),  # Minute suivante, 0.03
+    ))
+
+    bars = store.get(PAIR)
+    slot = (T0 // 60) % 10
+    assert (bars.open[slot], bars.high[slot], bars.low[slot], bars.close[slot]) == (0.01, 0.02, 0.01, 0.015)
+    assert bars.volume[slot] == 4.0 and bars.buys[slot] == 2 and bars.sells[slot] == 1
+
+    window = store.window(PAIR, T0 + 61, minutes=2)
+    assert window['bars'] == 2 and window['volume'] == 7.0
+    assert window['vwap'] == 7.5 / 400
+    assert (window['buys'], window['sells']) == (3, 1)
+    assert store.synced_block(PAIR) == 100
+
+    # Lot suivant dans la même minute: OHLC prolongé, pas remis à zéro
+    store.append(PAIR, synced_block=101, **swaps((T0 + 62, 1.0, 5.0, 100.0, True)))
+    slot = (T0 // 60 + 1) % 10
+    assert (bars.open[slot], bars.high[slot], bars.close[slot]) == (0.03, 0.05, 0.05)
+
+
+def test_ring_wrap_around_overwrites_old_minutes():
+    store = BarStore(minutes=10, max_pairs=5)
+    store.append(PAIR, synced_block=1, **swaps((T0, 1.0, 1.0, 1.0, True)))
+    # 10 minutes plus tard: même emplacement, ancienne barre écrasée
+    store.append(PAIR, synced_block=2, **swaps((T0 + 600, 2.0, 2.0, 1.0, True)))
+
+    bars = store.get(PAIR)
+    slot = (T0 // 60) % 10
+    assert bars.minutes[slot] == T0 // 60 + 10
+    assert bars.volume[slot] == 2.0 and bars.open[slot] == 2.0
+    assert store.window(PAIR, T0 + 600, minutes=20)['volume'] == 2.0
+
+    # Swap plus vieux que l'anneau: ignoré
+    store.append(PAIR, synced_block=3, **swaps((T0 - 60, 9.0, 9.0, 1.0, True)))
+    assert store.window(PAIR, T0 + 600, minutes=20)['volume'] == 2.0
+
+
+def test_gap_reset_and_pair_eviction():
+    store = BarStore(minutes=10, max_pairs=2)
+    store.append(PAIR, synced_block=10, **swaps((T0, 1.0, 1.0, 1.0, True)))
+
+    # Historique trop ancien: anneau repris de zéro
+    store.append(PAIR, synced_block=50, reset=True, **swaps((T0 + 120, 2.0, 2.0, 1.0, True)))
+    assert store.window(PAIR, T0 + 120, minutes=5)['volume'] == 2.0
+    assert store.window(PAIR, T0 + 120, minutes=5)['bars'] == 1
+
+    # Lot sans swap: le bloc synchronisé avance quand même
+    store.append(PAIR, synced_block=60, timestamps=[], volumes=[], base_amounts=[], token_amounts=[], is_buy=[])
+    assert store.synced_block(PAIR) == 60
+
+    # Paires sorties de l'ensemble suivi évincées; LRU au-delà de max_pairs
+    store.append(OTHER, synced_block=60, **swaps((T0, 1.0, 1.0, 1.0, True)))
+    store.retain([OTHER])
+    assert store.get(PAIR) is None and store.get(OTHER) is not None
+
+    store.append(PAIR, synced_block=61, **swaps((T0, 1.0, 1.0, 1.0, True)))
+    store.append("0x" + "44" * 20, synced_block=61, **swaps((T0, 1.0, 1.0, 1.0, True)))
+    assert store.get(OTHER) is None and store.get_stats()['pairs'] == 2
+
+
+def test_forget_from_drops_pairs_synced_past_reorg():
+    store = BarStore(minutes=10, max_pairs=5)
+    store.append(PAIR, synced_block=100, **swaps((T0, 1.0, 1.0, 1.0, True)))
+    store.append(OTHER, synced_block=90, **swaps((T0, 1.0, 1.0, 1.0, True)))
+
+    store.forget_from(95)
+    assert store.synced_block(PAIR) is None  # Relue entièrement au prochain passage
+    assert store.synced_block(OTHER) == 90
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test block_time_index.py - conversions bloc ↔ timestamp
+Chaîne simulée dont la cadence change (2s puis 1s par bloc): l'approximation
+BLOCKS_PER_HOUR se tromperait, l'index interpolé doit rester exact aux échantillons.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from block_time_index import BlockTimeIndex
+
+GENESIS = 1_700_000_000
+CADENCE_CHANGE = 50_000
+HEAD = 100_000
+
+
+def block_timestamp(number):
+    if number <= CADENCE_CHANGE:
+        return GENESIS + number * 2
+    return GENESIS + CADENCE_CHANGE * 2 + (number - CADENCE_CHANGE)
+
+
+class FakeEth:
+    def __init__(self):
+        self.requested = []
+
+    def get_block(self, identifier):
+        number = HEAD if identifier == 'latest' else identifier
+        self.requested.append(number)
+        return {'number': number, 'timestamp': block_timestamp(number)}
+
+
+class FakeProvider:
+    """Provider JSON-RPC minimal (réponses brutes en hex)"""
+
+    def __init__(self, eth):
+        self.eth = eth
+
+    def make_request(self, method, params):
+        assert method == 'eth_getBlockByNumber'
+        block = self.eth.get_block(int(params[0], 16))
+        return {'result': {'number': hex(block['number']), 'timestamp': hex(block['timestamp'])}}
+
+
+class FakeW3:
+    def __init__(self):
+        self.eth = FakeEth()
+        self.provider = FakeProvider(self.eth)
+
+
+def test_conversions_follow_real_cadence():
+    index = BlockTimeIndex(FakeW3(), sample_interval=1000)
+    head_block, head_timestamp = index.observe_head()
+    assert head_block == HEAD
+
+    # 12h en arrière: l'approximation 1800 blocs/h donnerait 78400
+    from_block = index.block_at(head_timestamp - 12 * 3600)
+    assert from_block == 56_800
+    assert index.timestamp_of(from_block) == head_timestamp - 12 * 3600
+
+    # Dans la zone à 2s/bloc
+    assert index.timestamp_of(20_500) == block_timestamp(20_500)
+    assert index.block_at(block_timestamp(20_500)) == 20_500
+
+
+def test_lazy_fill_is_reused():
+    w3 = FakeW3()
+    index = BlockTimeIndex(w3, sample_interval=1000)
+    head_block, head_timestamp = index.observe_head()
+
+    index.block_range_for_last(3600, head=(head_block, head_timestamp))
+    first_pass = len(w3.eth.requested)
+
+    index.block_range_for_last(1800, head=(head_block, head_timestamp))
+    assert len(w3.eth.requested) == first_pass
+
+
+def test_pushed_heads_keep_window_samples():
+    """Une tête par bloc (mode push) ne doit ni densifier l'index ni évincer la fenêtre 2-12h"""
+    w3 = FakeW3()
+    index = BlockTimeIndex(w3, sample_interval=900, max_samples=50)
+    head_block, head_timestamp = index.observe_head()
+    index.block_at(head_timestamp - 12 * 3600)
+
+    for number in range(HEAD + 1, HEAD + 5401):
+        index.record(number, block_timestamp(number))
+    assert len(index.blocks) <= 50
+
+    fetched = len(w3.eth.requested)
+    head_timestamp = block_timestamp(HEAD + 5400)
+    index.block_at(head_timestamp - 12 * 3600)
+    for block in range(HEAD - 20_000, HEAD, 1000):
+        index.timestamp_of(block)
+    assert len(w3.eth.requested) == fetched
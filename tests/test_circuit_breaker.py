@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test circuit_breaker.py - ouverture sur échecs, échec immédiat, reprise
+Sonde de fond qui referme le circuit, ou essai semi-ouvert sur trafic réel.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from circuit_breaker import CircuitBreaker, CircuitOpenError, CLOSED, OPEN, get_circuit_breaker
+
+
+class Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+def down():
+    raise TimeoutError("read timeout")
+
+
+def test_opens_fails_fast_and_probe_recovers():
+    probes = []
+
+    def probe():
+        probes.append(time.time())
+        return Response(503 if len(probes) == 1 else 200)
+
+    breaker = CircuitBreaker('dex', probe=probe, consecutive_failures=3, open_seconds=0.05)
+
+    assert breaker.call(Response, 404).status_code == 404  # 4xx métier: pas une panne
+    for _ in range(2):
+        with pytest.raises(TimeoutError):
+            breaker.call(down)
+    assert breaker.call(Response, 503).status_code == 503
+    assert breaker.state == OPEN and breaker.is_open()
+
+    with pytest.raises(CircuitOpenError):
+        breaker.call(Response, 200)
+
+    # Première sonde en échec (ouverture doublée), seconde sonde OK
+    deadline = time.time() + 2
+    while breaker.state != CLOSED and time.time() < deadline:
+        time.sleep(0.01)
+    assert len(probes) == 2
+    assert breaker.call(Response, 200).status_code == 200
+
+    stats = breaker.get_stats()
+    assert stats['opened'] == 1 and stats['rejected'] == 1 and stats['probes'] == 2
+    assert stats['state'] == CLOSED and stats['error_rate'] == 0.0
+
+
+def test_half_open_on_real_call_and_error_rate():
+    breaker = CircuitBreaker('scan', error_rate=0.5, min_calls=4, consecutive_failures=10, open_seconds=0.05)
+
+    for status in (200, 500, 200, 500):
+        breaker.call(Response, status)
+    assert breaker.state == OPEN
+    assert breaker.get_stats()['error_rate'] == 0.5
+
+    time.sleep(0.06)
+    assert not breaker.is_open()
+    # Essai semi-ouvert raté: ouverture doublée
+    with pytest.raises(TimeoutError):
+        breaker.call(down)
+    assert breaker.state == OPEN and breaker.cooldown == 0.1
+
+    time.sleep(0.11)
+    assert breaker.call(Response, 200).status_code == 200
+    assert breaker.state == CLOSED
+
+
+def test_probe_attached_to_open_breaker_is_scheduled():
+    breaker = get_circuit_breaker('late-probe')
+    breaker.open_seconds = breaker.cooldown = 0.05
+    for _ in range(breaker.consecutive_failures):
+        with pytest.raises(TimeoutError):
+            breaker.call(down)
+    assert breaker.state == OPEN
+
+    # Client créé après l'ouverture avec une sonde: elle doit refermer le circuit
+    assert get_circuit_breaker('late-probe', probe=lambda: Response(200)) is breaker
+    deadline = time.time() + 2
+    while breaker.is_open() and time.time() < deadline:
+        time.sleep(0.01)
+    assert breaker.state == CLOSED and breaker.stats['probes'] == 1
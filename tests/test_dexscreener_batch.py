@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test get_tokens_info - enrichissement DexScreener par lots d'adresses
+200 tokens = 7 requêtes, paires redistribuées à chaque token demandé.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from api_fallbacks import DexScreenerFreeAPI
+from market_cache import MarketCache
+from rate_limiter import RateLimiter
+from web3_utils import DexScreenerAPI
+
+WETH = "0x4200000000000000000000000000000000000006"
+
+
+def pair(token, liquidity, chain='base', as_quote=False):
+    base, quote = ({'address': WETH}, {'address': token}) if as_quote else ({'address': token}, {'address': WETH})
+    return {'chainId': chain, 'baseToken': base, 'quoteToken': quote, 'pairAddress': f'pool-{token}-{liquidity}',
+            'liquidity': {'usd': liquidity}, 'priceUsd': '1.5', 'volume': {'h1': 10}, 'priceChange': {}}
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+
+class FakeSession:
+    def __init__(self):
+        self.urls = []
+
+    def get(self, url, timeout=10):
+        self.urls.append(url)
+        addresses = url.rsplit('/', 1)[1].split(',')
+        pairs = []
+        for index, address in enumerate(addresses):
+            if index % 10 == 9:
+                continue  # Token non listé
+            checksum = address.upper().replace('0X', '0x')  # DexScreener renvoie des adresses en casse mixte
+            pairs += [pair(checksum, 1000), pair(checksum, 5000, as_quote=index % 2 == 0), pair(checksum, 9000, chain='ethereum')]
+        return FakeResponse({'pairs': pairs})
+
+
+def test_batches_of_thirty_fan_out_per_token(tmp_path):
+    tokens = ['0x' + f'{i:040x}' for i in range(200)]
+
+    for client in (DexScreenerFreeAPI(), DexScreenerAPI()):
+        client.cache = MarketCache(tmp_path / f'{type(client).__name__}.db')
+        client.limiter = RateLimiter(tmp_path / 'limits.db', {'dexscreener': (6000, 100)})
+        client.session = FakeSession()
+        infos = client.get_tokens_info(tokens + tokens[:5])  # Doublons ignorés
+
+        assert len(client.session.urls) == 7
+        assert set(infos) == set(tokens)
+        assert infos[tokens[9]] is None
+        assert infos[tokens[0]]['pair_address'] == f"pool-{tokens[0].upper().replace('0X', '0x')}-5000"
+
+        # Réponses (même vides) servies par le cache partagé tant qu'elles sont fraîches
+        client.session = FakeSession()
+        assert client.get_token_info(tokens[1].upper().replace('0X', '0x'))['price_usd'] == 1.5
+        assert client.get_tokens_info(tokens)[tokens[9]] is None
+        assert len(client.session.urls) == 0
+
+        client.cache = None
+        assert client.get_token_info(tokens[1])['price_usd'] == 1.5
+        assert len(client.session.urls) == 1
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test eth_price_oracle.py - prix ETH/USD suivi par les événements Sync
+Lecture initiale des réserves, puis seuls les Sync des nouveaux blocs;
+les lectures de prix ne touchent pas le réseau et exposent leur âge.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from hexbytes import HexBytes
+from eth_price_oracle import EthPriceOracle, SYNC_TOPICS, WETH, USDC
+
+POOL = "0x" + "cd" * 20
+
+
+def reserves(eth_price, weth=1000):
+    return weth * 10**18, int(weth * eth_price * 10**6)
+
+
+def sync_log(block, log_index, eth_price):
+    reserve0, reserve1 = reserves(eth_price)
+    return {'blockNumber': block, 'logIndex': log_index, 'topics': [HexBytes(SYNC_TOPICS[1])],
+            'data': HexBytes(reserve0.to_bytes(32, 'big') + reserve1.to_bytes(32, 'big'))}
+
+
+class FakeCall:
+    def __init__(self, eth, value):
+        self.eth, self.value = eth, value
+
+    def call(self, block_identifier='latest'):
+        self.eth.calls += 1
+        return self.value
+
+
+class FakeFunctions:
+    def __init__(self, eth):
+        self.eth = eth
+
+    def getReserves(self):
+        return FakeCall(self.eth, (*reserves(2500), 0))
+
+
+class FakeEth:
+    def __init__(self):
+        self.calls = 0
+        self.logs = []
+        self.ranges = []
+
+    def contract(self, address, abi):
+        contract = type('Contract', (), {})()
+        contract.functions = FakeFunctions(self)
+        return contract
+
+    def get_logs(self, params):
+        self.calls += 1
+        self.ranges.append((params['fromBlock'], params['toBlock']))
+        return [log for log in self.logs if params['fromBlock'] <= log['blockNumber'] <= params['toBlock']]
+
+
+class FakeHeadTracker:
+    def __init__(self):
+        self.head = (100, int(time.time()))
+
+    def add_reorg_listener(self, listener):
+        self.listener = listener
+
+    def update(self):
+        return self.head
+
+
+class FakeCache:
+    def get_pair(self, address):
+        return {'token0': WETH.lower(), 'token1': USDC.lower()}
+
+
+def test_sync_events_update_price_without_lookup_cost():
+    eth = FakeEth()
+    w3 = type('W3', (), {'eth': eth})()
+    tracker = FakeHeadTracker()
+    oracle = EthPriceOracle(w3, pool_address=POOL, head_tracker=tracker, metadata_cache=FakeCache())
+
+    assert oracle.get_price() is None and oracle.get_quote()['stale']  # Aucun prix: None, pas 0.0
+
+    oracle.refresh()  # Lecture initiale des réserves
+    assert oracle.get_price() == 2500.0
+
+    eth.logs = [sync_log(103, 0, 2600), sync_log(103, 4, 2650), sync_log(99, 0, 1)]
+    tracker.head = (105, int(time.time()))
+    oracle.refresh()
+    assert eth.ranges == [(101, 105)]
+    assert oracle.get_price() == 2650.0  # Dernier Sync de la plage
+
+    calls = eth.calls
+    for _ in range(1000):
+        oracle.get_price()
+    quote = oracle.get_quote()
+    assert eth.calls == calls
+    assert quote['block'] == 105 and not quote['stale']
+
+    # Réorganisation sous le dernier bloc: réserves relues directement
+    tracker.listener(104)
+    oracle.refresh()
+    assert eth.ranges == [(101, 105)]
+    assert oracle.get_price() == 2500.0
+
+    tracker.head = (106, int(time.time()) - 120)
+    oracle.refresh()
+    assert oracle.get_quote()['stale']
+
+
+def test_start_waits_for_first_price():
+    eth = FakeEth()
+    w3 = type('W3', (), {'eth': eth})()
+    tracker = FakeHeadTracker()
+    failures = []
+
+    def flaky_update():
+        if len(failures) < 2:  # RPC indisponible aux deux premiers essais
+            failures.append(1)
+            raise ConnectionError("RPC down")
+        return tracker.head
+
+    tracker.update = flaky_update
+    oracle = EthPriceOracle(w3, pool_address=POOL, head_tracker=tracker, metadata_cache=FakeCache(),
+                            refresh_seconds=60, start_timeout=5)
+    oracle.start()
+    oracle.stop()
+    assert oracle.get_price() == 2500.0  # start() rend la main avec un prix
+    assert oracle.stats['errors'] == 2
+
+    # Délai dépassé: start() rend la main sans prix, None plutôt que 0.0
+    tracker.update = lambda: (_ for _ in ()).throw(ConnectionError("RPC down"))
+    oracle = EthPriceOracle(w3, pool_address=POOL, head_tracker=tracker, metadata_cache=FakeCache(),
+                            refresh_seconds=60, start_timeout=0)
+    oracle.start()
+    oracle.stop()
+    assert oracle.get_price() is None
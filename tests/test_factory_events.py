@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test factory_events.py - décodage rapide en masse des logs de création
+Le chemin octets bruts doit donner les mêmes paires que les décodeurs par factory,
+sans aucune conversion hex ni checksum par log sur un backfill de 100k logs
+(bien sous la seconde; borne large pour les machines chargées).
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from hexbytes import HexBytes
+import factory_events
+from factory_events import (
+    FactoryEventRouter, address_bytes, checksum,
+    AERODROME_FACTORY, BASESWAP_FACTORY, UNISWAP_V3_FACTORY,
+    PAIR_CREATED_EVENT_SIGNATURE, AERODROME_POOL_CREATED_SIGNATURE, V3_POOL_CREATED_SIGNATURE
+)
+
+WETH = "0x4200000000000000000000000000000000000006"
+BASE_TOKENS = frozenset({address_bytes(WETH)})
+
+
+def word(address: str) -> bytes:
+    return bytes(12) + address_bytes(address)
+
+
+def creation_log(factory, topic, token0, token1, pair, block, pair_word=0):
+    data = [bytes(32), bytes(32)]
+    data[pair_word] = word(pair)
+    topics = [HexBytes(topic), HexBytes(word(token0)), HexBytes(word(token1))]
+    if factory != BASESWAP_FACTORY:
+        topics.append(HexBytes(bytes(32)))  # stable / fee indexé
+    return {
+        'address': factory,
+        'topics': topics,
+        'data': HexBytes(b''.join(data)),
+        'blockNumber': block
+    }
+
+
+def sample_logs():
+    return [
+        creation_log(BASESWAP_FACTORY, PAIR_CREATED_EVENT_SIGNATURE,
+                     "0x1111111111111111111111111111111111111111", WETH,
+                     "0xaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa", 10),
+        creation_log(AERODROME_FACTORY, AERODROME_POOL_CREATED_SIGNATURE,
+                     WETH, "0x5555555555555555555555555555555555555555",
+                     "0xbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbb", 11),
+        creation_log(UNISWAP_V3_FACTORY, V3_POOL_CREATED_SIGNATURE,
+                     "0x3333333333333333333333333333333333333333", WETH,
+                     "0xcccccccccccccccccccccccccccccccccccccccc", 12, pair_word=1),
+        # Paire sans base token: ignorée
+        creation_log(BASESWAP_FACTORY, PAIR_CREATED_EVENT_SIGNATURE,
+                     "0x1111111111111111111111111111111111111111",
+                     "0x2222222222222222222222222222222222222222",
+                     "0xdddddddddddddddddddddddddddddddddddddddd", 13),
+        # Factory inconnue: ignorée
+        creation_log("0x9999999999999999999999999999999999999999", PAIR_CREATED_EVENT_SIGNATURE,
+                     "0x1111111111111111111111111111111111111111", WETH,
+                     "0xeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeee", 14)
+    ]
+
+
+def test_bulk_decode_matches_per_factory_decoders():
+    router = FactoryEventRouter()
+    logs = sample_logs()
+
+    decoded = router.decode_many(logs, BASE_TOKENS)
+    assert [event[6] for event in decoded] == [10, 11, 12]
+
+    for event, log in zip(decoded, logs):
+        token, base_token, pair, token0, token1, entry, _ = event
+        reference = router.decode(log)
+
+        assert checksum(pair) == reference['pair_address']
+        assert checksum(token0) == reference['token0']
+        assert checksum(token1) == reference['token1']
+        assert entry['name'] == reference['factory_name']
+        assert checksum(base_token) == WETH
+        assert token != base_token
+
+
+def test_bulk_decode_skips_per_log_conversions(monkeypatch):
+    router = FactoryEventRouter()
+    logs = sample_logs() * 20_000  # 100k logs
+
+    conversions = []
+    for name in ('to_checksum_address', '_hex', '_normalize_topic'):
+        original = getattr(factory_events, name)
+        monkeypatch.setattr(factory_events, name,
+                            lambda *args, _name=name, _original=original: conversions.append(_name) or _original(*args))
+    monkeypatch.setattr(router, 'decode', lambda log: conversions.append('decode'))
+
+    started = time.perf_counter()
+    decoded = router.decode_many(logs, BASE_TOKENS)
+    elapsed = time.perf_counter() - started
+
+    assert len(decoded) == 60_000
+    assert elapsed < 3.0  # Objectif < 1s; marge pour runners chargés
+    # Chemin octets bruts: aucune conversion par log, coût constant quel que soit le volume
+    assert len(conversions) <= len(router.registry) * 2
+    assert all(isinstance(event[2], bytes) and len(event[2]) == 20 for event in decoded[:3])
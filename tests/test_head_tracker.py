@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test head_tracker.py - détection des réorganisations par filiation des hash
+Chaîne simulée dont les derniers blocs sont remplacés par une branche concurrente.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from head_tracker import HeadTracker
+
+
+def block_hash(number, branch):
+    return '0x' + f'{branch}{number:x}'.rjust(64, '0')
+
+
+class FakeChain:
+    """Blocs canoniques: branche 'a' jusqu'à fork_at, branche 'b' ensuite"""
+
+    def __init__(self, head):
+        self.head = head
+        self.fork_at = None
+        self.rpc_blocks = 0
+
+    def hash_of(self, number):
+        return block_hash(number, 'b' if self.fork_at is not None and number >= self.fork_at else 'a')
+
+    def block(self, number):
+        return {
+            'number': number,
+            'hash': self.hash_of(number),
+            'parentHash': self.hash_of(number - 1),
+            'timestamp': 1_700_000_000 + 2 * number
+        }
+
+
+class FakeEth:
+    def __init__(self, chain):
+        self.chain = chain
+
+    def get_block(self, identifier):
+        return self.chain.block(self.chain.head if identifier == 'latest' else identifier)
+
+
+class FakeProvider:
+    def __init__(self, chain):
+        self.chain = chain
+
+    def make_request(self, method, params):
+        self.chain.rpc_blocks += 1
+        block = self.chain.block(int(params[0], 16))
+        return {'result': {'number': hex(block['number']), 'hash': block['hash']}}
+
+
+class FakeW3:
+    def __init__(self, chain):
+        self.eth = FakeEth(chain)
+        self.provider = FakeProvider(chain)
+
+
+def test_reorg_rolls_back_from_fork_block():
+    chain = FakeChain(head=100)
+    tracker = HeadTracker(FakeW3(chain), confirmations=5)
+    forks = []
+    tracker.add_reorg_listener(forks.append)
+
+    for head in range(100, 109):
+        chain.head = head
+        tracker.update()
+    assert chain.rpc_blocks == 0  # Filiation vérifiée localement bloc à bloc
+    assert tracker.confirmed_block() == 103
+
+    # Branche concurrente à partir du bloc 106, tête vue directement en 111
+    chain.fork_at = 106
+    chain.head = 111
+    assert tracker.update() == (111, chain.block(111)['timestamp'])
+
+    assert forks == [106]
+    assert all(number < 106 or number == 111 for number in tracker.blocks)
+    assert tracker.stats['reorgs'] == 1
+
+
+def test_gap_and_lagging_head_are_not_reorgs():
+    chain = FakeChain(head=100)
+    tracker = HeadTracker(FakeW3(chain), confirmations=5)
+    forks = []
+    tracker.add_reorg_listener(forks.append)
+
+    tracker.update()
+    chain.head = 130  # Polling: 30 blocs d'un coup, un seul contrôle RPC
+    tracker.update()
+    assert chain.rpc_blocks == 1
+
+    chain.head = 120  # RPC de secours en retard
+    tracker.update()
+
+    assert forks == []
+    assert tracker.head[0] == 130
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Test log_fetcher.py - découpage adaptatif des plages get_logs
+Simule un RPC qui refuse les plages trop larges ("query returned more than N results")
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+import pytest
+
+from log_fetcher import AdaptiveRangeController, ParallelLogFetcher, MIN_CHUNK_SIZE
+
+
+class LimitedEth:
+    """RPC simulé: refuse les plages de plus de max_range blocs"""
+
+    def __init__(self, logs, max_range):
+        self.logs = logs
+        self.max_range = max_range
+        self.calls = []
+
+    def get_logs(self, params):
+        self.calls.append((params['fromBlock'], params['toBlock']))
+        if params['toBlock'] - params['fromBlock'] + 1 > self.max_range:
+            raise ValueError({'code': -32005, 'message': 'query returned more than 10000 results'})
+        return [log for log in self.logs if params['fromBlock'] <= log['blockNumber'] <= params['toBlock']]
+
+
+class FakeW3:
+    def __init__(self, eth):
+        self.eth = eth
+
+
+def make_fetcher(eths, chunk_size=1000):
+    fetcher = ParallelLogFetcher(['http://localhost:8545'], concurrency=4, chunk_size=chunk_size)
+    fetcher.endpoints = [{'url': f'rpc{i}', 'w3': FakeW3(eth)} for i, eth in enumerate(eths)]
+    return fetcher
+
+
+def test_range_split_on_result_limit():
+    """Une plage refusée est coupée en deux jusqu'à passer, sans perte de logs"""
+    logs = [{'blockNumber': block, 'logIndex': 0} for block in range(0, 5000, 50)]
+    eth = LimitedEth(logs, max_range=300)
+    fetcher = make_fetcher([eth])
+
+    result, synced_to = fetcher.fetch_logs('0x0', [], 0, 4999)
+
+    assert synced_to == 4999
+    assert [log['blockNumber'] for log in result] == list(range(0, 5000, 50))
+    assert fetcher.stats['splits'] > 0
+    # La meilleure taille mémorisée pour ce RPC respecte sa limite
+    assert 0 < fetcher.range_controller.get_best_sizes()['rpc0'] <= 300
+    assert fetcher.range_controller.size_for('rpc0') < 1000
+    fetcher.close()
+
+
+def test_sizes_are_per_endpoint():
+    """Chaque RPC garde sa propre taille de plage"""
+    controller = AdaptiveRangeController(initial_size=1000)
+
+    controller.on_range_error('strict', 1000)
+    controller.on_success('fast', 1000, latency=0.1)
+
+    assert controller.size_for('strict') == 500
+    assert controller.size_for('fast') == 1500
+    assert controller.get_best_sizes() == {'fast': 1000}
+
+
+def test_growth_capped_by_failed_size():
+    """Après un échec, la croissance ne repasse jamais la taille refusée"""
+    controller = AdaptiveRangeController(initial_size=1000)
+
+    controller.on_range_error('rpc', 1000)
+    for _ in range(5):
+        controller.on_success('rpc', controller.size_for('rpc'), latency=0.1)
+
+    assert controller.size_for('rpc') < 1000
+
+
+def test_ceiling_decays_after_successes():
+    """Un plafond issu d'échecs passagers est relevé après une série de succès"""
+    controller = AdaptiveRangeController(initial_size=1000, ceiling_decay=5)
+
+    controller.on_range_error('rpc', 1000)
+    for _ in range(20):
+        controller.on_success('rpc', controller.size_for('rpc'), latency=0.1)
+
+    assert controller.size_for('rpc') > 1000
+
+
+class TimeoutEth(LimitedEth):
+    """RPC simulé qui expire sur toutes les requêtes"""
+
+    def get_logs(self, params):
+        self.calls.append((params['fromBlock'], params['toBlock']))
+        raise TimeoutError('Read timed out')
+
+
+def test_timeout_fails_over_then_gives_up_without_splitting():
+    """Un RPC en timeout bascule sur l'autre sans découpe; tous en timeout: plage en échec, pas découpée"""
+    logs = [{'blockNumber': block, 'logIndex': 0} for block in range(0, 1000, 10)]
+    dead, healthy = TimeoutEth([], 0), LimitedEth(logs, max_range=10000)
+    fetcher = make_fetcher([dead, healthy])
+
+    result, synced_to = fetcher.fetch_logs('0x0', [], 0, 999)
+    assert synced_to == 999 and len(result) == 100
+    assert fetcher.stats['splits'] == 0
+
+    dead = [TimeoutEth([], 0), TimeoutEth([], 0)]
+    fetcher = make_fetcher(dead, chunk_size=1000)
+    result, synced_to = fetcher.fetch_logs('0x0', [], 0, 999)
+    assert result == [] and synced_to == -1
+    assert fetcher.stats['splits'] == 0
+    assert [call for eth in dead for call in eth.calls] == [(0, 999), (0, 999)]  # Un tour de bascule
+    fetcher.close()
+
+
+class RefusingEth(LimitedEth):
+    """RPC qui refuse toute plage touchant un bloc donné, même à la taille minimale"""
+
+    def __init__(self, logs, bad_block):
+        super().__init__(logs, max_range=10**9)
+        self.bad_block = bad_block
+
+    def get_logs(self, params):
+        if params['fromBlock'] <= self.bad_block <= params['toBlock']:
+            self.calls.append((params['fromBlock'], params['toBlock']))
+            raise ValueError({'code': -32005, 'message': 'query returned more than 10000 results'})
+        return super().get_logs(params)
+
+
+def test_min_range_refused_everywhere_keeps_logs_before_gap():
+    """Plage minimale refusée par tous les RPC: logs précédant le trou rendus, pas d'exception"""
+    logs = [{'blockNumber': block, 'logIndex': 0} for block in range(0, 1000, 10)]
+    eths = [RefusingEth(logs, 505), RefusingEth(logs, 505)]
+    fetcher = make_fetcher(eths, chunk_size=100)
+
+    result, synced_to = fetcher.fetch_logs('0x0', [], 0, 999)
+    assert 505 - 2 * MIN_CHUNK_SIZE < synced_to < 505  # Curseur avancé jusqu'au trou
+    assert [log['blockNumber'] for log in result] == list(range(0, synced_to + 1, 10))
+    assert min(to - start + 1 for eth in eths for start, to in eth.calls) >= MIN_CHUNK_SIZE
+    fetcher.close()
+
+
+def test_error_classification():
+    assert AdaptiveRangeController.is_range_error(ValueError('query returned more than 10000 results'))
+    assert not AdaptiveRangeController.is_range_error(TimeoutError('Read timed out'))
+    assert AdaptiveRangeController.is_timeout(TimeoutError('Read timed out'))
+    assert not AdaptiveRangeController.is_range_error(ValueError('503 Service Unavailable'))
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Test market_cache.py - TTL par champ et stale-while-revalidate
+Valeur récente servie sans HTTP, valeur périmée servie puis rafraîchie en fond,
+base partagée entre instances (process Filter et Trader).
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from market_cache import MarketCache
+
+
+class Fetcher:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, addresses):
+        self.calls.append(list(addresses))
+        return {address: {'n': len(self.calls)} for address in addresses if address != '0xdead'}
+
+
+def age(cache, seconds):
+    conn = cache._connect()
+    with conn:
+        conn.execute("UPDATE market_data SET fetched_at = fetched_at - ?", (seconds,))
+    conn.close()
+
+
+def test_miss_fresh_stale_and_shared(tmp_path):
+    db_path = tmp_path / 'market.db'
+    cache = MarketCache(db_path)
+    fetch = Fetcher()
+
+    # Absents: lecture groupée synchrone, tokens sans réponse non mis en cache
+    assert cache.get_many('dex', ['0xAA', '0xbb', '0xdead'], fetch) == {'0xaa': {'n': 1}, '0xbb': {'n': 1}, '0xdead': None}
+    assert fetch.calls == [['0xaa', '0xbb', '0xdead']]
+
+    # Autre process: même base, aucune requête
+    other = MarketCache(db_path)
+    assert other.get_many('dex', ['0xaa'], fetch, fields=('price',)) == {'0xaa': {'n': 1}}
+    assert len(fetch.calls) == 1
+
+    # Prix périmé (TTL 3s + 10s tolérées): servi tout de suite, rafraîchi en fond
+    age(cache, 5)
+    assert cache.get_many('dex', ['0xaa'], fetch, fields=('price',)) == {'0xaa': {'n': 1}}
+    # ...mais encore frais pour un appelant qui ne lit que la liquidité
+    assert cache.get_many('dex', ['0xbb'], fetch, fields=('liquidity',)) == {'0xbb': {'n': 1}}
+
+    deadline = time.time() + 2
+    while cache.get_stats()['revalidating'] and time.time() < deadline:
+        time.sleep(0.01)
+    assert fetch.calls[1] == ['0xaa']
+    assert other.get_many('dex', ['0xaa'], fetch, fields=('price',)) == {'0xaa': {'n': 2}}
+
+    # Au-delà de la péremption tolérée: lecture synchrone
+    age(cache, 60)
+    assert cache.get_many('dex', ['0xaa'], fetch, fields=('price',)) == {'0xaa': {'n': 3}}
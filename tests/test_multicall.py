@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test multicall.py - résolution des métadonnées ERC20 en aggregate3
+Simule le contrat Multicall3 (décodage du payload, réponses par appel)
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from eth_abi import encode, decode
+from multicall import (
+    TokenMetadataResolver, AGGREGATE3_SELECTOR, NAME_SELECTOR, SYMBOL_SELECTOR,
+    DECIMALS_SELECTOR, TOTAL_SUPPLY_SELECTOR
+)
+
+STANDARD = "0x1111111111111111111111111111111111111111"
+BYTES32 = "0x2222222222222222222222222222222222222222"
+NOT_A_TOKEN = "0x3333333333333333333333333333333333333333"
+
+
+class FakeMulticallEth:
+    """Répond à aggregate3 à partir d'une table (adresse, sélecteur) -> retour"""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.calls = 0
+
+    def call(self, tx, block_identifier='latest'):
+        self.calls += 1
+        assert tx['data'][:4] == AGGREGATE3_SELECTOR
+        calls = decode(['(address,bool,bytes)[]'], tx['data'][4:])[0]
+
+        results = []
+        for target, _allow_failure, data in calls:
+            key = (target.lower(), bytes(data))
+            if key in self.responses:
+                results.append((True, self.responses[key]))
+            else:
+                results.append((False, b''))
+        return encode(['(bool,bytes)[]'], [results])
+
+
+class FakeW3:
+    def __init__(self, eth):
+        self.eth = eth
+
+
+def test_resolve_many_single_round_trip():
+    responses = {
+        (STANDARD, NAME_SELECTOR): encode(['string'], ['Standard Token']),
+        (STANDARD, SYMBOL_SELECTOR): encode(['string'], ['STD']),
+        (STANDARD, DECIMALS_SELECTOR): encode(['uint8'], [9]),
+        (STANDARD, TOTAL_SUPPLY_SELECTOR): encode(['uint256'], [10 ** 27]),
+        # Ancien token: name/symbol en bytes32
+        (BYTES32, NAME_SELECTOR): b'Maker'.ljust(32, b'\x00'),
+        (BYTES32, SYMBOL_SELECTOR): b'MKR'.ljust(32, b'\x00'),
+        (BYTES32, DECIMALS_SELECTOR): encode(['uint8'], [18]),
+    }
+    eth = FakeMulticallEth(responses)
+    resolver = TokenMetadataResolver(FakeW3(eth))
+
+    metadata = resolver.resolve_many([STANDARD, BYTES32, NOT_A_TOKEN])
+
+    assert eth.calls == 1
+    assert metadata[STANDARD] == {
+        'name': 'Standard Token', 'symbol': 'STD', 'decimals': 9,
+        'total_supply': 10 ** 27, 'resolved': True
+    }
+    assert metadata[BYTES32]['name'] == 'Maker'
+    assert metadata[BYTES32]['symbol'] == 'MKR'
+    assert metadata[BYTES32]['total_supply'] == 0
+    assert metadata[NOT_A_TOKEN]['resolved'] is False
+    assert metadata[NOT_A_TOKEN]['symbol'] == '???'
+
+
+def test_cache_serves_immutable_fields(tmp_path):
+    """Un token déjà résolu ne coûte plus que totalSupply (ou rien sans supply)"""
+    from metadata_cache import MetadataCache
+
+    responses = {
+        (STANDARD, NAME_SELECTOR): encode(['string'], ['Standard Token']),
+        (STANDARD, SYMBOL_SELECTOR): encode(['string'], ['STD']),
+        (STANDARD, DECIMALS_SELECTOR): encode(['uint8'], [9]),
+        (STANDARD, TOTAL_SUPPLY_SELECTOR): encode(['uint256'], [1000]),
+    }
+    eth = FakeMulticallEth(responses)
+    cache = MetadataCache(db_path=tmp_path / 'metadata.db')
+    resolver = TokenMetadataResolver(FakeW3(eth), cache=cache)
+
+    resolver.resolve(STANDARD)
+    assert eth.calls == 1
+
+    # Cache disque partagé: une nouvelle instance (autre process) le retrouve
+    fresh_resolver = TokenMetadataResolver(FakeW3(eth), cache=MetadataCache(db_path=tmp_path / 'metadata.db'))
+    assert fresh_resolver.resolve(STANDARD, include_supply=False)['decimals'] == 9
+    assert eth.calls == 1
+
+    metadata = fresh_resolver.resolve(STANDARD)
+    assert metadata['symbol'] == 'STD'
+    assert metadata['total_supply'] == 1000
+    assert eth.calls == 2
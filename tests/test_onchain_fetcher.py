@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Test onchain_fetcher.py - liquidité et Swap lus du bon type de pool
+Pools Uniswap V3 reconnus à leur adresse CREATE2: balance de base token via
+V3PoolReader et événement Swap V3, pas getReserves ni le Swap V2. Réserves V2
+ramenées avec les décimales du base token (6 pour USDC). get_swap_analytics:
+volumes et changements de prix 5min/1h depuis un seul get_logs.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from hexbytes import HexBytes
+from bar_store import BarStore
+from onchain_fetcher import OnChainFetcher
+from v3_pool_reader import compute_pool_address
+
+WETH = OnChainFetcher.WETH.lower()
+USDC = OnChainFetcher.USDC.lower()
+TOKEN = "0x" + "11" * 20  # < WETH: token0 des paires
+V3_POOL = compute_pool_address(TOKEN, WETH, 3000).lower()
+V2_PAIR = "0x" + "22" * 20
+
+HEAD_BLOCK = 10_000
+HEAD_TIMESTAMP = 1_700_000_000 // 60 * 60 + 30
+ETH_PRICE = 2000.0
+
+
+def swap_log(block, amount0_in, amount1_in, amount0_out, amount1_out):
+    data = b''.join(value.to_bytes(32, 'big') for value in (amount0_in, amount1_in, amount0_out, amount1_out))
+    return {'blockNumber': block, 'logIndex': 0, 'topics': [HexBytes(OnChainFetcher.SWAP_TOPIC)],
+            'data': HexBytes(data)}
+
+
+def minutes_ago(minutes):
+    return HEAD_BLOCK - minutes * 30  # Blocs de 2 secondes
+
+
+def v3_swap_log(block, amount0, amount1):
+    words = [amount0, amount1, 2**96, 10**18, 0]
+    data = b''.join(value.to_bytes(32, 'big', signed=True) for value in words)
+    return {'blockNumber': block, 'logIndex': 0, 'topics': [HexBytes(OnChainFetcher.V3_SWAP_TOPIC)],
+            'data': HexBytes(data)}
+
+
+class FakeEth:
+    def __init__(self, logs, reserves=None):
+        self.logs = logs
+        self.reserves = reserves
+        self.get_logs_calls = []
+
+    def get_logs(self, params):
+        self.get_logs_calls.append(params)
+        return [log for log in self.logs
+                if log['topics'][0].hex() == params['topics'][0]
+                and params['fromBlock'] <= log['blockNumber'] <= params['toBlock']]
+
+    def contract(self, address, abi):
+        assert self.reserves is not None, "pas d'appel de contrat V2 attendu"
+        reserves = self.reserves
+        call = type('Call', (), {'call': lambda self: reserves})()
+        functions = type('Functions', (), {'getReserves': lambda self: call})()
+        return type('Contract', (), {'functions': functions})()
+
+
+class FakeMetadataCache:
+    def __init__(self, pairs):
+        self.pairs = pairs
+
+    def get_pair(self, pair_address):
+        token0, token1 = self.pairs[pair_address.lower()]
+        return {'token0': token0, 'token1': token1}
+
+
+class FakeBlockIndex:
+    """Blocs de 2 secondes jusqu'à la tête"""
+
+    def block_at(self, timestamp):
+        return HEAD_BLOCK - (HEAD_TIMESTAMP - timestamp) // 2
+
+    def timestamp_of(self, block):
+        return HEAD_TIMESTAMP - (HEAD_BLOCK - block) * 2
+
+
+class FakeOracle:
+    def get_quote(self):
+        return {'price': ETH_PRICE, 'stale': False, 'age_seconds': 0, 'block': HEAD_BLOCK}
+
+
+class FakeV3Reader:
+    def __init__(self):
+        self.calls = []
+
+    def read_pools(self, token_address, quote_token, fee_tiers):
+        self.calls.append((token_address, quote_token, fee_tiers))
+        return [{'fee': fee_tiers[0], 'quote_balance': 3.0}]
+
+
+def make_fetcher(logs, pairs, reserves=None):
+    fetcher = OnChainFetcher.__new__(OnChainFetcher)
+    fetcher.w3 = type('W3', (), {'eth': FakeEth(logs, reserves)})()
+    fetcher.metadata_cache = FakeMetadataCache(pairs)
+    fetcher.metadata_resolver = type('Resolver', (), {'resolve': lambda self, address, include_supply: {'decimals': 18}})()
+    fetcher.block_index = FakeBlockIndex()
+    fetcher.bar_store = BarStore(minutes=120, max_pairs=10)
+    fetcher.eth_oracle = FakeOracle()
+    fetcher.v3_reader = FakeV3Reader()
+    return fetcher
+
+
+def test_v3_pool_liquidity_and_swaps():
+    logs = [
+        v3_swap_log(HEAD_BLOCK - 10, -1000 * 10**18, 10**18),  # Achat: 1 WETH → 1000 tokens
+        v3_swap_log(HEAD_BLOCK - 5, 500 * 10**18, -(10**18 // 2)),  # Vente: 500 tokens → 0.5 WETH
+    ]
+    fetcher = make_fetcher(logs, {V3_POOL: (TOKEN, WETH)})
+
+    # Liquidité: balance WETH du pool (fee tier 0.3% retrouvé par CREATE2), pas getReserves
+    assert fetcher.get_pool_liquidity_usd(TOKEN, V3_POOL) == 3.0 * ETH_PRICE
+    assert fetcher.v3_reader.calls == [(TOKEN, WETH, (3000,))]
+
+    # Volume: événement Swap V3 aux montants signés
+    swaps = fetcher.get_swap_analytics(V3_POOL, head=(HEAD_BLOCK, HEAD_TIMESTAMP))
+    assert fetcher.w3.eth.get_logs_calls[0]['topics'] == [OnChainFetcher.V3_SWAP_TOPIC]
+    assert swaps['volume_5min'] == 1.5 * ETH_PRICE
+    assert (swaps['buys_5min'], swaps['sells_5min']) == (1, 1)
+
+
+def test_v2_reserve_uses_base_decimals():
+    # token0 = TOKEN, token1 = USDC (6 décimales): 2500 USDC de réserve
+    fetcher = make_fetcher([], {V2_PAIR: (TOKEN, USDC)}, reserves=(10**24, 2500 * 10**6, 0))
+    assert fetcher.get_pool_liquidity_usd(TOKEN, V2_PAIR) == 2500.0
+    assert fetcher.v3_reader.calls == []
+
+
+def test_swap_analytics_from_one_get_logs():
+    # Paire V2 TOKEN (token0) / WETH (token1): achat = WETH entrant (amount1_in)
+    logs = [
+        swap_log(minutes_ago(62), 0, 10**18, 1000 * 10**18, 0),  # -62min: 0.001 WETH/token
+        swap_log(minutes_ago(7), 0, 10**18, 500 * 10**18, 0),  # -7min: 0.002
+        swap_log(minutes_ago(1), 300 * 10**18, 0, 0, 9 * 10**17),  # -1min: vente à 0.003
+    ]
+    fetcher = make_fetcher(logs, {V2_PAIR: (TOKEN, WETH)})
+    head = (HEAD_BLOCK, HEAD_TIMESTAMP)
+
+    swaps = fetcher.get_swap_analytics(V2_PAIR, head=head)
+    assert len(fetcher.w3.eth.get_logs_calls) == 1
+    assert fetcher.w3.eth.get_logs_calls[0]['topics'] == [OnChainFetcher.SWAP_TOPIC]
+    assert abs(swaps['volume_5min'] - 0.9 * ETH_PRICE) < 1e-6
+    assert abs(swaps['volume_1h'] - 1.9 * ETH_PRICE) < 1e-6
+    assert abs(swaps['price_change_5min'] - 50.0) < 1e-6
+    assert abs(swaps['price_change_1h'] - 200.0) < 1e-6
+    assert (swaps['buys_5min'], swaps['sells_5min']) == (0, 1)
+
+    # Même tête: barres en mémoire, aucun nouveau get_logs
+    assert fetcher.get_swap_analytics(V2_PAIR, head=head) == swaps
+    assert len(fetcher.w3.eth.get_logs_calls) == 1
+
+
+def test_swap_analytics_without_swaps():
+    fetcher = make_fetcher([], {V2_PAIR: (TOKEN, WETH)})
+
+    swaps = fetcher.get_swap_analytics(V2_PAIR, head=(HEAD_BLOCK, HEAD_TIMESTAMP))
+    assert len(fetcher.w3.eth.get_logs_calls) == 1
+    for key in ('volume_5min', 'volume_1h', 'price_change_5min', 'price_change_1h'):
+        assert swaps[key] == 0.0
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test preselection.py - présélection on-chain d'un batch en deux allers-retours
+Bytecode et code hash (lot eth_getCode), réserves de base lues du bon côté de la
+paire (token0) et renonciation owner() depuis un seul aggregate3.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from eth_abi import encode
+from web3 import Web3
+from preselection import (OnChainPreselector, OWNER_SELECTOR, TOKEN0_SELECTOR, GET_RESERVES_SELECTOR,
+                          BALANCE_OF_SELECTOR, WETH)
+
+USDC = "0x833589fcd6edb6e08f4c7c32d4f71b54bda02913"
+DEAD = "0x000000000000000000000000000000000000dead"
+OWNER = "0x" + "77" * 20
+
+CODE = bytes.fromhex("6080604052")
+SCAM_CODE = bytes.fromhex("6080604053")
+
+
+class FakeProvider:
+    def __init__(self, codes):
+        self.codes = codes
+        self.batches = 0
+
+    def batch_request(self, calls):
+        self.batches += 1
+        return [{'result': '0x' + self.codes.get(params[0].lower(), b'').hex()} for _, params in calls]
+
+
+class FakeMulticall:
+    """aggregate3 servi depuis {(cible, selecteur): réponse}; cible absente = appel en échec"""
+
+    def __init__(self, state):
+        self.state = state
+        self.batches = 0
+
+    def aggregate3(self, calls, block_identifier='latest'):
+        self.batches += 1
+        return [self.state.get((target.lower(), data[:4]), (False, b'')) for target, data in calls]
+
+
+def token(index, base=WETH, factory_name='Aerodrome'):
+    # Adresses de token toutes inférieures aux base tokens: le côté de la base vient de token0()
+    return {
+        'token_address': "0x" + f"{index:02x}" * 20,
+        'pair_address': "0x" + f"{index + 0x80:02x}" * 20,
+        'base_token': base,
+        'factory_name': factory_name
+    }
+
+
+def address_word(address):
+    return encode(['address'], [address])
+
+
+def test_bytecode_code_hash_reserves_and_owner_in_one_batch():
+    alive, empty, scam, drained, swapped, v3 = (token(i) for i in range(1, 7))
+    v3['factory_name'] = 'Uniswap V3'
+    swapped['base_token'] = USDC
+
+    codes = {t['token_address']: CODE for t in (alive, drained, swapped, v3)}
+    codes[scam['token_address']] = SCAM_CODE
+
+    state = {
+        # Paire saine: token0() = token, WETH en token1
+        (alive['pair_address'], TOKEN0_SELECTOR): (True, address_word(alive['token_address'])),
+        (alive['pair_address'], GET_RESERVES_SELECTOR): (True, encode(['uint112', 'uint112', 'uint32'], [10**24, 2 * 10**18, 0])),
+        (alive['token_address'], OWNER_SELECTOR): (True, address_word(DEAD)),
+        # Pool vidé
+        (drained['pair_address'], TOKEN0_SELECTOR): (True, address_word(drained['token_address'])),
+        (drained['pair_address'], GET_RESERVES_SELECTOR): (True, encode(['uint112', 'uint112', 'uint32'], [10**24, 10**15, 0])),
+        # Base (USDC, 6 décimales) en token0 alors que l'ordre des adresses dirait token1
+        (swapped['pair_address'], TOKEN0_SELECTOR): (True, address_word(USDC)),
+        (swapped['pair_address'], GET_RESERVES_SELECTOR): (True, encode(['uint112', 'uint112', 'uint32'], [500 * 10**6, 10**24, 0])),
+        (swapped['token_address'], OWNER_SELECTOR): (True, address_word(OWNER)),
+        # V3: balance WETH du pool, token sans owner()
+        (WETH.lower(), BALANCE_OF_SELECTOR): (True, encode(['uint256'], [10**18])),
+    }
+
+    provider = FakeProvider(codes)
+    w3 = type('W3', (), {'provider': provider})()
+    multicall = FakeMulticall(state)
+    preselector = OnChainPreselector(w3, multicall=multicall)
+    preselector.blocked_code_hashes = {Web3.keccak(SCAM_CODE).hex().lower()}
+
+    kept, rejected = preselector.preselect([alive, empty, scam, drained, swapped, v3])
+    assert provider.batches == 1 and multicall.batches == 1
+
+    assert rejected[empty['token_address']] == "pas de bytecode"
+    assert rejected[scam['token_address']].startswith("code hash bloqué")
+    assert rejected[drained['token_address']].startswith("réserve base 0.0010")
+
+    kept = {t['token_address']: t for t in kept}
+    assert set(kept) == {alive['token_address'], swapped['token_address'], v3['token_address']}
+    assert kept[alive['token_address']]['base_reserve'] == 2.0
+    assert kept[alive['token_address']]['owner_renounced'] is True
+    assert kept[swapped['token_address']]['base_reserve'] == 500.0
+    assert kept[swapped['token_address']]['owner_renounced'] is False
+    assert kept[v3['token_address']]['base_reserve'] == 1.0
+    assert kept[v3['token_address']]['owner_renounced'] is None  # Pas de owner()
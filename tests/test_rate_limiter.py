@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Test rate_limiter.py - token bucket partagé entre process avec priorités
+Seau commun à deux instances (même base), réserve et demande prioritaire
+qui bloquent les basses priorités.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from rate_limiter import RateLimiter, PRIORITY_HIGH, PRIORITY_LOW
+
+
+def test_shared_bucket_and_priorities(tmp_path):
+    db_path = tmp_path / 'limits.db'
+    limits = {'dex': (60, 4)}  # 1 jeton/s, capacité 4
+    filter_limiter = RateLimiter(db_path, limits)
+    trader_limiter = RateLimiter(db_path, limits)
+
+    # Basse priorité: la moitié du seau reste réservée
+    assert filter_limiter.try_acquire('dex', PRIORITY_LOW)
+    assert filter_limiter.try_acquire('dex', PRIORITY_LOW)
+    assert not filter_limiter.try_acquire('dex', PRIORITY_LOW)
+
+    # Autre process, priorité haute: accès à la réserve, puis seau vide
+    assert trader_limiter.try_acquire('dex', PRIORITY_HIGH)
+    assert trader_limiter.try_acquire('dex', PRIORITY_HIGH)
+    assert not trader_limiter.try_acquire('dex', PRIORITY_HIGH)
+
+    # La demande prioritaire en attente bloque les basses priorités
+    assert not filter_limiter.acquire('dex', PRIORITY_LOW, timeout=0.2)
+    assert trader_limiter.acquire('dex', PRIORITY_HIGH, timeout=2)
+    assert not asyncio.run(filter_limiter.acquire_async('dex', PRIORITY_LOW, timeout=0.2))
+
+    # Fournisseur sans quota connu: jamais limité
+    assert filter_limiter.try_acquire('unknown', PRIORITY_LOW)
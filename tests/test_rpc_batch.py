@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test rpc_batch.py - regroupement des requêtes concurrentes en lots JSON-RPC
+Serveur HTTP local qui répond eth_chainId / eth_getCode et compte les POST reçus;
+un seul provider par URL partagé par les instances Web3.
+"""
+
+import sys
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from rpc_batch import BatchingHTTPProvider, make_web3
+
+
+def make_server(accept_batches=True):
+    posts = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            posts.append(body)
+
+            def answer(request):
+                if request['method'] == 'eth_chainId':
+                    result = hex(8453)
+                else:
+                    result = '0x6080' if request['params'][0].endswith('1') else '0x'
+                return {'jsonrpc': '2.0', 'id': request['id'], 'result': result}
+
+            if isinstance(body, list):
+                response = [answer(r) for r in reversed(body)] if accept_batches else \
+                    {'jsonrpc': '2.0', 'id': None, 'error': {'code': -32600, 'message': 'batch not supported'}}
+            else:
+                response = answer(body)
+
+            payload = json.dumps(response).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, posts
+
+
+def test_concurrent_calls_share_batches():
+    server, posts = make_server()
+    try:
+        w3 = make_web3(f'http://127.0.0.1:{server.server_address[1]}')
+        w3.provider.flush_seconds = 0.05
+        addresses = [f'0x{i:040x}' for i in range(1, 21)]
+
+        with ThreadPoolExecutor(max_workers=20) as pool:
+            codes = list(pool.map(lambda a: w3.eth.get_code(w3.to_checksum_address(a)), addresses))
+
+        # Réponses rendues au bon appelant malgré l'ordre inversé du serveur
+        assert [code.hex() for code in codes] == [
+            '0x6080' if a.endswith('1') else '0x' for a in addresses
+        ]
+        assert len(posts) < len(addresses)
+        assert any(isinstance(body, list) for body in posts)
+    finally:
+        server.shutdown()
+
+
+def test_slow_batch_does_not_delay_next_batch():
+    server, posts = make_server()
+    try:
+        provider = BatchingHTTPProvider(f'http://127.0.0.1:{server.server_address[1]}', flush_ms=1)
+        entered, release = threading.Event(), threading.Event()
+        original = provider._send_batch
+
+        def send(calls):
+            if calls[0][1] == ['slow']:
+                entered.set()
+                release.wait(5)  # Premier lot bloqué tant que le second n'a pas abouti
+            return original([('eth_chainId', [])] * len(calls))
+
+        provider._send_batch = send
+        slow = threading.Thread(target=provider.make_request, args=('eth_chainId', ['slow']))
+        slow.start()
+        assert entered.wait(5)
+
+        assert provider.make_request('eth_chainId', [])['result'] == hex(8453)
+        assert slow.is_alive()  # Réponse obtenue pendant que le lot lent est encore en vol
+        release.set()
+        slow.join()
+    finally:
+        server.shutdown()
+
+
+def test_explicit_batch_falls_back_when_unsupported():
+    server, posts = make_server(accept_batches=False)
+    try:
+        provider = BatchingHTTPProvider(f'http://127.0.0.1:{server.server_address[1]}')
+        responses = provider.batch_request([('eth_chainId', []), ('eth_chainId', [])])
+
+        assert [r['result'] for r in responses] == [hex(8453), hex(8453)]
+        assert provider.stats['fallbacks'] == 1
+        assert provider.batch_supported is False
+
+        # Nouvel essai des lots après le délai de repli
+        provider._batch_disabled_until = 0.0
+        assert provider.batch_supported is True
+    finally:
+        server.shutdown()
+
+
+def test_make_web3_reuses_provider_per_url():
+    # Basculements RPC répétés: un seul provider (thread de flush, pool d'envoi) par URL
+    first = make_web3('http://127.0.0.1:1/reuse')
+    again = make_web3('http://127.0.0.1:1/reuse')
+    assert first.provider is again.provider
+    assert make_web3('http://127.0.0.1:1/reuse', timeout=30).provider is not first.provider
+    assert make_web3('http://127.0.0.1:2/reuse').provider is not first.provider
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test swap_decoder.py - décodage vectorisé des Swap V2 et V3
+Colonnes comparées au décodage entier Python, décimales USDC (6) respectées,
+montants signés V3 ramenés en entrée/sortie, et 100k logs décodés bien
+en-dessous d'une seconde.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from hexbytes import HexBytes
+from swap_decoder import decode_swaps, decode_v3_swaps, base_flows, total_volume, vwap, buy_sell_split, block_mask
+
+
+def swap_log(block, amount0_in, amount1_in, amount0_out, amount1_out, log_index=0):
+    data = b''.join(value.to_bytes(32, 'big') for value in (amount0_in, amount1_in, amount0_out, amount1_out))
+    return {'blockNumber': block, 'logIndex': log_index, 'data': HexBytes(data)}
+
+
+def test_columns_and_decimal_scaling():
+    # Paire USDC (token0, 6 décimales) / token à 18 décimales
+    logs = [
+        swap_log(10, 500 * 10**6, 0, 0, 1000 * 10**18),  # Achat: 500 USDC → 1000 tokens
+        swap_log(11, 0, 400 * 10**18, 250 * 10**6, 0, log_index=3),  # Vente: 400 tokens → 250 USDC
+        {'blockNumber': 12, 'data': '0x1234'}  # data mal formé: ignoré
+    ]
+
+    columns = decode_swaps(logs)
+    assert list(columns['block']) == [10, 11]
+    assert list(columns['log_index']) == [0, 3]
+    assert columns['amount0_in'][0] == 500 * 10**6
+    assert columns['amount1_out'][0] == 1000 * 10**18
+
+    flows = base_flows(columns, base_is_token0=True, base_decimals=6, token_decimals=18)
+    assert total_volume(flows) == 750.0
+    assert list(flows['is_buy']) == [True, False]
+    assert abs(vwap(flows) - 750 / 1400) < 1e-12
+    assert abs(vwap(flows, block_mask(flows, 10, 10)) - 0.5) < 1e-12
+
+    split = buy_sell_split(flows)
+    assert split == {'buys': 1, 'sells': 1, 'buy_volume': 500.0, 'sell_volume': 250.0}
+
+
+def v3_swap_log(block, amount0, amount1, log_index=0):
+    words = [amount0, amount1, 2**96, 10**18, 0]
+    data = b''.join(value.to_bytes(32, 'big', signed=True) for value in words)
+    return {'blockNumber': block, 'logIndex': log_index, 'data': HexBytes(data)}
+
+
+def test_v3_signed_amounts():
+    # Pool token (token0, 18 décimales) / WETH (token1): montants signés vus du pool
+    logs = [
+        v3_swap_log(20, -1000 * 10**18, 2 * 10**18),  # Achat: 2 WETH entrent, 1000 tokens sortent
+        v3_swap_log(21, 400 * 10**18, -10**18 + 1, log_index=2),  # Vente
+        swap_log(22, 1, 0, 0, 1)  # Swap V2 (128 octets): ignoré
+    ]
+
+    columns = decode_v3_swaps(logs)
+    assert list(columns['block']) == [20, 21]
+    assert list(columns['amount0_out']) == [1000 * 10**18, 0]
+    assert list(columns['amount1_in']) == [2 * 10**18, 0]
+    assert columns['amount0_in'][1] == 400 * 10**18
+    assert columns['amount1_out'][1] == float(10**18 - 1)
+
+    flows = base_flows(columns, base_is_token0=False)
+    assert list(flows['is_buy']) == [True, False]
+    assert abs(total_volume(flows) - 3.0) < 1e-12
+    assert abs(vwap(flows, block_mask(flows, 20, 20)) - 0.002) < 1e-15
+
+    assert len(decode_v3_swaps([])['block']) == 0
+
+
+def test_large_batch_is_fast():
+    logs = [swap_log(block, 10**18 + block, 0, 0, 3 * 10**21) for block in range(100_000)]
+
+    started = time.perf_counter()
+    flows = base_flows(decode_swaps(logs), base_is_token0=True)
+    volume = total_volume(flows)
+    elapsed = time.perf_counter() - started
+
+    expected = sum(10**18 + block for block in range(100_000)) / 10**18
+    assert abs(volume - expected) / expected < 1e-9
+    assert elapsed < 1.0
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test v3_pool_reader.py - adresses CREATE2 et prix spot dérivé de slot0
+Tous les fee tiers lus en un seul aggregate3; pools absents ignorés.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from eth_abi import encode
+from v3_pool_reader import V3PoolReader, compute_pool_address, swap_amount_out, WETH, Q96
+
+USDC = "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913"
+TOKEN = "0x" + "11" * 20  # < WETH: token0 du pool
+
+
+def test_create2_matches_deployed_pool():
+    # Pool WETH/USDC 0.05% Uniswap V3 sur Base
+    assert compute_pool_address(USDC, WETH, 500) == "0xd0b53D9277642d899DF5C87A3966A349A798F224"
+    assert compute_pool_address(WETH, USDC, 500) == compute_pool_address(USDC, WETH, 500)
+
+
+class FakeMulticall:
+    def __init__(self):
+        self.batches = 0
+
+    def aggregate3(self, calls, block_identifier='latest'):
+        self.batches += 1
+        pool_3000 = compute_pool_address(TOKEN, WETH, 3000)
+        pool_500 = compute_pool_address(TOKEN, WETH, 500)
+        results = []
+        for target, data in calls:
+            if target == pool_3000 and len(data) == 4 and data != bytes.fromhex('1a686502'):
+                results.append((True, encode(['uint160', 'int24'], [Q96 // 100, -92104])))  # Prix 1e-4
+            elif target == pool_3000:
+                results.append((True, encode(['uint128'], [10**24])))
+            elif target == pool_500 and len(data) == 4 and data != bytes.fromhex('1a686502'):
+                results.append((True, encode(['uint160', 'int24'], [Q96 // 100, -92104])))
+            elif target == pool_500:
+                results.append((True, encode(['uint128'], [10**20])))
+            elif len(data) == 36:  # balanceOf
+                results.append((True, encode(['uint256'], [5 * 10**18])))
+            else:
+                results.append((True, b''))  # Pool non déployé
+        return results
+
+
+class FakeCache:
+    def get_tokens(self, addresses):
+        return {address.lower(): {'decimals': 18} for address in addresses}
+
+
+def test_best_pool_price_and_depth_in_one_batch():
+    multicall = FakeMulticall()
+    reader = V3PoolReader(None, multicall=multicall, cache=FakeCache())
+
+    pools = reader.read_pools(TOKEN)
+    assert multicall.batches == 1
+    assert sorted(pool['fee'] for pool in pools) == [500, 3000]
+
+    best = reader.best_pool(TOKEN)
+    assert best['fee'] == 3000
+    assert abs(best['price'] - 1e-4) / 1e-4 < 1e-9
+    assert best['tick'] == -92104
+    assert best['quote_balance'] == 5.0
+    # Δy = L·√P·(√1.02 - 1) en WETH
+    assert abs(best['quote_depth'] - 10**24 * 0.01 * (1.02 ** 0.5 - 1) / 10**18) < 1e-6
+
+
+def test_swap_quote_depends_on_size_and_direction():
+    best = V3PoolReader(None, multicall=FakeMulticall(), cache=FakeCache()).best_pool(TOKEN)
+    spot = best['price']
+
+    # Petit montant: prix spot aux frais près (0.3%), vente sous le spot, achat au-dessus
+    small_sell = swap_amount_out(best, 10**18, sell=True) / 10**18
+    assert abs(small_sell - spot * 0.997) / spot < 1e-6
+    small_buy = 10**14 / swap_amount_out(best, 10**14, sell=False)
+    assert spot < small_buy < spot * 1.004
+
+    # Gros montant (10% des réserves virtuelles): impact de prix en plus des frais
+    deep = dict(best, quote_balance=10**6)
+    large_sell = swap_amount_out(deep, 10**25, sell=True) / 10**25
+    assert abs(large_sell - small_sell / 1.0997) / large_sell < 1e-3
+
+    # Sortie bornée par la balance réelle du pool (5 WETH)
+    assert swap_amount_out(best, 10**30, sell=True) <= 5 * 10**18
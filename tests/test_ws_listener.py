@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test ws_listener.py - mode push contre un serveur WebSocket local
+Le serveur rejoue des notifications enregistrées (logs + newHeads), coupe la
+connexion une fois pour vérifier la reconnexion et l'appel du backfill; les têtes
+transmettent hash et parentHash (contrôle de réorganisation du Scanner).
+"""
+
+import sys
+import json
+import asyncio
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+import websockets
+from ws_listener import WebSocketLogListener
+
+FACTORY = "0x8909dc15e40173ff4699343b6eb8132c65e18ec6"
+PAIR_CREATED = "0x0d3648bd0f6ba80134a33ba9275ac585d9d315f0ad8355cddefde31afa28d0e9"
+
+# Notifications enregistrées (forme JSON-RPC brute)
+RECORDED_LOG = {
+    'address': FACTORY,
+    'topics': [
+        PAIR_CREATED,
+        '0x0000000000000000000000001111111111111111111111111111111111111111',
+        '0x0000000000000000000000004200000000000000000000000000000000000006'
+    ],
+    'data': '0x000000000000000000000000aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa'
+            '0000000000000000000000000000000000000000000000000000000000000001',
+    'blockNumber': hex(1000),
+    'blockHash': '0x' + '11' * 32,
+    'transactionHash': '0x' + '22' * 32,
+    'logIndex': '0x0',
+    'removed': False
+}
+
+
+def head(number):
+    return {'number': hex(number), 'timestamp': hex(1_700_000_000 + 2 * number),
+            'hash': '0x' + f'{number:064x}', 'parentHash': '0x' + f'{number - 1:064x}'}
+
+
+async def replay_server(websocket):
+    """Répond aux eth_subscribe puis rejoue les notifications"""
+    replay_server.connections += 1
+    subscription_ids = {}
+
+    for _ in range(2):
+        request = json.loads(await websocket.recv())
+        kind = request['params'][0]
+        subscription_ids[kind] = f'0x{kind}'
+        await websocket.send(json.dumps({'jsonrpc': '2.0', 'id': request['id'], 'result': f'0x{kind}'}))
+
+    def notification(kind, result):
+        return json.dumps({
+            'jsonrpc': '2.0', 'method': 'eth_subscription',
+            'params': {'subscription': subscription_ids[kind], 'result': result}
+        })
+
+    if replay_server.connections == 1:
+        await websocket.send(notification('newHeads', head(1000)))
+        await websocket.send(notification('logs', RECORDED_LOG))
+        return  # Coupure: le client doit se reconnecter
+
+    await websocket.send(notification('newHeads', head(1001)))
+    await websocket.wait_closed()
+
+
+def test_push_stream_with_reconnect():
+    received_logs = []
+    heads = []
+    connects = []
+
+    async def scenario():
+        replay_server.connections = 0
+        async with websockets.serve(replay_server, '127.0.0.1', 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            listener = WebSocketLogListener(
+                ws_url=f'ws://127.0.0.1:{port}',
+                addresses=[FACTORY],
+                topics=[[PAIR_CREATED]],
+                on_logs=received_logs.extend,
+                on_head=lambda number, timestamp, block_hash, parent_hash: heads.append((number, block_hash)),
+                on_connect=lambda: connects.append(len(heads)),
+                max_reconnect_delay=0.1
+            )
+            task = asyncio.create_task(listener.run())
+
+            for _ in range(100):
+                if 1001 in [number for number, _ in heads]:
+                    break
+                await asyncio.sleep(0.05)
+
+            healthy = listener.healthy
+            listener.stop()
+            task.cancel()
+            return healthy
+
+    healthy = asyncio.run(scenario())
+
+    assert healthy
+    assert heads == [(1000, '0x' + f'{1000:064x}'), (1001, '0x' + f'{1001:064x}')]
+    # Backfill demandé à chaque connexion, avant les notifications
+    assert connects == [0, 1]
+
+    assert len(received_logs) == 1
+    log = received_logs[0]
+    assert log['blockNumber'] == 1000
+    assert log['logIndex'] == 0
+    assert log['address'] == '0x8909Dc15e40173Ff4699343b6eB8132c65e18eC6'
+    assert log['topics'][0].hex().endswith(PAIR_CREATED[2:])